@@ -0,0 +1,116 @@
+"""
+Messages/second for the old on_message scanning vs the single-pass ParsedAlert.
+
+    python -m benchmarks.bench_alert_parser --messages 5000 --keywords 100
+
+The corpus mimics monitor-channel traffic: restock posts with a title line,
+product links, SKUs and embeds with description/fields, mixed with chatter.
+"before" repeats the regex/keyword work the old handler did per message.
+"""
+import argparse
+import random
+import re
+import time
+from types import SimpleNamespace
+from utils.alerts import parse_alert
+from utils.matcher import KeywordMatcher
+from benchmarks.bench_matcher import make_keywords
+
+STORES = [
+    ("target", "https://www.target.com/p/{slug}/-/A-{id}?preselect={id}#lnk=sametab"),
+    ("walmart", "https://www.walmart.com/ip/{slug}/{id}?athbdg=L1600"),
+    ("bestbuy", "https://www.bestbuy.com/site/{slug}/{id}.p?skuId={id}"),
+]
+CHATTER = ["anyone get one?", "W", "restocks are bots only lol", "gl everyone", "link dead for me"]
+
+
+def identify_store(url):
+    url_lower = url.lower()
+    for store in ("target", "walmart", "bestbuy"):
+        if f"{store}.com" in url_lower:
+            return store
+    return None
+
+
+def make_corpus(count, keywords, rng):
+    corpus = []
+    for n in range(count):
+        if n % 3 == 0:
+            corpus.append(SimpleNamespace(content=rng.choice(CHATTER), embeds=[]))
+            continue
+        store, template = rng.choice(STORES)
+        title = rng.choice(keywords) if n % 4 == 1 else "Some Other Product"
+        product_id = rng.randint(10**7, 10**8)
+        url = template.format(slug=title.lower().replace(" ", "-"), id=product_id)
+        fields = [SimpleNamespace(name="Price", value="$49.99"),
+                  SimpleNamespace(name="Links", value=f"[ATC]({url}) | [Cart](https://www.{store}.com/cart)")]
+        embed = SimpleNamespace(description=f"**{title}** restocked at {store.title()}\n{url}", fields=fields)
+        content = f"Item Restocked!\n{title}™\n{url}\nSKU {product_id} @ {store.title()}"
+        corpus.append(SimpleNamespace(content=content, embeds=[embed]))
+    return corpus
+
+
+def legacy_scan(message, keywords):
+    """The parsing work the old on_message did, without the dispatching."""
+    content = message.content
+
+    def matches(value):
+        return any(keyword.lower() in value.lower() for keyword in keywords)
+
+    found = []
+    if matches(content):
+        for url in re.findall(r"(https?://[^\s]+)", content):
+            found.append(identify_store(url))
+        sku_match = re.search(r"SKU\s+(\d+)", content)
+        if sku_match:
+            for site in ("target", "walmart", "bestbuy"):
+                if re.search(site, content, re.IGNORECASE):
+                    break
+
+    urls = re.findall(r"(https?://[^\s]+)", content)
+    for embed in message.embeds:
+        if embed.description:
+            urls.extend(re.findall(r"(https?://[^\s]+)", embed.description))
+        for field in embed.fields:
+            urls.extend(re.findall(r"(https?://[^\s]+)", field.value))
+    for url in set(urls):
+        if matches(content):
+            found.append(identify_store(url))
+
+    sku_match = re.search(r"SKU\s+(\d+)", content)
+    if sku_match:
+        for site in ("target", "walmart", "bestbuy"):
+            if re.search(site, content, re.IGNORECASE):
+                break
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--keywords", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keywords = make_keywords(args.keywords, rng)
+    corpus = make_corpus(args.messages, keywords, rng)
+    matcher = KeywordMatcher(keywords)
+
+    start = time.perf_counter()
+    for message in corpus:
+        legacy_scan(message, keywords)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for message in corpus:
+        parse_alert(message, matcher, identify_store)
+    after = time.perf_counter() - start
+
+    print(f"corpus: {len(corpus)} messages, {len(keywords)} keywords")
+    print(f"before: {len(corpus) / before:>10.0f} msg/s")
+    print(f"after:  {len(corpus) / after:>10.0f} msg/s  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
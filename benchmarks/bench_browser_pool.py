@@ -0,0 +1,58 @@
+"""
+Lease latency from a warm BrowserPool vs a cold uc.Chrome start.
+
+    python -m benchmarks.bench_browser_pool --store target --iterations 5
+
+Needs a local Chrome/Chromium and chromedriver; no network access is used
+(browsers only ever load about:blank).
+"""
+import argparse
+import statistics
+import time
+from bots import TargetBot, WalmartBot, BestBuyBot
+from utils.browser_pool import BrowserPool
+
+BOTS = {"target": TargetBot, "walmart": WalmartBot, "bestbuy": BestBuyBot}
+
+
+def summarize(label, samples):
+    print(f"{label:<12} n={len(samples):<3} "
+          f"mean={statistics.mean(samples) * 1000:8.1f} ms  "
+          f"min={min(samples) * 1000:8.1f} ms  "
+          f"max={max(samples) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", choices=sorted(BOTS), default="target")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--pool-size", type=int, default=1)
+    args = parser.parse_args()
+
+    bot_class = BOTS[args.store]
+    config = {"headless": True}
+
+    cold = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        driver = bot_class(config).create_driver()
+        cold.append(time.perf_counter() - start)
+        driver.quit()
+
+    pool = BrowserPool(args.store, lambda slot: bot_class(config).create_driver(), size=args.pool_size)
+    pool.warm(block=True)
+    leased = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        driver = pool.acquire()
+        leased.append(time.perf_counter() - start)
+        pool.release(driver)
+    pool.close()
+
+    summarize("cold start", cold)
+    summarize("pool lease", leased)
+    print(f"speedup      {statistics.mean(cold) / statistics.mean(leased):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
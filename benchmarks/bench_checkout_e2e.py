@@ -0,0 +1,81 @@
+"""
+End-to-end checkout latency for TargetBot, WalmartBot and BestBuyBot against the
+local mock retailer, with a per-step, per-page-load and per-wait breakdown
+taken from each bot's trace.
+
+    python -m benchmarks.bench_checkout_e2e --stores target bestbuy --oos-loads 2
+
+Needs a local Chrome/Chromium + chromedriver only; the bots never leave 127.0.0.1.
+Orders are "placed" on the mock, so place_order is enabled.
+"""
+import argparse
+import time
+from bots import TargetBot, WalmartBot, BestBuyBot
+from benchmarks.mock_retailer import MockRetailer
+
+BOTS = {"target": TargetBot, "walmart": WalmartBot, "bestbuy": BestBuyBot}
+
+
+def mock_store_config(mock, store, args):
+    return {
+        "email": "shopper@example.com",
+        "password": "mock-password",
+        "account_name": mock.account_name,
+        "headless": not args.headed,
+        "place_order": True,
+        "refresh_interval": args.refresh_interval,
+        "product_url": mock.product_url(store),
+        "base_url": mock.base_url(store),
+        "card_number": "4111111111111111",
+        "card_exp": "12/30",
+        "card_cvv": "123",
+        "full_name": "Mock Shopper",
+        "address": "1 Test St",
+        "city": "Testville",
+        "state": "CA",
+        "zip": "90001",
+        "phone": "5555550100",
+        # Mock pages render instantly; keep an out-of-stock check from idling for 30 s
+        "wait_budgets": {"page_load": args.stock_wait},
+        "trace_format": args.trace_format,
+    }
+
+
+def report(store, ok, total, tracer):
+    print(f"\n{store}: {'completed' if ok else 'FAILED'} in {total:.2f}s")
+    for category in ("step", "form", "page", "wait"):
+        calls = {}
+        for span in tracer.spans:
+            if span["category"] == category:
+                calls[span["name"]] = calls.get(span["name"], 0) + 1
+        print(f"  {category:<22}{'calls':>6}{'seconds':>10}")
+        for name, spent in tracer.summary(category).items():
+            print(f"  {name:<22}{calls[name]:>6}{spent:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", nargs="+", choices=sorted(BOTS), default=sorted(BOTS))
+    parser.add_argument("--oos-loads", type=int, default=1, help="out-of-stock product loads before the restock")
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--ui-delay-ms", type=int, default=150)
+    parser.add_argument("--refresh-interval", type=float, default=1)
+    parser.add_argument("--stock-wait", type=float, default=3, help="seconds to wait for an add-to-cart button")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--trace-format", choices=["none", "jsonl", "chrome"], default="none",
+                        help="also export each run's trace to traces/")
+    args = parser.parse_args()
+
+    mock = MockRetailer(latency_ms=args.latency_ms, ui_delay_ms=args.ui_delay_ms, oos_loads=args.oos_loads).start()
+    try:
+        for store in args.stores:
+            bot = BOTS[store](mock_store_config(mock, store, args))
+            start = time.perf_counter()
+            ok = bot.run()
+            report(store, ok, time.perf_counter() - start, bot.tracer)
+    finally:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Checkout form-fill time on the mock retailer: the old one find_element +
+send_keys round trip per field against the compiled form profile applied with
+one script call (bots' fill_form). Both fill the same shipping and payment
+fields of the Target and BestBuy checkout pages.
+
+    python -m benchmarks.bench_form_fill --iterations 10
+
+Needs a local Chrome/Chromium + chromedriver; only 127.0.0.1 is loaded.
+"""
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+from bots import TargetBot, BestBuyBot
+from benchmarks.bench_checkout_e2e import mock_store_config
+from benchmarks.mock_retailer import MockRetailer
+from utils.forms import compile_form
+
+BOTS = {"target": TargetBot, "bestbuy": BestBuyBot}
+CHECKOUT_PATHS = {"target": "/checkout/start", "bestbuy": "/checkout"}
+# Templates the checkout flow reveals before the payment fields exist
+HIDDEN_SECTIONS = {"target": ["t-card"], "bestbuy": ["t-pay"]}
+
+
+def type_fields(bot, profile):
+    """The previous way: one locate + one send_keys round trip per field."""
+    for key, locator, value in profile.fields:
+        element = bot.driver.find_element(*locator)
+        element.clear()
+        element.send_keys(value)
+
+
+def open_checkout(bot, store):
+    bot.open(bot.base_url + CHECKOUT_PATHS[store])
+    for section in HIDDEN_SECTIONS[store]:
+        bot.driver.execute_script("reveal(arguments[0]);", section)
+
+
+def run_store(store, args, mock):
+    config = mock_store_config(mock, store, SimpleNamespace(headed=args.headed, refresh_interval=1,
+                                                             stock_wait=3, trace_format="none"))
+    bot = BOTS[store](config)
+    bot.attach_driver(bot.create_driver())
+    profiles = [compile_form(name, pairs, bot.selectors, config) for name, pairs in bot.forms.items()]
+    fields = sum(len(profile) for profile in profiles)
+    results = {"per-field": [], "batched": []}
+    typed = 0
+    try:
+        for _ in range(args.iterations):
+            for method in results:
+                open_checkout(bot, store)
+                start = time.perf_counter()
+                for profile in profiles:
+                    if method == "batched":
+                        typed += profile.fill(bot.driver)
+                    else:
+                        type_fields(bot, profile)
+                results[method].append(time.perf_counter() - start)
+    finally:
+        bot.driver.quit()
+
+    print(f"{store}: {fields} fields in {len(profiles)} forms, {args.iterations} checkouts")
+    for method, samples in results.items():
+        print(f"  {method:<10} p50 {statistics.median(samples) * 1000:7.1f} ms  "
+              f"max {max(samples) * 1000:7.1f} ms per checkout")
+    print(f"  speedup {statistics.median(results['per-field']) / statistics.median(results['batched']):.1f}x, "
+          f"{typed} fields fell back to typing")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", nargs="+", choices=sorted(BOTS), default=sorted(BOTS))
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    mock = MockRetailer(ui_delay_ms=0).start()
+    try:
+        for store in args.stores:
+            run_store(store, args, mock)
+    finally:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Ingest-to-dispatch latency (a Discord message arriving until its checkout is
+queued) while checkout threads keep the dispatcher process busy: messages
+parsed on the dispatcher's own event loop ("inline", the single-process bot)
+against parsing in a separate ingest process that hands alerts over the Unix
+socket ("split", ingest_process: true).
+
+    python -m benchmarks.bench_ingest --rate 200 --seconds 5 --busy-threads 4
+
+A sender process replays monitor-channel traffic at --rate messages/second.
+Also reports how late the event loop hosting the Discord client wakes up,
+which is what gateway heartbeats and reads wait on.
+--busy-threads pure-Python threads stand in for bot threads holding the GIL.
+The dispatcher is a stand-in whose submit() resolves the product URL and
+returns, so only the hand-off is measured.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from utils.alerts import ParsedAlert, embed_texts
+from utils.ingest import IngestServer, RemoteDispatcher
+from utils.matcher import get_matcher
+from utils.products import ProductIndex
+from benchmarks.bench_alert_parser import make_corpus
+from benchmarks.bench_matcher import make_keywords
+
+
+class StandInDispatcher:
+    """submit() records how long ago the alert's message arrived (its source is the arrival time)."""
+
+    def __init__(self):
+        self.products = ProductIndex()
+        self.latencies = []
+
+    async def submit(self, url, probe=True, source=None):
+        resolved = self.products.resolve(url)
+        self.latencies.append(time.time() - float(source))
+        return _Job(len(self.latencies), resolved.url if resolved else url)
+
+    def identify_store(self, url):
+        resolved = self.products.resolve(url)
+        return resolved.store if resolved else None
+
+
+class _Job:
+    def __init__(self, job_id, url):
+        self.id = str(job_id)
+        self.url = url
+        self.alerts = 1
+        self.result = True
+        self.status = "succeeded"
+
+    async def wait(self):
+        return True
+
+
+async def on_message(message, dispatcher, matcher, identify_store):
+    """What DiscordBot.on_message does with an alert: parse it, then submit every product URL for a watched item."""
+    alert = ParsedAlert(message["content"], message["embeds"], matcher, identify_store)
+    if not alert.is_target:
+        return
+    for url in alert.urls:
+        if alert.url_stores[url]:
+            await dispatcher.submit(url, source=repr(message["t"]))
+
+
+async def handle_messages(reader, dispatcher, matcher, identify_store):
+    """Like discord.py's gateway: every message gets its own on_message task."""
+    tasks = set()
+    while line := await reader.readline():
+        task = asyncio.create_task(on_message(json.loads(line), dispatcher, matcher, identify_store))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+
+
+async def watch_loop_lag(samples, interval=0.01):
+    """How late the Discord client's event loop wakes up (heartbeats and gateway reads wait this long)."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+def keywords():
+    return make_keywords(100, random.Random(1))
+
+
+# -----------------------------
+# Processes
+# -----------------------------
+def send_messages(path, rate, seconds):
+    """Sender process: replay the corpus at `rate` messages/second, stamping each with its send time."""
+    rng = random.Random(7)
+    corpus = [{"content": m.content, "embeds": embed_texts(m)} for m in make_corpus(2000, keywords(), rng)]
+
+    async def main():
+        while not os.path.exists(path):
+            await asyncio.sleep(0.05)
+        _, writer = await asyncio.open_unix_connection(path)
+        start = time.perf_counter()
+        for n in range(int(rate * seconds)):
+            delay = start + n / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            message = dict(corpus[n % len(corpus)], t=time.time())
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+        writer.close()
+
+    asyncio.run(main())
+
+
+def run_ingest_process(raw_path, dispatch_path, lag_queue):
+    """Split mode's ingest process: parse here, hand alerts to the dispatcher process."""
+    async def main():
+        remote = RemoteDispatcher(dispatch_path, config=SimpleNamespace(current=None, start=lambda: None))
+        matcher = get_matcher(keywords())
+        done = asyncio.Event()
+        lag = []
+        watcher = asyncio.create_task(watch_loop_lag(lag))
+
+        async def serve(reader, writer):
+            await handle_messages(reader, remote, matcher, remote.identify_store)
+            done.set()
+
+        server = await asyncio.start_unix_server(serve, path=raw_path)
+        await done.wait()
+        watcher.cancel()
+        server.close()
+        lag_queue.put(lag)
+
+    asyncio.run(main())
+
+
+def burn(stop, duty):
+    """A bot thread: Python work (parsing responses, building payloads) between blocking WebDriver calls."""
+    while not stop.is_set():
+        until = time.perf_counter() + 0.01 * duty
+        while time.perf_counter() < until:
+            sum(i * i for i in range(200))
+        time.sleep(0.01 * (1 - duty))
+
+
+async def measure(mode, args, directory):
+    dispatcher = StandInDispatcher()
+    raw_path = os.path.join(directory, f"{mode}-raw.sock")
+    context = multiprocessing.get_context("spawn")
+    stop = threading.Event()
+    threads = [threading.Thread(target=burn, args=(stop, args.duty), daemon=True) for _ in range(args.busy_threads)]
+    for thread in threads:
+        thread.start()
+
+    server = ingest = watcher = None
+    lag = []
+    if mode == "inline":
+        watcher = asyncio.create_task(watch_loop_lag(lag))
+        matcher = get_matcher(keywords())
+        raw_server = await asyncio.start_unix_server(
+            lambda reader, writer: handle_messages(reader, dispatcher, matcher, dispatcher.identify_store),
+            path=raw_path)
+    else:
+        raw_server = None
+        server = IngestServer(dispatcher, os.path.join(directory, "dispatch.sock"), report_interval=3600)
+        await server.start()
+        lag_queue = context.SimpleQueue()
+        ingest = context.Process(target=run_ingest_process, args=(raw_path, server.path, lag_queue), daemon=True)
+        ingest.start()
+
+    sender = context.Process(target=send_messages, args=(raw_path, args.rate, args.seconds), daemon=True)
+    sender.start()
+    await asyncio.to_thread(sender.join)
+    if ingest:
+        lag = await asyncio.to_thread(lag_queue.get)
+        await asyncio.to_thread(ingest.join)
+    elif watcher:
+        watcher.cancel()
+    await asyncio.sleep(1)
+    stop.set()
+    if raw_server:
+        raw_server.close()
+    if server:
+        await server.close()
+    return dispatcher.latencies, lag
+
+
+def percentiles(samples):
+    samples = sorted(samples) or [0.0]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {statistics.median(samples) * 1000:6.2f} ms, p99 {p99 * 1000:7.2f} ms"
+
+
+def report(mode, latencies, lag):
+    print(f"{mode:>7}: {len(latencies)} alerts dispatched, {percentiles(latencies)}; "
+          f"Discord loop lag {percentiles(lag)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=200, help="messages per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--busy-threads", type=int, default=4)
+    parser.add_argument("--duty", type=float, default=0.3, help="share of each 10 ms a busy thread spends in Python")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("inline", "split"):
+            report(mode, *asyncio.run(measure(mode, args, directory)))
+    print(f"{args.rate:.0f} messages/s for {args.seconds:.0f}s, {args.busy_threads} busy threads "
+          f"in the dispatcher at {args.duty:.0%} duty")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cost of journaling every alert on the ingest path: an SQLite insert committed
+per event on the caller's thread against JobJournal, where the caller only
+queues the event and a writer thread commits whatever piled up in one
+transaction. Each alert is journaled as a dispatch plus a few merged alerts,
+and every dispatched job logs its completed steps.
+
+    python -m benchmarks.bench_journal --alerts 20000 --dupes 3
+
+Reports the per-call latency the event loop sees and how long until every
+event is on disk.
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from utils.journal import JobJournal, SCHEMA, INSERT
+
+STEP_NAMES = ("ensure_logged_in", "check_stock_and_add", "go_to_checkout", "place_order")
+
+
+class CommitPerEvent:
+    """The straightforward version: one INSERT + COMMIT per event on the caller's thread (WAL, NORMAL)."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def _write(self, row):
+        with self.db:
+            self.db.execute(INSERT, row)
+
+    def dispatch(self, job, store, url, product, source=None):
+        self._write((job, time.time(), "dispatch", store, url, product, source, None, None, None))
+
+    def alert(self, job, source=None):
+        self._write((job, time.time(), "alert", None, None, None, source, None, None, None))
+
+    def step(self, job, step, status, profile=None):
+        self._write((job, time.time(), "step", None, None, None, None, profile, step, status))
+
+    def flush(self):
+        pass
+
+
+def feed(journal, args):
+    samples = []
+    for job in range(1, args.alerts + 1):
+        url = f"https://www.target.com/p/-/A-{job}"
+        start = time.perf_counter()
+        journal.dispatch(job, "target", url, url, source=f"URL: {url}")
+        for _ in range(args.dupes):
+            journal.alert(job, source=f"URL: {url}")
+        samples.append((time.perf_counter() - start) / (1 + args.dupes))
+        for step in STEP_NAMES:
+            journal.step(job, step, "done", profile="default")
+    return samples
+
+
+def run(name, journal, args):
+    start = time.perf_counter()
+    samples = feed(journal, args)
+    fed = time.perf_counter() - start
+    journal.flush()
+    durable = time.perf_counter() - start
+    events = args.alerts * (1 + args.dupes + len(STEP_NAMES))
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{name:>16}: per alert p50 {statistics.median(samples) * 1e6:7.1f} us, p99 {p99 * 1e6:8.1f} us; "
+          f"{events} events fed in {fed:.2f}s, on disk after {durable:.2f}s ({events / durable:,.0f} events/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=20000)
+    parser.add_argument("--dupes", type=int, default=3, help="merged duplicate alerts per dispatched job")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        run("commit per event", CommitPerEvent(os.path.join(directory, "sync.db")), args)
+        run("JobJournal", JobJournal(os.path.join(directory, "jobs.db")), args)
+
+
+if __name__ == "__main__":
+    main()
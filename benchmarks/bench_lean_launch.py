@@ -0,0 +1,105 @@
+"""
+Default Chrome launch against lean_mode for each bot: peak memory of the
+browser's process tree during a checkout and the page-load time of every step,
+on mock product pages that load what real ones do (image gallery, web font,
+video, tag manager) and go out of stock for a few refreshes first.
+
+    python -m benchmarks.bench_lean_launch --stores target bestbuy --oos-loads 3
+
+Needs a local Chrome/Chromium + chromedriver (Linux for the memory figures);
+only 127.0.0.1 is loaded.
+"""
+import argparse
+import threading
+import time
+from types import SimpleNamespace
+from bots import TargetBot, WalmartBot, BestBuyBot
+from benchmarks.bench_checkout_e2e import mock_store_config
+from benchmarks.mock_retailer import MockRetailer
+from utils.browser_pool import driver_pids, process_tree_rss_mb
+
+BOTS = {"target": TargetBot, "walmart": WalmartBot, "bestbuy": BestBuyBot}
+
+
+class MeasuredBrowser:
+    """Hands the bot one browser, like a pool would, and samples its memory until it's released."""
+
+    def __init__(self, driver, interval=0.2):
+        self.driver = driver
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def _sample(self, interval):
+        pids = driver_pids(self.driver)
+        while not self._stop.wait(interval):
+            self.peak_mb = max(self.peak_mb, process_tree_rss_mb(pids))
+
+    def acquire(self):
+        return self.driver
+
+    def release(self, driver):
+        self._stop.set()
+        self._thread.join()
+        driver.quit()
+
+
+def page_loads_by_step(tracer):
+    """Seconds of page loading inside each step span."""
+    steps = [span for span in tracer.spans if span["category"] == "step"]
+    totals = {}
+    for page in (span for span in tracer.spans if span["category"] == "page"):
+        for step in steps:
+            if step["start"] <= page["start"] <= step["start"] + step["duration"]:
+                totals[step["name"]] = totals.get(step["name"], 0) + page["duration"]
+                break
+    return totals
+
+
+def run_store(store, lean, args):
+    mock = MockRetailer(ui_delay_ms=0, oos_loads=args.oos_loads, assets=True).start()
+    try:
+        config = mock_store_config(mock, store, SimpleNamespace(headed=args.headed, refresh_interval=0.5,
+                                                                stock_wait=2, trace_format="none"))
+        config["lean_mode"] = lean
+        start = time.perf_counter()
+        driver = BOTS[store](config).create_driver()
+        launch = time.perf_counter() - start
+        window = driver.get_window_size()
+        browser = MeasuredBrowser(driver)
+        bot = BOTS[store](config, pool=browser)
+        start = time.perf_counter()
+        ok = bot.run()
+        return SimpleNamespace(ok=ok, launch=launch, window=f"{window['width']}x{window['height']}", total=time.perf_counter() - start, peak_mb=browser.peak_mb,
+                               pages=page_loads_by_step(bot.tracer), assets=mock.asset_requests)
+    finally:
+        mock.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", nargs="+", choices=sorted(BOTS), default=sorted(BOTS))
+    parser.add_argument("--oos-loads", type=int, default=3, help="out-of-stock product refreshes before the restock")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    for store in args.stores:
+        results = {"default": run_store(store, False, args), "lean": run_store(store, True, args)}
+        print(f"\n{store}:")
+        print(f"  {'':<22}{'default':>10}{'lean':>10}")
+        for label, value in (("checkout completed", lambda r: "yes" if r.ok else "NO"),
+                             ("window", lambda r: r.window),
+                             ("browser launch s", lambda r: f"{r.launch:.2f}"),
+                             ("checkout s", lambda r: f"{r.total:.2f}"),
+                             ("peak RSS MB", lambda r: f"{r.peak_mb:.0f}"),
+                             ("browsers per GB", lambda r: f"{1024 / r.peak_mb:.1f}" if r.peak_mb else "-"),
+                             ("asset requests", lambda r: str(r.assets))):
+            print(f"  {label:<22}{value(results['default']):>10}{value(results['lean']):>10}")
+        print("  page load s per step")
+        for step in results["default"].pages:
+            print(f"    {step:<20}{results['default'].pages[step]:>10.2f}{results['lean'].pages.get(step, 0):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
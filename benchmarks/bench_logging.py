@@ -0,0 +1,125 @@
+"""
+Logging overhead per checkout step, as seen by the checkout threads: the old
+synchronous FileHandler + StreamHandler setup against the queue-based
+pipeline in utils/logger.py. Each simulated step logs a few lines inside a
+job/store/step context; the time the step spends in logging calls is its overhead.
+
+    python -m benchmarks.bench_logging --threads 4 --steps 2000 --lines-per-step 4 --console-latency-ms 0.2
+
+--console-latency-ms makes every console write that slow (a busy terminal or
+a piped service log), which is where the synchronous setup blocks the caller.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from utils.logger import log_context, setup_logger, flush_logs
+
+STEP_NAMES = ("ensure_logged_in", "check_stock_and_add", "go_to_checkout", "fill_shipping", "fill_payment",
+              "place_order")
+
+
+class SlowStream:
+    """Stands in for the console: discards output after sleeping `latency` seconds per write."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def sync_pipeline(log_dir, stream):
+    """The previous setup: basicConfig with a FileHandler and a StreamHandler on the caller's thread."""
+    flush_logs()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler(os.path.join(log_dir, "sync.log")), logging.StreamHandler(stream)],
+        force=True
+    )
+
+
+def queue_pipeline(log_dir, stream):
+    saved, sys.stderr = sys.stderr, stream
+    try:
+        setup_logger(log_dir=log_dir, message_burst=10 ** 9)
+    finally:
+        sys.stderr = saved
+
+
+def run_steps(thread_no, args, samples):
+    log = logging.getLogger("bench")
+    with log_context(job=str(thread_no), store="target"):
+        for i in range(args.steps):
+            step = STEP_NAMES[i % len(STEP_NAMES)]
+            with log_context(step=step):
+                start = time.perf_counter()
+                for line in range(args.lines_per_step):
+                    log.info(f"Target step '{step}' line {line}: waited 0.42s for #cart-count (budget 8s)")
+                samples.append(time.perf_counter() - start)
+
+
+def measure(args):
+    samples = []
+    threads = [threading.Thread(target=run_steps, args=(n, args, samples)) for n in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def report(name, samples, wall, drain=None):
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    line = (f"{name:>6}: per step p50 {statistics.median(samples) * 1e6:8.1f} us, p99 {p99 * 1e6:8.1f} us, "
+            f"mean {statistics.fmean(samples) * 1e6:8.1f} us, {len(samples)} steps in {wall:.2f}s")
+    if drain is not None:
+        line += f" (+{drain:.2f}s background drain)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--lines-per-step", type=int, default=4)
+    parser.add_argument("--console-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stream = SlowStream(args.console_latency_ms / 1000)
+    with tempfile.TemporaryDirectory() as log_dir:
+        sync_pipeline(log_dir, stream)
+        samples, wall = measure(args)
+        report("sync", samples, wall)
+
+        queue_pipeline(log_dir, stream)
+        samples, wall = measure(args)
+        start = time.perf_counter()
+        flush_logs()
+        report("queue", samples, wall, time.perf_counter() - start)
+
+    # Back to the normal pipeline for anything logged after the benchmark
+    setup_logger()
+    print(f"{args.threads} threads x {args.steps} steps x {args.lines_per_step} lines, "
+          f"console write latency {args.console_latency_ms} ms ({stream.writes} console writes)")
+
+
+if __name__ == "__main__":
+    main()
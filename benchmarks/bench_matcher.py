@@ -0,0 +1,73 @@
+"""
+Compiled KeywordMatcher vs the old per-message `keyword.lower() in value.lower()` loop.
+
+    python -m benchmarks.bench_matcher --messages 2000
+
+Runs at 10/100/1000 watchlist keywords over synthetic restock-alert messages
+where roughly one message in ten mentions a watched product.
+"""
+import argparse
+import random
+import time
+from utils.matcher import KeywordMatcher
+
+WORDS = (
+    "pokemon elite trainer box booster bundle prismatic evolutions mini tins promo cards "
+    "playstation console digital edition throw blanket plaid hearth hand magnolia lego "
+    "star wars collector set nintendo switch oled scarlet violet surging sparks paldea "
+    "funko pop figure limited exclusive holiday gift pack collection premium deluxe"
+).split()
+
+
+def make_keywords(count, rng):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title() + f" {n}" for n in range(count)]
+
+
+def make_messages(count, keywords, rng):
+    messages = []
+    for n in range(count):
+        title = keywords[rng.randrange(len(keywords))] if n % 10 == 0 else " ".join(rng.choice(WORDS) for _ in range(6))
+        messages.append(
+            f"Item Restocked!\n{title}™\nPrice: $49.99 | Stock: 12\n"
+            f"https://www.target.com/p/-/A-{rng.randint(10**7, 10**8)}\nSKU {rng.randint(10**5, 10**6)}"
+        )
+    return messages
+
+
+def naive_match(keywords, value):
+    return any(keyword.lower() in value.lower() for keyword in keywords)
+
+
+def timed(fn, messages):
+    start = time.perf_counter()
+    hits = sum(1 for message in messages if fn(message))
+    return time.perf_counter() - start, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'keywords':>8} {'loop msg/s':>12} {'matcher msg/s':>14} {'speedup':>8} {'build ms':>9}")
+    for count in (10, 100, 1000):
+        rng = random.Random(args.seed)
+        keywords = make_keywords(count, rng)
+        messages = make_messages(args.messages, keywords, rng)
+
+        start = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build = time.perf_counter() - start
+
+        loop_time, loop_hits = timed(lambda m: naive_match(keywords, m), messages)
+        matcher_time, matcher_hits = timed(matcher.search, messages)
+        if matcher_hits < loop_hits:
+            print(f"warning: matcher found {matcher_hits} hits, loop found {loop_hits}")
+
+        print(f"{count:>8} {len(messages) / loop_time:>12.0f} {len(messages) / matcher_time:>14.0f} "
+              f"{loop_time / matcher_time:>7.1f}x {build * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
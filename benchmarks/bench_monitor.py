@@ -0,0 +1,100 @@
+"""
+Watchlist monitor at scale: 1,000 products watched from one asyncio loop on one
+core against the mock retailer, with every product restocking part-way through.
+
+    python -m benchmarks.bench_monitor --products 1000 --interval 5 --restock-after 10 --seconds 20
+
+The mock runs in a separate process so the CPU figures are the monitor's own.
+Reports checks/s, how late checks started against their schedule, CPU and
+memory, and how quickly each restock was handed off (once per product).
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.bench_stock_probe import rss_mb
+from benchmarks.mock_retailer import PRODUCT_PATHS
+from utils.monitor import WatchlistMonitor
+from utils.stock_probe import StockProbe
+
+
+def start_mock(args):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_retailer", "--port", "0",
+         "--latency-ms", str(args.latency_ms), "--oos-loads", "0", "--restock-after", str(args.restock_after)],
+        stdout=subprocess.PIPE, text=True
+    )
+    started = time.time()
+    base = process.stdout.readline().strip().rsplit(" ", 1)[-1]
+    return process, base, started
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def run(args, base, restock_at):
+    handoffs = {}
+
+    async def on_restock(product):
+        handoffs.setdefault(product.key, time.time())
+
+    probe = StockProbe(concurrency=args.concurrency, per_host=args.concurrency)
+    monitor = WatchlistMonitor(probe, on_restock, default_interval=args.interval, max_in_flight=args.concurrency)
+    stores = sorted(PRODUCT_PATHS)
+    for i in range(args.products):
+        store = stores[i % len(stores)]
+        monitor.add(base + PRODUCT_PATHS[store].format(id=10_000_000 + i), store)
+
+    before_rss, before_cpu = rss_mb(), cpu_seconds()
+    start = time.monotonic()
+    monitor.start()
+    await asyncio.sleep(args.seconds)
+    elapsed = time.monotonic() - start
+    cpu = cpu_seconds() - before_cpu
+    await monitor.stop()
+    await probe.close()
+
+    stats = monitor.stats
+    print(f"{len(monitor)} products, interval {args.interval}s, {elapsed:.0f}s run")
+    print(f"  checks {stats['checks']} ({stats['checks'] / elapsed:.0f}/s, expected "
+          f"{len(monitor) / args.interval:.0f}/s), 304s {probe.stats['not_modified']}, errors {probe.stats['errors']}")
+    print(f"  schedule lag avg {stats['lag_total'] / max(stats['checks'], 1) * 1000:.1f} ms, "
+          f"max {stats['lag_max'] * 1000:.0f} ms, late reschedules {stats['late']}")
+    print(f"  CPU {cpu:.1f}s ({cpu / elapsed * 100:.0f}% of one core), RSS {before_rss:.0f} -> {rss_mb():.0f} MB")
+    if handoffs:
+        delays = sorted(max(0.0, at - restock_at) for at in handoffs.values())
+        print(f"  hand-offs {len(handoffs)} (one per product: {stats['handoffs'] == len(handoffs)}), "
+              f"restock -> hand-off p50 {statistics.median(delays):.2f}s, p99 {delays[int(len(delays) * 0.99) - 1]:.2f}s")
+    else:
+        print("  no restocks seen — raise --seconds or lower --restock-after")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--interval", type=float, default=5)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--restock-after", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=10)
+    args = parser.parse_args()
+
+    mock, base, started = start_mock(args)
+    # Pin the monitor (not the mock, which is already running) to a single core
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+    try:
+        asyncio.run(run(args, base, started + args.restock_after))
+    finally:
+        mock.terminate()
+        mock.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Browser checks spent per restock, and how late the restock is seen, for the
+old fixed refresh_interval loop against a RefreshSchedule with backoff and a
+refresh window around the announced drop time. Simulated clock, no browser.
+
+    python -m benchmarks.bench_schedule --jobs 2000 --drop 10:00 --announced 0.7
+
+Each job's alert arrives at a random time of day, and its product restocks
+later that day: at the announced drop (within its first 10 minutes) for
+--announced of the jobs, at a random time for the rest.
+"""
+import argparse
+import random
+import statistics
+import time
+from utils.schedule import RefreshSchedule, RefreshWindow, parse_clock
+
+DAY = 24 * 3600
+
+
+def simulate(schedule, alert_at, restock_at):
+    """(checks, seconds from restock until a check saw it) for one job."""
+    now, misses = alert_at, 0
+    while now < restock_at:
+        misses += 1
+        now += schedule.delay(misses, now=now)
+    return misses + 1, now - restock_at
+
+
+def make_jobs(args, rng, midnight):
+    drop = midnight + parse_clock(args.drop) * 60
+    jobs = []
+    for _ in range(args.jobs):
+        if rng.random() < args.announced:
+            restock = drop + rng.uniform(0, 600)
+            alert = restock - rng.uniform(60, 12 * 3600)
+        else:
+            alert = midnight + rng.uniform(0, DAY - 3600)
+            restock = alert + rng.uniform(60, midnight + DAY - alert)
+        jobs.append((alert, restock))
+    return jobs
+
+
+def clock(minutes):
+    minutes %= 24 * 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def report(label, schedule, jobs):
+    results = [simulate(schedule, alert, restock) for alert, restock in jobs]
+    checks = [checks for checks, _ in results]
+    late = sorted(delay for _, delay in results)
+    print(f"{label:>10}: {sum(checks) / len(checks):8.0f} checks/job, seen after restock "
+          f"p50 {statistics.median(late):5.1f}s, p99 {late[int(len(late) * 0.99) - 1]:5.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--drop", default="10:00", help="announced drop time (HH:MM)")
+    parser.add_argument("--announced", type=float, default=0.7, help="share of restocks at the announced drop")
+    parser.add_argument("--interval", type=float, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    midnight = time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))
+    jobs = make_jobs(args, rng, midnight)
+    # Checks every 2s from 5 minutes before the drop until 15 minutes after
+    start = parse_clock(args.drop) - 5
+    window = RefreshWindow(clock(start), clock(start + 20), 2)
+
+    report("fixed", RefreshSchedule(args.interval), jobs)
+    report("backoff", RefreshSchedule(args.interval, backoff=1.5, max_interval=120), jobs)
+    report("+ window", RefreshSchedule(args.interval, backoff=1.5, max_interval=120, windows=[window]), jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Finding BestBuy's "Use password" option when the live markup is the last of
+its five candidate locators: the old loop (each candidate waited on in turn
+with a 5 s timeout) against find_first racing all candidates in one script
+call, first with an empty selector cache and then with the learned ranking.
+
+    python -m benchmarks.bench_selectors --iterations 5
+
+Needs a local Chrome/Chromium + chromedriver; only the mock retailer is loaded.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from bots import BestBuyBot
+from benchmarks.bench_checkout_e2e import mock_store_config
+from benchmarks.mock_retailer import MockRetailer
+
+# Markup only the last candidate (button[data-track*='SignIn_Password']) matches
+LAST_CANDIDATE_MARKUP = "<button data-track='SignIn_Password' onclick='this.remove()'>Sign in with a password</button>"
+
+
+def show_option(bot, mock):
+    bot.open(mock.base_url("bestbuy") + "/signin")
+    bot.driver.execute_script("document.querySelector('main').insertAdjacentHTML('beforeend', arguments[0]);",
+                              LAST_CANDIDATE_MARKUP)
+
+
+def sequential(bot):
+    for locator in bot.selectors["use_password"]:
+        try:
+            return bot.waiter.until(EC.element_to_be_clickable(locator), "login", timeout=5)
+        except TimeoutException:
+            continue
+    return None
+
+
+def timed(samples, find):
+    start = time.perf_counter()
+    found = find()
+    samples.append(time.perf_counter() - start)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    mock = MockRetailer(ui_delay_ms=0).start()
+    cache_dir = tempfile.mkdtemp()
+    config = mock_store_config(mock, "bestbuy", SimpleNamespace(headed=args.headed, refresh_interval=1,
+                                                                stock_wait=3, trace_format="none"))
+    config["selector_cache"] = os.path.join(cache_dir, "selectors.json")
+    bot = BestBuyBot(config)
+    bot.attach_driver(bot.create_driver())
+    results = {"sequential": [], "race (cold)": [], "race (learned)": []}
+    try:
+        for _ in range(args.iterations):
+            show_option(bot, mock)
+            timed(results["sequential"], lambda: sequential(bot))
+
+        show_option(bot, mock)
+        timed(results["race (cold)"], lambda: bot.find_first("use_password", "login", timeout=5))
+        for _ in range(args.iterations):
+            show_option(bot, mock)
+            timed(results["race (learned)"], lambda: bot.find_first("use_password", "login", timeout=5))
+    finally:
+        bot.driver.quit()
+        mock.stop()
+
+    for name, samples in results.items():
+        print(f"{name:<16} n={len(samples):<3} p50 {statistics.median(samples) * 1000:8.1f} ms  "
+              f"max {max(samples) * 1000:8.1f} ms")
+    print(f"learned order: {bot.selector_registry.rank('bestbuy', 'use_password', bot.selectors['use_password'])[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+on_message throughput on a large server where only a few channels carry
+restock alerts: every message parsed (no sources section) against a channels
+allowlist that drops the rest before any regex or keyword work.
+
+    python -m benchmarks.bench_sources --messages 20000 --channels 40 --monitors 3
+
+The same mix of restock posts, links and chatter is spread evenly over all
+channels, and the allowlist keeps only --monitors of them. The dispatcher is a stand-in that merges every alert into an
+existing job, so only message handling is timed.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from types import SimpleNamespace
+from utils.config import Config
+from utils.discord import DiscordBot
+from utils.logger import logger
+from utils.products import ProductIndex
+from benchmarks.bench_alert_parser import make_corpus
+from benchmarks.bench_matcher import make_keywords
+
+
+class StandInDispatcher:
+    def __init__(self, config):
+        self.config = config
+        self.products = ProductIndex()
+
+    def identify_store(self, url):
+        resolved = self.products.resolve(url)
+        return resolved.store if resolved else None
+
+    async def submit(self, url, probe=True, source=None):
+        return SimpleNamespace(id="1", alerts=2)
+
+
+class Channel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.name = f"channel-{channel_id}"
+
+    async def send(self, text):
+        pass
+
+
+def make_messages(args, keywords, rng):
+    guild = SimpleNamespace(id=1)
+    channels = [Channel(100 + n) for n in range(args.channels)]
+    corpus = make_corpus(args.messages, keywords, rng)
+    return [SimpleNamespace(content=m.content, embeds=m.embeds, guild=guild, channel=channels[n % len(channels)],
+                            author=SimpleNamespace(id=1000 + n % 50))
+            for n, m in enumerate(corpus)]
+
+
+def run(label, raw, messages):
+    bot = DiscordBot("token", StandInDispatcher(Config(raw)))
+
+    async def feed():
+        start = time.perf_counter()
+        for message in messages:
+            await bot.client.on_message(message)
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(feed())
+    parsed = sum(counts[1] for counts in bot.counters.counts.values()) + bot.counters.other[1]
+    print(f"{label:>10}: {len(messages) / elapsed:>9.0f} msg/s, {parsed} of {len(messages)} messages parsed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--channels", type=int, default=40)
+    parser.add_argument("--monitors", type=int, default=3, help="channels that carry alerts")
+    parser.add_argument("--keywords", type=int, default=100)
+    args = parser.parse_args()
+
+    # Handling is timed, not the console: the per-message log lines would dominate both runs
+    logger.setLevel(logging.WARNING)
+    rng = random.Random(7)
+    keywords = make_keywords(args.keywords, rng)
+    messages = make_messages(args, keywords, rng)
+    raw = {"email": "bench@example.com", "password": "x", "target_products": keywords}
+    run("all", raw, messages)
+    run("allowlist", dict(raw, sources={"channels": [100 + n for n in range(args.monitors)]}), messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+HTTP stock probe throughput and memory: watch N products on the mock retailer
+from one event loop and report probes/s, latency and the process RSS growth.
+
+    python -m benchmarks.bench_stock_probe --products 500 --seconds 10 --interval 1
+
+For comparison, bench_browser_pool reports the RSS of a single Chrome instance,
+which is what each watched product costs when the browser polls the page.
+"""
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+from benchmarks.mock_retailer import MockRetailer, PRODUCT_PATHS
+from utils.stock_probe import StockProbe
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def watch(probe, url, store, interval, deadline, latencies):
+    while time.monotonic() < deadline:
+        result = await probe.check(url, store)
+        latencies.append(result.elapsed)
+        await asyncio.sleep(probe.next_delay(url, interval))
+
+
+async def run(args, mock):
+    probe = StockProbe(concurrency=args.concurrency)
+    stores = sorted(PRODUCT_PATHS)
+    products = [(mock.product_url(stores[i % 3], str(10_000_000 + i)), stores[i % 3]) for i in range(args.products)]
+    latencies = []
+    before = rss_mb()
+    start = time.monotonic()
+    deadline = start + args.seconds
+    await asyncio.gather(*(watch(probe, url, store, args.interval, deadline, latencies) for url, store in products))
+    elapsed = time.monotonic() - start
+    after = rss_mb()
+    await probe.close()
+
+    latencies.sort()
+    print(f"{args.products} products, {len(latencies)} probes in {elapsed:.1f}s ({len(latencies) / elapsed:.0f}/s)")
+    print(f"  latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+    print(f"  304 Not Modified: {probe.stats['not_modified']}, errors: {probe.stats['errors']}")
+    print(f"  RSS {before:.0f} MB -> {after:.0f} MB ({(after - before) * 1024 / args.products:.1f} KB per product)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=1)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=20)
+    args = parser.parse_args()
+
+    # Never restocks, so every product stays watched for the whole run
+    mock = MockRetailer(latency_ms=args.latency_ms, oos_loads=10 ** 9).start()
+    try:
+        asyncio.run(run(args, mock))
+    finally:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
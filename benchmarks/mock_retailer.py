@@ -0,0 +1,429 @@
+"""
+Local stand-in for the Target, Walmart and BestBuy pages the bots drive.
+
+    python -m benchmarks.mock_retailer --port 8765 --oos-loads 2 --latency-ms 150
+
+Serves static HTML clones of the login, product, cart, checkout and
+place-order pages with the same element ids, names and XPath anchors the bots
+use, under /target, /walmart and /bestbuy. Point a bot at it with
+"<store>_base_url": "http://127.0.0.1:8765/<store>" and a product_url from
+MockRetailer.product_url(). Nothing is fetched from the network.
+
+Simulated behaviour:
+  --oos-loads N       product pages show out of stock for the first N loads
+  --restock-after S   ...and until S seconds after the server started
+  --latency-ms MS     delay before every response (slow store)
+  --ui-delay-ms MS    delay before client-side UI updates (SPA/XHR round trips)
+  --assets            product pages also load what real ones do: a gallery of
+                      large images, a web font, an autoplaying video and a tag
+                      manager script that beacons back (all served locally)
+
+Product pages carry the availability markers utils/stock_probe.py reads and
+answer conditional requests (If-None-Match) with 304 while unchanged.
+"""
+import argparse
+import hashlib
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SESSION_COOKIE = "mock_session=1"
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<script>
+var UI_DELAY = {ui_delay};
+function later(fn) {{ setTimeout(fn, UI_DELAY); }}
+function reveal(id) {{
+  var t = document.getElementById(id);
+  t.parentNode.insertBefore(t.content.cloneNode(true), t);
+}}
+function signIn(next) {{
+  document.cookie = "{session_cookie}; path=/";
+  later(function () {{ location.href = next; }});
+}}
+function placeOrder() {{
+  later(function () {{ document.body.innerHTML = "<main><h1>Thanks for your order</h1></main>"; }});
+}}
+</script></head>
+<body>{body}{assets}</body></html>"""
+
+# Appended to product pages with assets=True; paths resolve to MockRetailer.asset()
+PRODUCT_ASSETS = """
+<style>@font-face {{ font-family: Brand; src: url(/assets/brand.woff2) format('woff2'); }}
+  body {{ font-family: Brand, sans-serif; }} .gallery img {{ width: 200px; }}</style>
+<div class="gallery">{images}</div>
+<video autoplay muted loop src="/assets/promo.mp4"></video>
+<script src="/assets/gtm.js"></script>"""
+
+# Stands in for a tag manager: a burst of CPU on load, then a beacon every second
+TAG_MANAGER_JS = """
+var end = Date.now() + 40; while (Date.now() < end) {}
+setInterval(function () { new Image().src = '/assets/collect?t=' + Date.now(); }, 1000);
+"""
+
+# -----------------------------
+# Target
+# -----------------------------
+TARGET_HOME = """
+<div role="dialog" id="zip-modal"><p>Choose a store near you</p>
+  <button onclick="this.parentNode.remove()">Close</button></div>
+<header>
+  <span onclick="later(function () {{ reveal('t-signin'); }})">Account</span>
+  <template id="t-signin"><a href="{prefix}/signin">Sign in</a></template>
+  {greeting}
+  <a data-test="@web/CartLink" href="{prefix}/cart">0</a>
+</header>
+<main><h1>Target</h1></main>"""
+
+TARGET_SIGNIN = """
+<main>
+  <input id="username" type="email">
+  <button id="login" onclick="later(function () {{ reveal('t-choice'); }})">Continue</button>
+  <template id="t-choice">
+    <span onclick="later(function () {{ reveal('t-pwd'); }})">Enter your password</span>
+  </template>
+  <template id="t-pwd">
+    <input id="password" type="password">
+    <button onclick="signIn('{prefix}/phone')">Sign in with password</button>
+  </template>
+</main>"""
+
+TARGET_PHONE = """<main><p>Add a phone number</p><a href="{prefix}/">Skip</a></main>"""
+
+TARGET_PRODUCT = """
+<script>window.__TGT_DATA__ = {{"product": {{"tcin": "{product_id}", {marker}}}}};</script>
+<header><a data-test="@web/CartLink" id="cart" href="{prefix}/cart">0</a></header>
+<main>
+  <h1>Product {product_id}</h1>
+  <button {disabled} onclick="later(function () {{
+    var c = document.getElementById('cart'); c.textContent = String(+c.textContent + 1); reveal('t-added');
+  }})">Add to cart</button>
+  <template id="t-added"><div role="dialog"><h2>Added to cart</h2></div></template>
+</main>"""
+
+TARGET_CHECKOUT = """
+<main>
+  <h1>Checkout</h1>
+  <form onsubmit="return false">
+    <input name="firstName"><input name="addressLine1"><input name="city">
+    <input name="state"><input name="zip"><input name="phone">
+  </form>
+  <label><input type="radio" id="AddCreditDebitCellRadio" onclick="later(function () {{ reveal('t-card'); }})">
+    Credit or Debit Card</label>
+  <template id="t-card">
+    <input id="credit-card-number-input"><input id="credit-card-expiration-input">
+    <input id="credit-card-cvv-input"><input id="credit-card-name-input">
+    <input id="billing-address-first-name-input"><input id="billing-address-last-name-input">
+    <input id="billing-address-line1-input"><input id="billing-address-city-input">
+    <input id="billing-address-state-input"><input id="billing-address-zip-code-input">
+    <input id="billing-address-phone-input">
+    <button data-test="save_and_continue_button_step_PAYMENT"
+      onclick="var b = this; later(function () {{ b.remove(); reveal('t-place'); }})">Save and continue</button>
+  </template>
+  <template id="t-place"><button onclick="placeOrder()">Place your order</button></template>
+</main>"""
+
+# -----------------------------
+# Walmart
+# -----------------------------
+WALMART_HOME = """
+<header>
+  <a link-identifier="Account" href="#" onclick="later(function () {{ reveal('t-signin'); }}); return false;">Account</a>
+  <template id="t-signin">
+    <button data-testid="sign-in" onclick="location.href = '{prefix}/login'">Sign in or create account</button>
+  </template>
+  {greeting}
+</header>
+<main><h1>Walmart</h1></main>"""
+
+WALMART_LOGIN = """
+<main>
+  <input aria-label="Phone number or email" type="email">
+  <button id="login-continue-button" onclick="later(function () {{ reveal('t-pwd'); }})">Continue</button>
+  <template id="t-pwd">
+    <label><input type="radio" name="method"> Password</label>
+    <input aria-label="Enter your password" type="password">
+    <button id="withpassword-sign-in-button" onclick="signIn('{prefix}/')">Sign in</button>
+  </template>
+</main>"""
+
+WALMART_PRODUCT = """
+<script id="__NEXT_DATA__" type="application/json">{{"product": {{"usItemId": "{product_id}", {marker}}}}}</script>
+<main>
+  <h1>Item {product_id}</h1>
+  <button data-testid="buy-now-wrapper" {disabled}
+    onclick="later(function () {{ location.href = '{prefix}/checkout'; }})">Buy now</button>
+</main>"""
+
+WALMART_CHECKOUT = """<main><h1>Review your order</h1><button onclick="placeOrder()">Place order</button></main>"""
+
+# -----------------------------
+# BestBuy
+# -----------------------------
+BESTBUY_HOME = """
+<header>
+  <span class="line-clamp" onclick="later(function () {{ reveal('t-signin'); }})">Account</span>
+  <template id="t-signin"><a data-testid="signInButton" href="{prefix}/signin">Sign In</a></template>
+  {greeting}
+  <a class="cart-icon" href="{prefix}/cart"><span class="dot">0</span></a>
+</header>
+<main><h1>Best Buy</h1></main>"""
+
+BESTBUY_SIGNIN = """
+<main>
+  <form onsubmit="return false">
+    <input id="fld-e" type="email">
+    <template id="t-usepwd">
+      <button class="cia-button" onclick="var b = this; later(function () {{ b.remove(); reveal('t-pwd'); }})">
+        <span>Use password</span></button>
+    </template>
+    <template id="t-pwd"><input id="fld-p1" type="password"></template>
+    <button class="cia-form__controls__submit" onclick="
+      if (document.getElementById('fld-p1')) {{ signIn('{prefix}/'); }}
+      else {{ later(function () {{ reveal('t-usepwd'); }}); }}">Continue</button>
+  </form>
+</main>"""
+
+BESTBUY_PRODUCT = """
+<header><a class="cart-icon" href="{prefix}/cart"><span class="dot" id="dot">0</span></a></header>
+<main>
+  <h1>SKU {product_id}</h1>
+  <button data-test-id="add-to-cart" {marker} {disabled} onclick="later(function () {{
+    var d = document.getElementById('dot'); d.textContent = String(+d.textContent + 1);
+  }})"><span>Add to cart</span></button>
+</main>"""
+
+BESTBUY_CART = """
+<main><h1>Your Cart</h1>
+  <button class="btn btn-lg btn-block btn-primary" data-track="Checkout - Top"
+    onclick="later(function () {{ location.href = '{prefix}/checkout'; }})">Checkout</button>
+</main>"""
+
+BESTBUY_CHECKOUT = """
+<main>
+  <h1>Checkout</h1>
+  <input id="first-name"><input id="last-name"><input id="address-input"><input id="city">
+  <input id="state"><input id="postalCode"><input id="phone">
+  <template id="t-pay"><input id="number"><input id="expirationDate"><input id="cvv"></template>
+  <button id="continue" onclick="
+    var b = this; b.dataset.clicks = (+b.dataset.clicks || 0) + 1;
+    if (b.dataset.clicks == 1) {{ later(function () {{ reveal('t-pay'); }}); }}
+    else {{ later(function () {{ b.style.display = 'none'; reveal('t-place'); }}); }}">
+    <span>Continue to Payment Information</span></button>
+  <template id="t-place"><button data-track="Place your Order - In-line" onclick="placeOrder()">Place Order</button></template>
+</main>"""
+
+# (store, path regex) -> (template, page title)
+ROUTES = [
+    ("target", r"/?", TARGET_HOME, "Target"),
+    ("target", r"/signin", TARGET_SIGNIN, "Sign in"),
+    ("target", r"/phone", TARGET_PHONE, "Phone"),
+    ("target", r"/p/(?:[^/]+/)*A-(?P<product_id>\d+)", TARGET_PRODUCT, "Product"),
+    ("target", r"/checkout/start", TARGET_CHECKOUT, "Checkout"),
+    ("walmart", r"/?", WALMART_HOME, "Walmart"),
+    ("walmart", r"/login", WALMART_LOGIN, "Login"),
+    ("walmart", r"/ip/(?:[^/]+/)*(?P<product_id>\d+)", WALMART_PRODUCT, "Item"),
+    ("walmart", r"/checkout", WALMART_CHECKOUT, "Checkout"),
+    ("bestbuy", r"/?", BESTBUY_HOME, "Best Buy"),
+    ("bestbuy", r"/signin", BESTBUY_SIGNIN, "Sign In"),
+    ("bestbuy", r"/site/(?:[^/]+/)*(?P<product_id>\d+)\.p", BESTBUY_PRODUCT, "Product"),
+    ("bestbuy", r"/cart", BESTBUY_CART, "Cart"),
+    ("bestbuy", r"/checkout", BESTBUY_CHECKOUT, "Checkout"),
+]
+COMPILED_ROUTES = [(store, re.compile(f"/{store}{pattern}"), template, title) for store, pattern, template, title in ROUTES]
+
+GREETINGS = {
+    "target": "<span>Hi, {name}</span>",
+    "walmart": "<div>{name}</div>",
+    "bestbuy": "<span>{name}</span>",
+}
+
+# Availability markers the HTTP stock probe reads: (in stock, out of stock)
+STOCK_MARKERS = {
+    "target": ('"availability_status": "IN_STOCK"', '"availability_status": "OUT_OF_STOCK"'),
+    "walmart": ('"availabilityStatus": "IN_STOCK"', '"availabilityStatus": "OUT_OF_STOCK"'),
+    "bestbuy": ('data-button-state="ADD_TO_CART"', 'data-button-state="SOLD_OUT"'),
+}
+
+PRODUCT_PATHS = {
+    "target": "/target/p/mock-product/-/A-{id}",
+    "walmart": "/walmart/ip/mock-item/{id}",
+    "bestbuy": "/bestbuy/site/mock-sku/{id}.p?skuId={id}",
+}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Browsers and cancelled probes hanging up mid-response are routine here
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def _noise_png(width, height, seed):
+    """An incompressible RGB PNG, so the browser really downloads and decodes every pixel."""
+    rng = random.Random(seed)
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+
+
+class MockRetailer:
+    """Threaded mock store server; start() returns immediately."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0, ui_delay_ms=150,
+                 oos_loads=0, restock_after=0, account_name="Mock Shopper", assets=False, images=8):
+        self.latency_ms = latency_ms
+        self.ui_delay_ms = ui_delay_ms
+        self.oos_loads = oos_loads
+        self.restock_after = restock_after
+        self.account_name = account_name
+        self.started_at = time.monotonic()
+        self.product_loads = {}
+        self.asset_requests = 0
+        self.assets = self._build_assets(images) if assets else {}
+        self._lock = threading.Lock()
+        self.server = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def base_url(self, store):
+        return f"http://127.0.0.1:{self.port}/{store}"
+
+    def product_url(self, store, product_id="12345678"):
+        return f"http://127.0.0.1:{self.port}" + PRODUCT_PATHS[store].format(id=product_id)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-retailer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def in_stock(self, store, product_id):
+        """Count a product page load and report whether the product has flipped to in stock."""
+        with self._lock:
+            loads = self.product_loads.get((store, product_id), 0) + 1
+            self.product_loads[(store, product_id)] = loads
+        restocked = time.monotonic() - self.started_at >= self.restock_after
+        return loads > self.oos_loads and restocked
+
+    def _build_assets(self, images):
+        rng = random.Random(0)
+        assets = {f"/assets/img/{n}.png": ("image/png", _noise_png(800, 600, n)) for n in range(images)}
+        assets["/assets/brand.woff2"] = ("font/woff2", rng.randbytes(120 * 1024))
+        assets["/assets/promo.mp4"] = ("video/mp4", rng.randbytes(2 * 1024 * 1024))
+        assets["/assets/gtm.js"] = ("application/javascript", TAG_MANAGER_JS.encode())
+        assets["/assets/collect"] = ("image/gif", b"")
+        return assets
+
+    def render(self, path, cookies):
+        for store, pattern, template, title in COMPILED_ROUTES:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            product_id = match.groupdict().get("product_id")
+            in_stock = product_id is None or self.in_stock(store, product_id)
+            disabled = "" if in_stock else "disabled"
+            marker = STOCK_MARKERS[store][0 if in_stock else 1]
+            greeting = GREETINGS[store].format(name=self.account_name) if SESSION_COOKIE in cookies else ""
+            body = template.format(prefix=f"/{store}", product_id=product_id, disabled=disabled,
+                                   marker=marker, greeting=greeting)
+            assets = ""
+            if self.assets and product_id is not None:
+                images = "".join(f'<img src="{path}">' for path in self.assets if path.startswith("/assets/img/"))
+                assets = PRODUCT_ASSETS.format(images=images)
+            return PAGE.format(title=title, body=body, assets=assets, ui_delay=self.ui_delay_ms,
+                               session_cookie=SESSION_COOKIE)
+        return None
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so pooled clients (the stock probe) reuse connections like they would on a real store
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if mock.latency_ms:
+                    time.sleep(mock.latency_ms / 1000)
+                path = self.path.split("?", 1)[0]
+                if path in mock.assets:
+                    self.send_asset(*mock.assets[path])
+                    return
+                html = mock.render(self.path.split("?", 1)[0], self.headers.get("Cookie", ""))
+                if html is None:
+                    self.send_error(404)
+                    return
+                payload = html.encode("utf-8")
+                # Lets the stock probe's conditional requests come back as 304 while nothing changed
+                etag = '"' + hashlib.md5(payload).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def send_asset(self, content_type, payload):
+                with mock._lock:
+                    mock.asset_requests += 1
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("Cache-Control", "max-age=300")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--ui-delay-ms", type=int, default=150)
+    parser.add_argument("--oos-loads", type=int, default=0)
+    parser.add_argument("--restock-after", type=float, default=0)
+    parser.add_argument("--assets", action="store_true")
+    args = parser.parse_args()
+
+    mock = MockRetailer(port=args.port, latency_ms=args.latency_ms, ui_delay_ms=args.ui_delay_ms,
+                        oos_loads=args.oos_loads, restock_after=args.restock_after, assets=args.assets)
+    print(f"Mock retailer listening on http://127.0.0.1:{mock.port}", flush=True)
+    for store in PRODUCT_PATHS:
+        print(f"  {store}: base_url={mock.base_url(store)} product_url={mock.product_url(store)}", flush=True)
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
+from .base import BaseBot, Step
 from .target import TargetBot
 from .walmart import WalmartBot
 from .bestbuy import BestBuyBot
 
-__all__ = ['TargetBot', 'WalmartBot', 'BestBuyBot']
\ No newline at end of file
+__all__ = ['BaseBot', 'Step', 'TargetBot', 'WalmartBot', 'BestBuyBot']
\ No newline at end of file
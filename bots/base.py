@@ -0,0 +1,360 @@
+import os
+import threading
+import time
+import undetected_chromedriver as uc
+from utils.logger import logger, log_context
+from utils.waits import Waiter, DEFAULT_POLL_INTERVAL
+from utils.tracing import Tracer, traced_step
+from utils.driver_setup import get_driver_paths
+from utils.forms import compile_form
+from utils.selectors import first_match, get_registry, DEFAULT_CACHE_PATH
+from utils.journal import get_journal, DEFAULT_JOURNAL_PATH
+from utils.lean import add_lean_options, blocked_url_patterns, block_requests, size_window
+from utils.schedule import RefreshSchedule
+from utils.metrics import STEP_SECONDS, ALERT_TO_STEP, CHECKOUTS, BROWSER_LAUNCHES, BROWSER_LAUNCH_SECONDS
+
+
+class Step:
+    """
+    One stage of a store's checkout pipeline, run by BaseBot.run():
+    - name: the bot method to call; it returns True when the step succeeded
+    - required: stop the run (with a screenshot) if the step still fails after its retries
+    - retries: extra attempts straight after a failure
+    - until_in_stock: repeat on the store's RefreshSchedule until it succeeds, the job is
+      cancelled or it outlives max_job_lifetime
+    - durable: its effect outlives the browser (the item stays in the account's cart), so a
+      run resumed after a crash skips it if the interrupted run completed it
+    """
+
+    def __init__(self, name, required=True, retries=0, until_in_stock=False, durable=False):
+        self.name = name
+        self.required = required
+        self.retries = retries
+        self.until_in_stock = until_in_stock
+        self.durable = durable
+
+    def __repr__(self):
+        return f"Step({self.name!r})"
+
+
+class BaseBot:
+    """
+    Checkout engine shared by the store bots. A store subclass declares its
+    `steps` (a list of Step), its `selectors` and one method per step; the
+    engine owns the browser (pool lease or cold start, persistent profile,
+    Waiter), runs the steps in order with retries and the restock loop,
+    traces every step and takes a screenshot when a required step fails.
+    """
+
+    store = None
+    name = None
+    default_base_url = None
+    steps = []
+    # name -> (By, selector), or a list of them for markup that changes (see find_first)
+    selectors = {}
+    # form name -> ((selector key, config value key), ...), filled by fill_form()
+    forms = {}
+    # Extra request patterns a lean_mode browser blocks for this store, e.g. its image CDN
+    lean_blocked_urls = ()
+
+    def __init__(self, config, pool=None, sessions=None):
+        self.config = config
+        self.base_url = (config.get("base_url") or self.default_base_url).rstrip("/")
+        self.pool = pool
+        self.sessions = sessions
+        self.driver = None
+        self.waiter = None
+        self.cancel_event = threading.Event()
+        self.tracer = Tracer(self.store)
+        self.selector_registry = get_registry(config.get("selector_cache", DEFAULT_CACHE_PATH))
+        self.schedule = RefreshSchedule.for_store(config)
+        # Set by the dispatcher: step progress is journaled under job_id so a crashed run can resume
+        self.job_id = None
+        self.resume_steps = frozenset()  # steps an interrupted earlier run of this job completed
+        self.alert_at = None  # time.time() of the alert, for the alert-to-step metrics
+        self.failed_step = None  # which step stopped the last run ("error" if it raised)
+
+    # -----------------------------
+    # Driver lifecycle
+    # -----------------------------
+    @traced_step()
+    def start_driver(self):
+        """Lease a warm browser from the pool, or cold-start one if running without a pool."""
+        if self.pool:
+            driver = self.pool.acquire()
+        else:
+            driver = self.create_driver()
+        return self.attach_driver(driver)
+
+    def attach_driver(self, driver):
+        self.driver = driver
+        self.waiter = Waiter(
+            driver, self.store,
+            budgets=self.config.get("wait_budgets"),
+            poll_interval=self.config.get("wait_poll_interval", DEFAULT_POLL_INTERVAL),
+            tracer=self.tracer
+        )
+        return driver
+
+    def close_driver(self):
+        if self.pool:
+            logger.info("Script finished — returning browser to pool")
+            self.pool.release(self.driver)
+        else:
+            logger.info("Script finished — closing browser")
+            self.driver.quit()
+        self.driver = None
+
+    def create_driver(self, slot=None):
+        """
+        Launch a new Chrome instance (also used as the browser pool factory).
+        Pool slots get a persistent profile from the session store so sign-in survives restarts.
+        In lean_mode the window has a fixed small size, background throttling is off and
+        images, fonts, media and trackers are blocked (except lean_allowlist matches).
+        """
+        lean = self.config.get("lean_mode", False)
+        logger.info(f"Starting {'lean ' if lean else ''}browser for {self.name}...")
+        start = time.perf_counter()
+        options = uc.ChromeOptions()
+        if self.config.get("headless", False):
+            options.add_argument("--headless=new")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        if lean:
+            add_lean_options(options)
+
+        # Resolved once per process (and cached on disk across restarts) — no probing per launch
+        paths = get_driver_paths()
+        if paths.chrome_binary:
+            options.binary_location = paths.chrome_binary
+        else:
+            logger.warning("Could not detect Chrome/Chromium automatically — falling back to system default")
+        if not paths.chromedriver:
+            logger.warning("chromedriver not found — relying on undetected-chromedriver's default")
+
+        user_data_dir = self.sessions.profile_dir(self.store, slot) if self.sessions else None
+
+        driver = uc.Chrome(
+            options=options,
+            user_data_dir=user_data_dir,
+            driver_executable_path=paths.chromedriver,
+            version_main=paths.version_main,
+            use_subprocess=True
+        )
+        if lean:
+            size_window(driver, self.config.get("lean_viewport"))
+            block_requests(driver, blocked_url_patterns(self.lean_blocked_urls, self.config.get("lean_allowlist", ())))
+        else:
+            try:
+                driver.maximize_window()
+            except:
+                logger.warning("Could not maximize window — possibly running headless")
+        BROWSER_LAUNCHES.inc(store=self.store, mode="lean" if lean else "default")
+        BROWSER_LAUNCH_SECONDS.observe(time.perf_counter() - start, store=self.store)
+        return driver
+
+    def open(self, url):
+        """Navigate to url, recorded as a page_load span."""
+        with self.tracer.span("page_load", "page", url=url):
+            self.driver.get(url)
+
+    def find_first(self, key, step, usable=True, timeout=None, quick_timeout=1.0):
+        """
+        Element for whichever of a selector's candidate locators shows up, or None.
+        The locator that worked last run is tried on its own for `quick_timeout`
+        seconds; after that every candidate is checked in one script call per poll
+        for the rest of the step's budget. The winner and its find time are remembered.
+        """
+        candidates = self.selector_registry.rank(self.store, key, self.selectors[key])
+        timeout = self.waiter.budget(step) if timeout is None else timeout
+        start = time.perf_counter()
+        found = None
+        if self.selector_registry.last_good(self.store, key) and len(candidates) > 1:
+            found = self.waiter.until(first_match(candidates[:1], usable), step,
+                                      timeout=min(quick_timeout, timeout), required=False)
+        if not found:
+            remaining = max(timeout - (time.perf_counter() - start), self.waiter.poll_interval)
+            found = self.waiter.until(first_match(candidates, usable), step, timeout=remaining, required=False)
+
+        if not found:
+            self.selector_registry.record_miss(self.store, key)
+            return None
+        index, element = found
+        self.selector_registry.record_hit(self.store, key, candidates[index], time.perf_counter() - start)
+        logger.info(f"Found '{key}' via {candidates[index][1]}")
+        return element
+
+    def fill_form(self, name):
+        """Fill one of the store's `forms` with a single script call, typing only fields the page rejects."""
+        profile = compile_form(name, self.forms[name], self.selectors, self.config)
+        with self.tracer.span(f"fill_{name}", category="form", fields=len(profile)) as span:
+            typed = profile.fill(self.driver)
+            span["attrs"] = {"typed": typed}
+        logger.info(f"Filled {name} form ({len(profile)} fields, {typed} typed)")
+        return True
+
+    def locator(self, key, **values):
+        """Selector from the store's table; values fill placeholders such as {account_name}."""
+        by, selector = self.selectors[key]
+        return by, selector.format(**values) if values else selector
+
+    def screenshot(self, label):
+        """Save a debug screenshot as <screenshot_dir>/<store>_<label>_<timestamp>.png."""
+        if not self.driver:
+            return None
+        directory = self.config.get("screenshot_dir", "screenshots")
+        path = os.path.join(directory, f"{self.store}_{label}_{time.strftime('%Y%m%d-%H%M%S')}.png")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self.driver.save_screenshot(path)
+            logger.info(f"Saved screenshot {path}")
+            return path
+        except Exception as e:
+            logger.warning(f"Could not save screenshot {path}: {e}")
+            return None
+
+    # -----------------------------
+    # Sessions
+    # -----------------------------
+    def login(self):
+        raise NotImplementedError
+
+    def ensure_logged_in(self):
+        """Skip the full sign-in flow when the persistent profile still holds a valid session."""
+        login = lambda: self.call_step("login")
+        if not self.sessions:
+            return login()
+        return self.sessions.ensure_logged_in(self.store, self.driver, login, self._session_slot())
+
+    def refresh_session(self, driver=None):
+        """Sign in again on a pooled browser (`driver`, or any leased one) so the next checkout finds a fresh session."""
+        try:
+            if driver is not None:
+                self.attach_driver(driver)
+            else:
+                self.start_driver()
+            if not self.call_step("login"):
+                return False
+            if self.sessions:
+                self.sessions.save(self.store, self.driver, self._session_slot())
+            return True
+        finally:
+            if self.waiter:
+                self.waiter.report()
+            if self.driver:
+                self.close_driver()
+
+    # -----------------------------
+    # Pipeline
+    # -----------------------------
+    def call_step(self, name):
+        """Run one step method under a trace span; an exception counts as a failed step."""
+        start = time.perf_counter()
+        with self.tracer.span(name) as span, log_context(step=name):
+            try:
+                result = getattr(self, name)()
+            except Exception as e:
+                logger.error(f"{self.name} step '{name}' raised: {e}")
+                span["attrs"] = {"error": repr(e)}
+                result = False
+            if not result:
+                span["outcome"] = "failed"
+            STEP_SECONDS.observe(time.perf_counter() - start, store=self.store, step=name,
+                                 outcome="ok" if result else "failed")
+            return bool(result)
+
+    def run_step(self, step):
+        """Run a Step with its retries; False means the pipeline should stop."""
+        if step.until_in_stock:
+            return self._until_in_stock(step)
+
+        for attempt in range(step.retries + 1):
+            if self.cancel_event.is_set():
+                return False
+            if attempt:
+                logger.info(f"Retrying {self.name} step '{step.name}' ({attempt}/{step.retries})")
+            if self.call_step(step.name):
+                return True
+
+        if step.required:
+            logger.error(f"{self.name} step '{step.name}' failed — stopping")
+            self.screenshot(step.name)
+            return False
+        logger.info(f"{self.name} step '{step.name}' did not complete — continuing")
+        return True
+
+    def _until_in_stock(self, step):
+        attempt = 0
+        started_at = self.alert_at or time.time()
+        while True:
+            attempt += 1
+            logger.info(f"Attempt #{attempt} — Checking product stock...")
+            if self.call_step(step.name):
+                return True
+            if self.schedule.expired(started_at):
+                logger.warning(f"{self.name} giving up — not in stock within max_job_lifetime "
+                               f"({self.schedule.max_lifetime}s)")
+                self.failed_step = "expired"
+                return False
+            interval = self.schedule.delay(attempt)
+            logger.info(f"Product not in stock — refreshing in {interval:g} seconds")
+            if self.cancel_event.wait(interval):
+                logger.info(f"{self.name} bot cancelled while waiting for stock")
+                return False
+
+    def _session_slot(self):
+        """Pool slot of the current browser, whose profile holds its own session (None: throwaway profile)."""
+        return getattr(self.driver, "_pool_slot", None)
+
+    def _journal_step(self, name, status, flush=False):
+        if self.job_id is None:
+            return
+        journal = get_journal(self.config.get("job_journal", DEFAULT_JOURNAL_PATH))
+        journal.step(self.job_id, name, status, profile=self.config.get("profile"))
+        if flush:
+            journal.flush()
+
+    def confirm_order(self):
+        """
+        Call right before clicking the final order button. Whether to really
+        order (place_order), journaled to disk first so a run that dies after
+        this point is never retried into a second order.
+        """
+        if not self.config.get("place_order", False):
+            return False
+        self._journal_step("order", "placing", flush=True)
+        return True
+
+    def run(self):
+        self.failed_step = None
+        try:
+            self.start_driver()
+            for step in self.steps:
+                if step.durable and step.name in self.resume_steps:
+                    logger.info(f"{self.name} step '{step.name}' was completed before the restart — skipping")
+                    self._journal_step(step.name, "done")
+                    continue
+                if not self.run_step(step):
+                    if self.failed_step is None:
+                        self.failed_step = "cancelled" if self.cancel_event.is_set() else step.name
+                    return False
+                self._journal_step(step.name, "done")
+                if self.alert_at:
+                    ALERT_TO_STEP.observe(time.time() - self.alert_at, store=self.store, step=step.name)
+            return True
+
+        except Exception as e:
+            logger.error(f"{self.name} bot failed: {e}")
+            self.failed_step = "error"
+            self.screenshot("error")
+            return False
+        finally:
+            CHECKOUTS.inc(store=self.store, outcome="failed" if self.failed_step else "succeeded",
+                          reason=self.failed_step or "")
+            if self.waiter:
+                self.waiter.report()
+            if self.driver:
+                self.close_driver()
+            self.selector_registry.save()
+            if self.job_id is not None:
+                get_journal(self.config.get("job_journal", DEFAULT_JOURNAL_PATH)).flush()
+            self.tracer.export(self.config.get("trace_dir", "traces"), self.config.get("trace_format", "jsonl"))
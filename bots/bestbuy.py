@@ -1,303 +1,204 @@
-import time
-import os
-import platform
-import shutil
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, StaleElementReferenceException
+from selenium.common.exceptions import ElementClickInterceptedException, StaleElementReferenceException
 from utils.logger import logger
-
-class BestBuyBot:
-    def __init__(self, config):
-        self.config = config
-        self.driver = None
-
-    def start_driver(self):
-        logger.info("Starting browser for BestBuy...")
-        options = uc.ChromeOptions()
-        if self.config.get("headless", False):
-            options.add_argument("--headless=new")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-
-        # --------- Cross-Platform Chrome Binary Detection ---------
-        system = platform.system().lower()
-        print(f"Detected OS: {system}")
-        chrome_binary = None
-        if system == "linux":
-            # Prefer chromium, fallback to google-chrome
-            chrome_binary = shutil.which("chromium") or shutil.which("chromium-browser") or shutil.which("google-chrome")
-        elif system == "darwin":  # macOS
-            chrome_binary = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-        elif system == "windows":
-            possible_paths = [
-                os.path.join(os.environ.get("PROGRAMFILES", ""), "Google/Chrome/Application/chrome.exe"),
-                os.path.join(os.environ.get("PROGRAMFILES(X86)", ""), "Google/Chrome/Application/chrome.exe"),
-                os.path.join(os.environ.get("LOCALAPPDATA", ""), "Google/Chrome/Application/chrome.exe"),
-            ]
-            chrome_binary = next((p for p in possible_paths if os.path.exists(p)), None)
-
-        if chrome_binary:
-            options.binary_location = chrome_binary
-            logger.info(f"Using Chrome binary: {chrome_binary}")
-        else:
-            logger.warning("Could not detect Chrome/Chromium automatically — falling back to system default")
-
-        # --------- Cross-Platform Chromedriver Detection ---------
-        driver_path = shutil.which("chromedriver")
-        if not driver_path:
-            logger.warning("chromedriver not found in PATH — relying on undetected-chromedriver's default")
-            driver_path = None
-
-        self.driver = uc.Chrome(
-            options=options,
-            driver_executable_path=driver_path,
-            use_subprocess=True
-        )
-        try:
-            self.driver.maximize_window()
-        except:
-            logger.warning("Could not maximize window — possibly running headless")
-
-        return self.driver
+from utils.waits import text_changed
+from utils.selectors import first_match
+from bots.base import BaseBot, Step
+
+
+class BestBuyBot(BaseBot):
+    store = "bestbuy"
+    name = "BestBuy"
+    default_base_url = "https://www.bestbuy.com"
+
+    steps = [
+        Step("ensure_logged_in"),
+        Step("check_stock_and_add", until_in_stock=True, durable=True),
+        Step("go_to_checkout"),
+        Step("continue_to_payment"),
+        Step("fill_shipping", required=False),
+        Step("fill_payment", required=False),
+        Step("place_order"),
+    ]
+
+    selectors = {
+        "account_button": (By.XPATH, "//span[contains(@class, 'line-clamp') and text()='Account']"),
+        "sign_in_link": (By.XPATH, "//a[@data-testid='signInButton' and text()='Sign In']"),
+        "email": (By.ID, "fld-e"),
+        "submit": (By.CLASS_NAME, "cia-form__controls__submit"),
+        "password": (By.ID, "fld-p1"),
+        # The "Use password" option has shipped under several different markups; find_first learns which is live
+        "use_password": [
+            (By.XPATH, "//span[contains(text(),'Use password')]"),
+            (By.XPATH, "//button[contains(., 'Use password')]"),
+            (By.XPATH, "//button[contains(text(), 'password')]"),
+            (By.XPATH, "//button[contains(@class,'cia-button') and contains(.,'password')]"),
+            (By.CSS_SELECTOR, "button[data-track*='SignIn_Password']"),
+        ],
+        "account_header": (By.XPATH, "//span[contains(text(), '{account_name}')]"),
+        "add_to_cart": (By.XPATH, "//button[@data-test-id='add-to-cart']//span[text()='Add to cart']/.."),
+        "cart_count": (By.CSS_SELECTOR, ".cart-icon .dot"),
+        "added_to_cart": (By.CSS_SELECTOR, ".c-modal-window .added-to-cart"),
+        "checkout": (By.XPATH, "//button[@class='btn btn-lg btn-block btn-primary' and @data-track='Checkout - Top']"),
+        "continue_to_payment": (By.XPATH, "//span[text()='Continue to Payment Information']"),
+        "first_name": (By.ID, "first-name"),
+        "last_name": (By.ID, "last-name"),
+        "address": (By.ID, "address-input"),
+        "city": (By.ID, "city"),
+        "state": (By.ID, "state"),
+        "zip": (By.ID, "postalCode"),
+        "phone": (By.ID, "phone"),
+        "card_number": (By.ID, "number"),
+        "card_exp": (By.ID, "expirationDate"),
+        "card_cvv": (By.ID, "cvv"),
+        "continue_to_review": (By.XPATH, "//span[text()='Continue to Payment Information']/.."),
+        "place_order": (By.XPATH, "//button[@data-track='Place your Order - In-line']"),
+    }
+
+    lean_blocked_urls = ("*pisces.bbystatic.com/image*",)
+
+    forms = {
+        "shipping": (
+            ("first_name", "first_name"), ("last_name", "last_name"), ("address", "address"),
+            ("city", "city"), ("state", "state"), ("zip", "zip"), ("phone", "phone"),
+        ),
+        "payment": (
+            ("card_number", "card_number"), ("card_exp", "card_exp"), ("card_cvv", "card_cvv"),
+            ("first_name", "first_name"), ("last_name", "last_name"),
+        ),
+    }
 
     def login(self):
-        wait = WebDriverWait(self.driver, 40)
-        self.driver.get("https://www.bestbuy.com/?intl=nosplash")
+        self.open(f"{self.base_url}/?intl=nosplash")
         logger.info("Opened BestBuy homepage")
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        self.waiter.until(EC.presence_of_element_located((By.TAG_NAME, "body")), "page_load")
 
-        try:
-            account_button = wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//span[contains(@class, 'line-clamp') and text()='Account']"))
-            )
-            account_button.click()
-            logger.info("Clicked Account button")
-            time.sleep(1)
-        except:
-            logger.error("Could not find Account button — page layout may have changed")
-            self.driver.save_screenshot("debug_login_failed.png")
-            return False
+        self.waiter.until(EC.element_to_be_clickable(self.locator("account_button")), "login").click()
+        logger.info("Clicked Account button")
 
-        try:
-            wait.until(EC.element_to_be_clickable(
-                (By.XPATH, "//a[@data-testid='signInButton' and text()='Sign In']")
-            )).click()
-            logger.info("Clicked Sign in link")
-        except:
-            logger.error("Could not find Sign in link")
-            self.driver.save_screenshot("debug_login_failed.png")
-            return False
+        self.waiter.until(EC.element_to_be_clickable(self.locator("sign_in_link")), "login").click()
+        logger.info("Clicked Sign in link")
 
-        email_input = wait.until(EC.presence_of_element_located((By.ID, "fld-e")))
+        email_input = self.waiter.until(EC.presence_of_element_located(self.locator("email")), "login")
         email_input.send_keys(self.config["email"])
         logger.info(f"Entered email: {self.config['email']}")
 
-        continue_btn = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "cia-form__controls__submit")))
-        continue_btn.click()
+        self.waiter.until(EC.element_to_be_clickable(self.locator("submit")), "login").click()
         logger.info("Clicked Continue after email")
 
-        time.sleep(2)
+        # Wait for whichever comes first: the password field or a 'Use password' option
+        self.waiter.until(
+            EC.any_of(
+                EC.presence_of_element_located(self.locator("password")),
+                first_match(self.selectors["use_password"], usable=False)
+            ),
+            "login", required=False
+        )
 
-        try:
-            self.driver.find_element(By.ID, "fld-p1")
+        if self.driver.find_elements(*self.locator("password")):
             logger.info("Password field already visible — skipping 'Use password' button")
-        except:
-            use_password_clicked = False
-            possible_xpaths = [
-                "//span[contains(text(),'Use password')]",
-                "//button[contains(., 'Use password')]",
-                "//button[contains(text(), 'password')]",
-                "//button[contains(@class,'cia-button') and contains(.,'password')]",
-                "//button[contains(@data-track, 'SignIn_Password')]"
-            ]
-            for xpath in possible_xpaths:
+        else:
+            use_password_el = self.find_first("use_password", "login", timeout=5)
+            if use_password_el:
                 try:
-                    use_password_el = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    try:
-                        use_password_el.click()
-                    except (ElementClickInterceptedException, StaleElementReferenceException):
-                        self.driver.execute_script("arguments[0].click();", use_password_el)
-                    logger.info(f"Clicked 'Use password' via selector: {xpath}")
-                    use_password_clicked = True
-                    break
-                except TimeoutException:
-                    continue
-
-            if not use_password_clicked:
+                    use_password_el.click()
+                except (ElementClickInterceptedException, StaleElementReferenceException):
+                    self.driver.execute_script("arguments[0].click();", use_password_el)
+                logger.info("Clicked 'Use password'")
+            else:
                 logger.warning("'Use password' element not found — maybe password field is already visible")
 
-        pwd_input = wait.until(EC.presence_of_element_located((By.ID, "fld-p1")))
+        pwd_input = self.waiter.until(EC.presence_of_element_located(self.locator("password")), "login")
         pwd_input.send_keys(self.config["password"])
         logger.info("Entered password")
 
-        sign_in_btn = wait.until(
-            EC.element_to_be_clickable((By.CLASS_NAME, "cia-form__controls__submit"))
-        )
-        sign_in_btn.click()
+        self.waiter.until(EC.element_to_be_clickable(self.locator("submit")), "login").click()
         logger.info("Clicked 'Continue' to sign in")
 
         if self.config.get("account_name"):
-            try:
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located(
-                        (By.XPATH, f"//span[contains(text(), '{self.config['account_name']}')]")
-                    )
-                )
+            header = self.locator("account_header", account_name=self.config["account_name"])
+            if self.waiter.until(EC.presence_of_element_located(header), "login_confirm", required=False):
                 logger.info(f"Login confirmed — detected account name: {self.config['account_name']}")
-            except:
+            else:
                 logger.warning(f"Could not confirm login for account '{self.config['account_name']}'")
         else:
             logger.warning("No account_name provided — cannot confirm login header")
-        
+
         return True
 
     def check_stock_and_add(self):
-        wait = WebDriverWait(self.driver, 30)
-        self.driver.get(self.config["product_url"])
+        self.open(self.config["product_url"])
         logger.info(f"Navigated to product page: {self.config['product_url']}")
 
-        try:
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "main")))
+        if self.waiter.until(EC.presence_of_element_located((By.TAG_NAME, "main")), "page_load", required=False):
             logger.info("Product page loaded")
-        except:
+        else:
             logger.warning("Product main content not fully loaded — proceeding anyway")
 
-        try:
-            add_btn = wait.until(EC.element_to_be_clickable(
-                (By.XPATH, "//button[@data-test-id='add-to-cart']//span[text()='Add to cart']/..")
-            ))
-            add_btn.click()
-            logger.info("Clicked Add to Cart — waiting 5 seconds")
-            time.sleep(5)
-            return True
-        except:
+        add_btn = self.waiter.until(EC.element_to_be_clickable(self.locator("add_to_cart")), "page_load", required=False)
+        if not add_btn:
             logger.warning("Product out of stock or Add to Cart button not clickable")
-            self.driver.save_screenshot("debug_add_to_cart.png")
             return False
 
+        cart_count = self.waiter.text_of(self.locator("cart_count"))
+        add_btn.click()
+        logger.info("Clicked Add to Cart — waiting for cart to update")
+        confirmed = self.waiter.until(
+            EC.any_of(
+                text_changed(self.locator("cart_count"), cart_count),
+                EC.presence_of_element_located(self.locator("added_to_cart"))
+            ),
+            "add_to_cart", required=False
+        )
+        if not confirmed:
+            logger.warning("No add-to-cart confirmation seen — continuing to cart anyway")
+        return True
+
     def go_to_checkout(self):
-        self.driver.get("https://www.bestbuy.com/cart")
+        self.open(f"{self.base_url}/cart")
         logger.info("Navigated to cart page")
 
-        try:
-            checkout_btn = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, "//button[@class='btn btn-lg btn-block btn-primary' and @data-track='Checkout - Top']")
-                )
-            )
-            checkout_btn.click()
-            logger.info("Clicked Checkout")
-            return True
-        except:
+        checkout_btn = self.waiter.until(EC.element_to_be_clickable(self.locator("checkout")), "cart", required=False)
+        if not checkout_btn:
             logger.error("Could not find Checkout button — maybe cart is empty or page layout changed")
-            self.driver.save_screenshot("debug_checkout_click.png")
             return False
+        checkout_btn.click()
+        logger.info("Clicked Checkout")
+        return True
 
     def continue_to_payment(self):
-        wait = WebDriverWait(self.driver, 20)
-        try:
-            cont_btn = wait.until(EC.element_to_be_clickable(
-                (By.XPATH, "//span[text()='Continue to Payment Information']")
-            ))
-            cont_btn.click()
-            logger.info("Clicked 'Continue to Payment Information'")
-            time.sleep(2)
-            return True
-        except:
-            logger.error("Could not find 'Continue to Payment Information' button")
-            self.driver.save_screenshot("debug_continue_to_payment.png")
-            return False
+        self.waiter.until(EC.element_to_be_clickable(self.locator("continue_to_payment")), "checkout").click()
+        logger.info("Clicked 'Continue to Payment Information'")
+        self.waiter.until(EC.presence_of_element_located(self.locator("card_number")), "payment", required=False)
+        return True
 
     def fill_shipping(self):
-        wait = WebDriverWait(self.driver, 20)
-        try:
-            self.driver.find_element(By.ID, "first-name").clear()
-            self.driver.find_element(By.ID, "first-name").send_keys(self.config["full_name"].split()[0])
-            self.driver.find_element(By.ID, "last-name").send_keys(self.config["full_name"].split()[-1])
-            self.driver.find_element(By.ID, "address-input").send_keys(self.config["address"])
-            self.driver.find_element(By.ID, "city").send_keys(self.config["city"])
-            self.driver.find_element(By.ID, "state").send_keys(self.config["state"])
-            self.driver.find_element(By.ID, "postalCode").send_keys(self.config["zip"])
-            self.driver.find_element(By.ID, "phone").send_keys(self.config["phone"])
-            logger.info("Filled shipping info")
-            return True
-        except:
+        if not self.driver.find_elements(*self.locator("first_name")):
             logger.info("Shipping info may already be saved — skipping")
             return False
+        return self.fill_form("shipping")
 
     def fill_payment(self):
-        wait = WebDriverWait(self.driver, 20)
-        try:
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(1)
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
 
-            self.driver.find_element(By.ID, "number").send_keys(self.config["card_number"])
-            self.driver.find_element(By.ID, "expirationDate").send_keys(self.config["card_exp"])
-            self.driver.find_element(By.ID, "cvv").send_keys(self.config["card_cvv"])
-            self.driver.find_element(By.ID, "first-name").send_keys(self.config["full_name"].split()[0])
-            self.driver.find_element(By.ID, "last-name").send_keys(self.config["full_name"].split()[-1])
-            logger.info("Entered card details and name")
+        self.waiter.until(EC.presence_of_element_located(self.locator("card_number")), "payment")
+        self.fill_form("payment")
 
-            cont_btn = wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//span[text()='Continue to Payment Information']/.."))
-            )
-            cont_btn.click()
-            logger.info("Clicked 'Continue to Review'")
-            time.sleep(2)
-            return True
-        except Exception as e:
-            logger.error(f"Payment filling failed: {e}")
-            return False
+        cont_btn = self.waiter.until(EC.element_to_be_clickable(self.locator("continue_to_review")), "payment")
+        cont_btn.click()
+        logger.info("Clicked 'Continue to Review'")
+        self.waiter.until(
+            EC.any_of(EC.staleness_of(cont_btn), EC.invisibility_of_element(cont_btn)),
+            "payment", required=False
+        )
+        return True
 
     def place_order(self):
-        wait = WebDriverWait(self.driver, 20)
-        try:
-            place_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@data-track='Place your Order - In-line']")))
-            if self.config.get("place_order", False):
-                place_btn.click()
-                logger.info("ORDER PLACED SUCCESSFULLY!")
-            else:
-                logger.info("Dry run: not placing order (set place_order=true in config.json to buy)")
-            return True
-        except:
-            logger.error("Could not find Place Order button")
-            return False
-
-    def run(self):
-        try:
-            self.start_driver()
-            if not self.login():
-                return False
-
-            # Retry loop
-            in_stock = False
-            while not in_stock:
-                in_stock = self.check_stock_and_add()
-                if not in_stock:
-                    logger.info("Product not in stock — retrying in 10 seconds...")
-                    time.sleep(10)
-
-            if not self.go_to_checkout():
-                return False
-
-            if not self.continue_to_payment():
-                return False
-
-            self.fill_shipping()
-            self.fill_payment()
-            self.place_order()
-
-            return True
-
-        except Exception as e:
-            logger.error(f"BestBuy bot failed: {e}")
-            return False
-        finally:
-            if self.driver:
-                logger.info("Script finished — closing browser")
-                self.driver.quit()
-
+        place_btn = self.waiter.until(EC.element_to_be_clickable(self.locator("place_order")), "place_order")
+        if self.confirm_order():
+            place_btn.click()
+            logger.info("ORDER PLACED SUCCESSFULLY!")
+        else:
+            logger.info("Dry run: not placing order (set place_order=true in config.json to buy)")
+        return True
@@ -1,5 +0,0 @@
-from .target import TargetBot
-from .walmart import WalmartBot
-from .bestbuy import BestBuyBot
-
-__all__ = ['TargetBot', 'WalmartBot', 'BestBuyBot']
\ No newline at end of file
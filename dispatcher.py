@@ -1,66 +1,530 @@
 # dispatcher.py
 import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict
 from bots import TargetBot, WalmartBot, BestBuyBot
-from utils.config import load_config, get_store_config
-from utils.logger import logger
+from utils.config import ConfigWatcher
+from utils.browser_pool import BrowserPool
+from utils.sessions import SessionStore
+from utils.dedup import AlertCoalescer
+from utils.products import ProductIndex, ProductKey
+from utils.stock_probe import StockProbe, IN_STOCK
+from utils.monitor import WatchlistMonitor
+from utils.limits import PurchaseLimiter, DEFAULT_PURCHASE_LOG
+from utils.process_pool import CheckoutProcessPool
+from utils.journal import get_journal, DEFAULT_JOURNAL_PATH
+from utils.metrics import (DISPATCHES, QUEUE_WAIT, JOB_RUN, JOBS, POOL_BROWSERS, POOL_OVERFLOW,
+                           serve_metrics)
+from utils.logger import logger, log_context
 import re
 
+# Keep this many finished jobs around for !status lookups
+MAX_FINISHED_JOBS = 500
+
+
+class Job:
+    """A single checkout run queued on the dispatcher."""
+
+    def __init__(self, job_id, store, url, bot, config):
+        self.id = job_id
+        self.store = store
+        self.url = url
+        self.bot = bot
+        self.config = config  # settings snapshot the job was created with; reloads don't touch it
+        self.profile_results = {}  # profile -> "succeeded" / "failed" / "limit reached" / "may have ordered"
+        self.resume = None  # JournalEntry of the interrupted run this job picks up from
+        self.status = "queued"  # (watching ->) queued -> running -> succeeded/failed/cancelled/timed_out/expired
+        self.alerts = 1  # alerts coalesced onto this job
+        self.result = None
+        self.created_at = time.time()
+        self.queued_at = self.created_at
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self._future = asyncio.get_running_loop().create_future()
+
+    @property
+    def done(self):
+        return self._future.done()
+
+    @property
+    def wait_time(self):
+        """Seconds spent in the queue before a worker picked the job up."""
+        return (self.started_at or self.finished_at or time.time()) - self.queued_at
+
+    @property
+    def run_time(self):
+        if not self.started_at:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    async def wait(self):
+        """Wait for the job to finish and return whether the checkout succeeded."""
+        return await asyncio.shield(self._future)
+
+    def describe(self):
+        profiles = ", ".join(f"{name} {outcome}" for name, outcome in self.profile_results.items())
+        return (f"job {self.id} [{self.store}] {self.status} — waited {self.wait_time:.1f}s, "
+                f"ran {self.run_time:.1f}s — {self.url}" + (f" ({profiles})" if profiles else ""))
+
+    def _finish(self, status, result=False):
+        self.status = status
+        self.result = result
+        self.finished_at = time.time()
+        if not self._future.done():
+            self._future.set_result(result)
+
+
 class BotDispatcher:
-    def __init__(self):
-        self.config = load_config()
+    def __init__(self, config=None):
+        # config.json is watched for changes; self.config is always the latest validated snapshot
+        self.config_watcher = config or ConfigWatcher()
+        self.config_watcher.subscribe(self._on_config_reload)
+        self._loop = None
         self.bots = {
             'target': TargetBot,
             'walmart': WalmartBot,
             'bestbuy': BestBuyBot
         }
+        self.sessions = self._create_session_store()
+        self.pools = self._create_pools()
 
-    def identify_store(self, url):
-        """Identify which store the URL belongs to"""
-        url_lower = url.lower()
-        if 'target.com' in url_lower:
-            return 'target'
-        elif 'walmart.com' in url_lower:
-            return 'walmart'
-        elif 'bestbuy.com' in url_lower:
-            return 'bestbuy'
-        else:
+        self.jobs = OrderedDict()
+        self.queues = {}
+        self.workers = []
+        self.store_stats = {
+            store_type: {"completed": 0, "failed": 0, "wait_time": 0.0, "run_time": 0.0}
+            for store_type in self.bots
+        }
+        # Every dispatch, merged alert, completed step and outcome goes to the journal; jobs a crash
+        # left unfinished are resumed once the dispatcher starts, and new ids continue after them
+        self.journal = get_journal(self.config.get("job_journal", DEFAULT_JOURNAL_PATH))
+        self.journal.compact()
+        self._interrupted = self.journal.unfinished()
+        self._job_ids = itertools.count(self.journal.last_job_id() + 1)
+        self.coalescer = AlertCoalescer(ttl=self.config.get("dedup_ttl", 300))
+        self.products = ProductIndex()
+        self.probe = self._create_stock_probe()
+        self.monitor = self._create_monitor()
+        self.limiter = PurchaseLimiter(
+            path=self.config.get("purchase_log", DEFAULT_PURCHASE_LOG),
+            window=self.config.get("purchase_limit_window_hours", 168) * 3600
+        )
+        self.process_pool = self._create_process_pool()
+        self.metrics_server = None
+
+    @property
+    def config(self):
+        return self.config_watcher.current
+
+    # -----------------------------
+    # Browser pools
+    # -----------------------------
+    def _create_pools(self):
+        """One browser pool per priority store, sized by browser_pool_size (int or per-store dict)."""
+        if "profiles" in self.config:
+            # Profile checkouts run in worker processes, which start their own browsers
+            return {}
+        pool_size = self.config.get("browser_pool_size", 1)
+        max_memory_mb = self.config.get("browser_pool_max_memory_mb")
+        pools = {}
+        for store_type in self.config.by_priority(self.bots):
+            size = pool_size.get(store_type, 0) if isinstance(pool_size, dict) else pool_size
+            if size > 0:
+                pools[store_type] = BrowserPool(
+                    store_type,
+                    self._driver_factory(store_type),
+                    size=size,
+                    max_memory_mb=max_memory_mb
+                )
+        POOL_BROWSERS.add_source(lambda: self._pool_samples(pools))
+        POOL_OVERFLOW.add_source(lambda: [({"store": store}, pool.stats["overflow"]) for store, pool in pools.items()])
+        return pools
+
+    def _pool_samples(self, pools):
+        for store_type, pool in pools.items():
+            leased, idle, size = pool.utilization()
+            yield {"store": store_type, "state": "leased"}, leased
+            yield {"store": store_type, "state": "idle"}, idle
+            yield {"store": store_type, "state": "size"}, size
+
+    def _driver_factory(self, store_type):
+        bot_class = self.bots[store_type]
+
+        def factory(slot):
+            store_config = self.config.store_config(store_type)
+            bot = bot_class(store_config, sessions=self.sessions)
+            driver = bot.create_driver(slot)
+            if self.sessions and slot is not None:
+                # Validate (or establish) the profile's session before anyone is waiting on it
+                driver._pool_slot = slot
+                bot.attach_driver(driver)
+                try:
+                    bot.ensure_logged_in()
+                except Exception as e:
+                    logger.warning(f"Could not validate {store_type} session during warm-up: {e}")
+            return driver
+
+        return factory
+
+    def warm_pools(self):
+        """Pre-launch pooled browsers in the background so the first alert skips the cold start."""
+        for pool in self.pools.values():
+            pool.warm()
+        if self.sessions and self.pools:
+            self.sessions.start_refresher(self._refresh_session,
+                                          {store_type: pool.size for store_type, pool in self.pools.items()})
+
+    def close(self):
+        self.config_watcher.stop()
+        if self.process_pool:
+            self.process_pool.close()
+        if self.probe:
+            try:
+                loop = asyncio.get_running_loop()
+                loop.create_task(self.monitor.stop())
+                loop.create_task(self.probe.close())
+            except RuntimeError:
+                pass
+        if self.sessions:
+            self.sessions.stop()
+        for pool in self.pools.values():
+            pool.close()
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+        self.journal.flush()
+
+    # -----------------------------
+    # Persistent sessions
+    # -----------------------------
+    def _create_session_store(self):
+        if not self.config.get("persistent_sessions", True):
             return None
+        return SessionStore(
+            session_dir=self.config.get("session_dir", "sessions"),
+            auth_cookies=self.config.get("session_cookies"),
+            refresh_margin=self.config.get("session_refresh_margin", 1800)
+        )
+
+    def _refresh_session(self, store_type, slot):
+        """Renew the session of the browser that owns `slot`; each slot's profile signs in separately."""
+        pool = self.pools.get(store_type)
+        if not pool:
+            return
+        driver = pool.acquire_slot(slot)
+        if driver is None:
+            logger.info(f"{store_type}: slot {slot} browser is busy or not running — refreshing its session later")
+            return
+        store_config = self.config.store_config(store_type)
+        self.bots[store_type](store_config, pool=pool, sessions=self.sessions).refresh_session(driver)
+
+    # -----------------------------
+    # Profiles
+    # -----------------------------
+    def _create_process_pool(self):
+        """With a "profiles" section, every profile's checkout runs in a worker process."""
+        if "profiles" not in self.config:
+            return None
+        return CheckoutProcessPool(workers=self.config.get("profile_workers"))
+
+    async def _checkout(self, job):
+        """Run the job's checkout for each of its profiles; True if any of them succeeded."""
+        if self.process_pool is None:
+            return await self._checkout_profile(job, job.config.profiles[0], lambda: asyncio.to_thread(job.bot.run))
+
+        profiles = job.config.profiles_for(job.store)
+        runs = [
+            self._checkout_profile(job, profile, lambda profile=profile: self.process_pool.run(
+                self.bots[job.store], job.config.store_config(job.store, job.url, profile=profile), job.cancel_event,
+                resume_steps=job.resume.done_steps(profile) if job.resume else frozenset(), alert_at=job.created_at,
+                job=job.id, store=job.store, profile=profile
+            ))
+            for profile in profiles
+        ]
+        try:
+            results = await asyncio.gather(*runs)
+        finally:
+            # The workers export their own traces; this one holds the dispatch spans
+            job.bot.tracer.export(job.config.get("trace_dir", "traces"), job.config.get("trace_format", "jsonl"))
+        return any(results)
+
+    async def _checkout_profile(self, job, profile, start):
+        """
+        One profile's checkout, within the store's purchase limit for that profile's
+        customer (profiles sharing an email, card or address count as one customer).
+        """
+        product = str(self.products.identity(job.url))
+        customer = job.config.customers[profile]
+        if job.resume and job.resume.ordering(profile):
+            # The interrupted run was clicking the order button; retrying could buy it twice
+            logger.warning(f"{profile} was placing the order for {job.url} when the bot stopped — not retrying, "
+                           f"check the account's orders")
+            self.limiter.commit(job.store, product, customer, profile)
+            job.profile_results[profile] = "may have ordered"
+            return False
+        if not self.limiter.reserve(job.store, product, customer, job.config.purchase_limit(job.store)):
+            job.profile_results[profile] = "limit reached"
+            return False
+
+        result = False
+        try:
+            result = bool(await start())
+        finally:
+            if result and job.config.get("place_order", False):
+                self.limiter.commit(job.store, product, customer, profile)
+            else:
+                self.limiter.release(job.store, product, customer)
+            if self.process_pool is not None:
+                job.profile_results[profile] = "succeeded" if result else "failed"
+        return result
+
+    # -----------------------------
+    # HTTP stock probe
+    # -----------------------------
+    def _create_stock_probe(self):
+        if not self.config.get("stock_probe", True):
+            return None
+        return StockProbe(
+            concurrency=self.config.get("stock_probe_concurrency", 50),
+            max_backoff=self.config.get("stock_probe_max_backoff", 300)
+        )
+
+    # -----------------------------
+    # Watchlist monitor
+    # -----------------------------
+    def _create_monitor(self):
+        if not self.probe:
+            return None
+        return WatchlistMonitor(
+            self.probe,
+            self._on_restock,
+            default_interval=self.config.refresh_interval,
+            windows=self.config.refresh_windows,
+            max_in_flight=self.config.get("stock_probe_concurrency", 50)
+        )
+
+    def _watch_config_products(self):
+        """
+        Put the *_product_url keys and the "watchlist" entries (URL or {url, interval}) on the monitor,
+        and stop watching config products that are no longer listed.
+        """
+        config = self.config
+        entries = [(value, None) for name, value in config.items() if name.endswith("_product_url")]
+        for entry in config.get("watchlist", []):
+            if isinstance(entry, dict):
+                entries.append((entry.get("url"), entry.get("interval")))
+            else:
+                entries.append((entry, None))
+
+        listed = set()
+        for url, interval in entries:
+            resolved = self.products.resolve(url) if url else None
+            if not resolved or not resolved.key or resolved.store not in self.bots:
+                logger.warning(f"Not watching {url!r} — not a Target/Walmart/BestBuy product page")
+                continue
+            listed.add(resolved.key)
+            interval = interval or config.store_config(resolved.store)["refresh_interval"]
+            product = self.monitor.add(resolved.url, resolved.store, key=resolved.key, interval=interval,
+                                       source="config")
+            if product.source == "config":
+                product.interval = interval
+
+        for product in list(self.monitor.products.values()):
+            if product.source != "config" or product.key in listed:
+                continue
+            job = self.coalescer.lookup(product.key)
+            if job and job.status == "watching":
+                # An alert is still waiting on it; keep watching until that job is done
+                product.source = "alert"
+            else:
+                self.monitor.remove(product.key)
+                logger.info(f"Stopped watching {product.key} — no longer in the config")
+
+    # -----------------------------
+    # Config reload
+    # -----------------------------
+    def _on_config_reload(self, old, new):
+        """
+        Apply what can change while running: the refresh interval, dedup TTL and
+        the watched products. Pools, queues and workers keep their startup sizes.
+        Called from the config watcher thread.
+        """
+        self.coalescer.ttl = new.get("dedup_ttl", 300)
+        restart_keys = ("browser_pool_size", "browser_pool_max_memory_mb", "workers_per_store", "job_queue_size",
+                        "persistent_sessions", "session_dir", "stock_probe", "stock_probe_concurrency")
+        changed = [key for key in restart_keys if old.get(key) != new.get(key)]
+        if changed:
+            logger.warning(f"Config changes to {', '.join(changed)} take effect after a restart")
+        if self.monitor is not None and self._loop:
+            self._loop.call_soon_threadsafe(self._apply_watchlist_config, new)
+
+    def _apply_watchlist_config(self, config):
+        self.monitor.default_interval = config.refresh_interval
+        self.monitor.windows = config.refresh_windows
+        self._watch_config_products()
+
+    async def _on_restock(self, product):
+        """Monitor hand-off: release the job waiting on this product, or start a checkout for it."""
+        job = self.coalescer.lookup(product.key)
+        if not job:
+            await self.submit(product.url, probe=False, source="watchlist")
+        elif job.status == "watching":
+            await self._enqueue_watched(job)
+
+    async def _enqueue_watched(self, job):
+        job.status = "queued"
+        job.queued_at = time.time()
+        # Time spent waiting for stock shows up in the run's trace ahead of queue_wait
+        job.bot.tracer.record("stock_probe", "dispatch", job.created_at, job.queued_at - job.created_at,
+                              job_id=job.id, url=job.url)
+        await self.queues[job.store].put(job)
+        logger.info(f"Job {job.id} in stock after {job.queued_at - job.created_at:.1f}s of watching — "
+                    f"queued for {job.store} bot")
+
+    def identify_store(self, url):
+        """Identify which store the URL belongs to (after unwrapping affiliate redirects)"""
+        resolved = self.products.resolve(url)
+        return resolved.store if resolved else None
+
+    # -----------------------------
+    # Job queue
+    # -----------------------------
+    def start(self):
+        """Start the per-store workers. Must be called from the running event loop."""
+        if self.workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self.config_watcher.start()
+        if self.config.get("metrics_port"):
+            self.metrics_server = serve_metrics(self.config["metrics_port"], self.config.get("metrics_host", "127.0.0.1"))
+        if self.monitor is not None:
+            self.monitor.start()
+            self._watch_config_products()
+        queue_size = self.config.get("job_queue_size", 100)
+        workers_per_store = self.config.get("workers_per_store", 2)
+        for store_type in self.bots:
+            count = workers_per_store.get(store_type, 1) if isinstance(workers_per_store, dict) else workers_per_store
+            self.queues[store_type] = asyncio.Queue(maxsize=queue_size)
+            for n in range(count):
+                self.workers.append(asyncio.create_task(self._worker(store_type), name=f"{store_type}-worker-{n}"))
+        logger.info(f"Dispatcher started {len(self.workers)} workers")
+        if self._interrupted:
+            self._loop.create_task(self._resume_jobs(self._interrupted))
+            self._interrupted = []
+
+    async def _resume_jobs(self, entries):
+        """
+        Re-dispatch the jobs the journal shows were never finished by an earlier run.
+        Each profile skips the durable steps it completed (the item already in its cart);
+        one that got as far as clicking the order button is not run again.
+        """
+        for entry in entries:
+            if not self.config.get("resume_jobs", True):
+                self.journal.finish(entry.job, "abandoned")
+                continue
+            job = await self.submit(entry.product or entry.url, source=entry.source, resume=entry)
+            if job:
+                self.journal.finish(entry.job, "resumed")
+                logger.info(f"Resumed interrupted job {entry.job} as job {job.id}: {job.url}")
+            else:
+                self.journal.finish(entry.job, "abandoned")
+                logger.warning(f"Could not resume interrupted job {entry.job} ({entry.product or entry.url}) — "
+                               f"abandoned, check it by hand")
+
+    async def submit(self, url, probe=True, source=None, resume=None):
+        """
+        Queue a checkout for a URL and return its Job immediately,
+        or None if the URL can't be handled or the store's queue is full.
+        Product pages are put on the watchlist monitor first (unless probe=False) and
+        only reach the browser queue once the HTTP probe sees them in stock.
+        Alerts for a product that already has a job attach to it (job.alerts > 1).
+        source (what the alert was, e.g. "SKU: 123") is kept in the job journal;
+        resume is the JournalEntry of an interrupted job this one continues.
+        """
+        self.start()
 
-    async def dispatch(self, url):
-        """Dispatch a single URL to the correct store bot"""
         store_type = self.identify_store(url)
         if not store_type:
             logger.error(f"Unsupported store URL: {url}")
-            return False
+            DISPATCHES.inc(store="unknown", result="unsupported")
+            return None
 
         # Ensure URL is a valid product page
         product_url = await self._resolve_product_url(url, store_type)
         if not product_url:
             logger.warning(f"Could not resolve product URL for {url}")
-            return False
+            DISPATCHES.inc(store=store_type, result="unsupported")
+            return None
 
-        logger.info(f"Dispatching to {store_type} bot for URL: {product_url}")
+        key = self.products.identity(product_url)
+        existing = self.coalescer.lookup(key)
+        if existing:
+            existing.alerts += 1
+            self.coalescer.record_suppressed(store_type)
+            self.journal.alert(existing.id, source)
+            DISPATCHES.inc(store=store_type, result="coalesced")
+            logger.info(f"Coalesced duplicate alert for {key} onto job {existing.id}")
+            return existing
 
-        # Get store-specific config
-        store_config = get_store_config(self.config, store_type, product_url)
-        if not store_config:
-            logger.error(f"No configuration found for {store_type}")
-            return False
+        # Get store-specific config from the current snapshot; the job keeps it even if config.json changes
+        config = self.config
+        store_config = config.store_config(store_type, product_url)
 
-        # Initialize and run the appropriate bot
         bot_class = self.bots.get(store_type)
         if not bot_class:
             logger.error(f"No bot class found for store type: {store_type}")
-            return False
+            return None
 
-        try:
-            bot = bot_class(store_config)
-            # Run the blocking bot in a background thread
-            success = await asyncio.to_thread(bot.run)
-            return success
-        except Exception as e:
-            logger.error(f"Error running {store_type} bot for URL {product_url}: {e}")
+        bot = bot_class(store_config, pool=self.pools.get(store_type), sessions=self.sessions)
+        job = Job(str(next(self._job_ids)), store_type, product_url, bot, config)
+        if self.process_pool is not None:
+            job.cancel_event = self.process_pool.cancel_event()
+        bot.cancel_event = job.cancel_event
+        bot.job_id = job.id
+        bot.alert_at = job.created_at
+        if resume:
+            job.resume = resume
+            bot.resume_steps = resume.done_steps(config.profiles[0])
+            # Past the stock check the item may already be in the cart; don't wait on the monitor again
+            probe = probe and not any(resume.steps.values())
+
+        watched = None
+        if probe and self.monitor is not None and isinstance(key, ProductKey):
+            watched = self.monitor.add(product_url, store_type, key=key,
+                                       interval=store_config.get("refresh_interval"), source="alert")
+
+        # Wait for the monitor unless the product is already known to be in stock (or unreadable over HTTP)
+        if watched and watched.state != IN_STOCK and watched.unknown_streak < self.monitor.max_unknown:
+            job.status = "watching"
+            logger.info(f"Job {job.id} waiting for {key} to come in stock")
+            lifetime = config.get("max_job_lifetime")
+            if lifetime:
+                asyncio.get_running_loop().call_later(lifetime, self._expire_watching, job)
+        else:
+            try:
+                self.queues[store_type].put_nowait(job)
+            except asyncio.QueueFull:
+                logger.error(f"{store_type} job queue is full — dropping {product_url}")
+                self._unwatch(job)
+                DISPATCHES.inc(store=store_type, result="queue_full")
+                return None
+            logger.info(f"Queued job {job.id} for {store_type} bot: {product_url} "
+                        f"(queue depth {self.queues[store_type].qsize()})")
+
+        DISPATCHES.inc(store=store_type, result=job.status)
+        self._remember(job)
+        self.coalescer.register(key, job)
+        self.journal.dispatch(job.id, store_type, url, product_url, source)
+        return job
+
+    async def dispatch(self, url):
+        """Dispatch a single URL to the correct store bot and wait for the result"""
+        job = await self.submit(url)
+        if not job:
             return False
+        return await job.wait()
 
     async def dispatch_multiple(self, urls):
         """Dispatch multiple URLs to their respective store bots concurrently"""
@@ -68,23 +532,141 @@ class BotDispatcher:
         results = await asyncio.gather(*tasks)
         return list(zip(urls, results))
 
+    def get_job(self, job_id):
+        return self.jobs.get(str(job_id))
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or ask a running one to stop at its next check. Returns the job or None."""
+        job = self.get_job(job_id)
+        if not job or job.done:
+            return None
+        job.cancel_event.set()
+        if job.status == "watching":
+            self._unwatch(job)
+        if job.status in ("watching", "queued"):
+            self._finish(job, "cancelled")
+        logger.info(f"Cancellation requested for job {job.id}")
+        return job
+
+    def stats(self):
+        """Per-store queue depth, running jobs and average wait/run times."""
+        running = {}
+        watching = {}
+        for job in self.jobs.values():
+            if job.status == "running":
+                running[job.store] = running.get(job.store, 0) + 1
+            elif job.status == "watching":
+                watching[job.store] = watching.get(job.store, 0) + 1
+
+        report = {}
+        for store_type, totals in self.store_stats.items():
+            finished = totals["completed"] + totals["failed"]
+            queue = self.queues.get(store_type)
+            report[store_type] = {
+                "watching": watching.get(store_type, 0),
+                "queue_depth": queue.qsize() if queue else 0,
+                "running": running.get(store_type, 0),
+                "completed": totals["completed"],
+                "failed": totals["failed"],
+                "avg_wait_time": totals["wait_time"] / finished if finished else 0.0,
+                "avg_run_time": totals["run_time"] / finished if finished else 0.0,
+                "suppressed": self.coalescer.suppressed.get(store_type, 0),
+            }
+        return report
+
+    async def _worker(self, store_type):
+        queue = self.queues[store_type]
+        while True:
+            job = await queue.get()
+            try:
+                if not job.done:
+                    # Everything the job logs, including the bot's thread, carries its id and store
+                    with log_context(job=job.id, store=job.store):
+                        await self._run_job(job)
+            finally:
+                queue.task_done()
+
+    async def _run_job(self, job):
+        job.status = "running"
+        job.started_at = time.time()
+        timeout = job.config.get("job_timeout", 900)
+        logger.info(f"Starting job {job.id} for {job.store} bot after {job.wait_time:.2f}s in queue")
+        # Queue time is part of alert-to-order latency, so it goes in the run's trace too
+        job.bot.tracer.record("queue_wait", "dispatch", job.queued_at, job.wait_time, job_id=job.id, url=job.url)
+        QUEUE_WAIT.observe(job.wait_time, store=job.store)
+
+        # Run the blocking bot in a background thread (or one worker process per profile)
+        task = asyncio.ensure_future(self._checkout(job))
+        status = "failed"
+        result = False
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), timeout)
+            status = "succeeded" if result else "failed"
+        except asyncio.TimeoutError:
+            logger.warning(f"Job {job.id} exceeded {timeout}s — stopping bot")
+            job.cancel_event.set()
+            status = "timed_out"
+            await asyncio.gather(task, return_exceptions=True)
+        except Exception as e:
+            logger.error(f"Error running {job.store} bot for URL {job.url}: {e}")
+
+        if status == "failed" and job.cancel_event.is_set():
+            status = "cancelled"
+        elif status == "failed" and job.bot.failed_step == "expired":
+            status = "expired"
+        self._finish(job, status, bool(result))
+        # Whatever the outcome, the alert is spent; a later restock must not start a checkout for it
+        self._unwatch(job)
+
+        totals = self.store_stats[job.store]
+        totals["completed" if result else "failed"] += 1
+        totals["wait_time"] += job.wait_time
+        totals["run_time"] += job.run_time
+        JOBS.inc(store=job.store, status=status)
+        JOB_RUN.observe(job.run_time, store=job.store)
+        logger.info(f"Finished {job.describe()}")
+
+    def _finish(self, job, status, result=False):
+        job._finish(status, result)
+        self.journal.finish(job.id, status)
+
+    def _expire_watching(self, job):
+        """max_job_lifetime passed while the product was still out of stock; stop waiting on it."""
+        if job.status != "watching":
+            return
+        logger.info(f"Job {job.id} expired after {job.config.get('max_job_lifetime')}s without a restock: {job.url}")
+        self._unwatch(job)
+        self._finish(job, "expired")
+        JOBS.inc(store=job.store, status="expired")
+
+    def _unwatch(self, job):
+        """Stop watching a product an alert added once its job is finished, however it ended; config products stay."""
+        if self.monitor is None:
+            return
+        key = self.products.identity(job.url)
+        product = self.monitor.get(key)
+        if product and product.source == "alert":
+            self.monitor.remove(key)
+
+    def _remember(self, job):
+        self.jobs[job.id] = job
+        while len(self.jobs) > MAX_FINISHED_JOBS:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if not oldest.done:
+                break
+            del self.jobs[oldest_id]
+
     # -----------------------------
     # Helper functions
     # -----------------------------
     async def _resolve_product_url(self, url, store_type):
         """
-        If URL is a search URL or general page, attempt to resolve to the actual product page.
-        Currently basic logic: if it looks like a search, return the first matching SKU/product.
-        For exact product URLs, just return the URL.
+        Map the URL to its store's canonical product page so tracking parameters,
+        affiliate redirects and slug variants all open (and dedupe as) the same product.
+        Search URLs and other non-product pages are returned unwrapped but otherwise as-is
+        (future: can implement scraping logic).
         """
-        # Simple heuristic: exact product pages contain /p/ for Target, /ip/ for Walmart, /site/ for BestBuy
-        url_lower = url.lower()
-        if store_type == 'target' and '/p/' in url_lower:
-            return url
-        elif store_type == 'walmart' and '/ip/' in url_lower:
-            return url
-        elif store_type == 'bestbuy' and '/site/' in url_lower:
-            return url
-
-        # Otherwise, return the URL as-is (future: can implement scraping logic)
-        return url
+        resolved = self.products.resolve(url)
+        if not resolved or resolved.store != store_type:
+            return None
+        return resolved.url
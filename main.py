@@ -2,20 +2,42 @@
 import asyncio
 from utils.discord import DiscordBot
 from dispatcher import BotDispatcher
-from utils.config import load_config, get_bot_config
+from utils.config import ConfigWatcher
+from utils.logger import setup_logger
+from utils.driver_setup import setup_chromedriver
+from utils.ingest import run_with_ingest_process, DEFAULT_SOCKET_PATH
 
-# Load full config
-config = load_config()
-bot_config = get_bot_config(config)
+# Checkout workers are spawned processes that re-import this module, so
+# only start the bot when run as a script
+if __name__ == "__main__":
+    # Resolve Chrome + patched ChromeDriver (cached on disk; only downloads when Chrome changes)
+    setup_chromedriver()
 
-# Get Discord token directly from full config
-DISCORD_TOKEN = config.get("discord_token")  # <-- fix here
+    # Load and validate config.json once; it is re-read automatically when the file changes
+    config = ConfigWatcher()
 
-# Initialize dispatcher
-dispatcher = BotDispatcher()
+    # Log rotation and the Discord message rate limit are configurable
+    setup_logger(
+        level=config.current.get("log_level", "INFO"),
+        max_bytes=config.current.get("log_max_mb", 10) * 1024 * 1024,
+        backups=config.current.get("log_backups", 5),
+        when=config.current.get("log_rotate_when"),
+        message_burst=config.current.get("log_message_burst", 20)
+    )
 
-# Initialize Discord bot
-discord_bot = DiscordBot(DISCORD_TOKEN, dispatcher)
+    # Get Discord token directly from full config
+    DISCORD_TOKEN = config.current.discord_token
 
-# Run bot
-discord_bot.run()
+    # Initialize dispatcher
+    dispatcher = BotDispatcher(config)
+    dispatcher.warm_pools()
+
+    if config.current.get("ingest_process", False):
+        # Discord runs in its own process and hands alerts over a Unix socket
+        run_with_ingest_process(dispatcher, config.path, config.current.get("ingest_socket", DEFAULT_SOCKET_PATH))
+    else:
+        # Initialize Discord bot
+        discord_bot = DiscordBot(DISCORD_TOKEN, dispatcher)
+
+        # Run bot
+        discord_bot.run()
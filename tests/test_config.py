@@ -0,0 +1,59 @@
+import pytest
+from utils.config import Config, ConfigError, validate_config
+
+BASE = {"email": "a@example.com", "password": "x"}
+
+
+def problems(**settings):
+    try:
+        validate_config(dict(BASE, **settings))
+    except ConfigError as e:
+        return str(e)
+    return ""
+
+
+@pytest.mark.parametrize("settings", [
+    {"browser_pool_size": 0},
+    {"browser_pool_size": {"target": 2, "walmart": 0}},
+    {"workers_per_store": 3},
+    {"workers_per_store": {"bestbuy": 1}},
+    {"job_queue_size": 0},
+    {"job_timeout": 600},
+    {"profile_workers": 2},
+    {"browser_pool_max_memory_mb": 2048},
+    {"wait_budgets": {"target": {"add_to_cart": 8, "checkout": 20.5}}},
+])
+def test_valid_startup_settings(settings):
+    assert problems(**settings) == ""
+
+
+@pytest.mark.parametrize("settings, message", [
+    ({"browser_pool_size": "a"}, "browser_pool_size must be a whole number"),
+    ({"browser_pool_size": -1}, "browser_pool_size must be a whole number"),
+    ({"browser_pool_size": True}, "browser_pool_size must be a whole number"),
+    ({"browser_pool_size": {"target": 1.5}}, "browser_pool_size must be a whole number"),
+    ({"browser_pool_size": {"amazon": 1}}, "browser_pool_size has unknown stores ['amazon']"),
+    ({"workers_per_store": 0}, "workers_per_store must be a whole number of at least 1"),
+    ({"workers_per_store": {"target": 2, "walmart": 0}}, "workers_per_store must be a whole number of at least 1"),
+    ({"job_queue_size": -5}, "job_queue_size must be a whole number of at least 0"),
+    ({"job_queue_size": "100"}, "job_queue_size must be a whole number of at least 0"),
+    ({"job_timeout": 0}, "job_timeout must be a positive number"),
+    ({"job_timeout": "900"}, "job_timeout must be a positive number"),
+    ({"profile_workers": 0}, "profile_workers must be a whole number of at least 1"),
+    ({"profile_workers": 2.5}, "profile_workers must be a whole number of at least 1"),
+    ({"browser_pool_max_memory_mb": -1}, "browser_pool_max_memory_mb must be a positive number"),
+    ({"wait_budgets": [10]}, "wait_budgets must map stores to {step: seconds}"),
+    ({"wait_budgets": {"target": 10}}, "wait_budgets.target must map steps to seconds"),
+    ({"wait_budgets": {"target": {"checkout": -3}}}, "wait_budgets.target budgets must be positive numbers"),
+    ({"wait_budgets": {"target": {"checkout": "fast"}}}, "wait_budgets.target budgets must be positive numbers"),
+    ({"wait_budgets": {"target": {"chekout": 5}}}, "wait_budgets.target has unknown steps ['chekout']"),
+    ({"wait_budgets": {"amazon": {"checkout": 5}}}, "wait_budgets has unknown store 'amazon'"),
+])
+def test_invalid_startup_settings(settings, message):
+    assert message in problems(**settings)
+
+
+def test_config_reports_every_bad_setting():
+    with pytest.raises(ConfigError) as error:
+        Config(dict(BASE, browser_pool_size="a", workers_per_store=0))
+    assert "browser_pool_size" in str(error.value) and "workers_per_store" in str(error.value)
@@ -0,0 +1,47 @@
+from utils.journal import JobJournal
+
+
+def journal_with_jobs(path):
+    journal = JobJournal(str(path))
+    for job in (1, 2, 3):
+        journal.dispatch(job, "target", f"https://www.target.com/p/-/A-{job}", None, source="SKU")
+        journal.alert(job)
+        journal.step(job, "check_stock_and_add", "done")
+    journal.finish(1, "succeeded")
+    journal.finish(3, "failed")
+    journal.flush()
+    return journal
+
+
+def count_events(journal):
+    db = journal._connect()
+    try:
+        return db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    finally:
+        db.close()
+
+
+def test_compact_keeps_unfinished_jobs_and_the_job_id(tmp_path):
+    journal = journal_with_jobs(tmp_path / "jobs.db")
+    assert journal.compact() == 4  # all of job 1; job 3 finished too but is the newest, so it stays
+    assert count_events(journal) == 7
+    entries = journal.unfinished()
+    assert [entry.job for entry in entries] == [2]
+    assert entries[0].alerts == 2 and entries[0].done_steps(None) == {"check_stock_and_add"}
+    assert journal.last_job_id() == 3
+
+
+def test_compact_again_removes_nothing(tmp_path):
+    journal = journal_with_jobs(tmp_path / "jobs.db")
+    journal.compact()
+    assert journal.compact() == 0
+
+
+def test_unfinished_uses_the_event_index(tmp_path):
+    journal = journal_with_jobs(tmp_path / "jobs.db")
+    db = journal._connect()
+    try:
+        plan = db.execute("EXPLAIN QUERY PLAN SELECT job FROM events WHERE event = 'finish'").fetchall()
+    finally:
+        db.close()
+    assert any("events_event" in row[-1] for row in plan)
@@ -0,0 +1,38 @@
+import time
+from utils.schedule import RefreshSchedule, RefreshWindow
+
+# A Wednesday at 10:05 local time
+NOW = time.mktime((2025, 1, 15, 10, 5, 0, 0, 0, -1))
+
+
+def window(interval, start="10:00", end="10:30"):
+    return RefreshWindow(start, end, interval)
+
+
+def test_backoff_up_to_max_interval():
+    schedule = RefreshSchedule(10, backoff=2, max_interval=35)
+    assert [schedule.delay(misses, now=NOW) for misses in (1, 2, 3, 4)] == [10, 20, 35, 35]
+
+
+def test_window_speeds_up_checks_without_backoff():
+    schedule = RefreshSchedule(10, backoff=2, windows=[window(2)])
+    assert schedule.delay(1, now=NOW) == 2
+    assert schedule.delay(6, now=NOW) == 2
+
+
+def test_slower_window_never_slows_the_store_interval():
+    schedule = RefreshSchedule(5, backoff=2, windows=[window(10)])
+    assert schedule.delay(1, now=NOW) == 5
+    assert schedule.delay(4, now=NOW) == 5
+
+
+def test_window_outside_its_hours_is_ignored():
+    schedule = RefreshSchedule(10, windows=[window(2, "11:00", "11:30")])
+    assert schedule.delay(1, now=NOW) == 10
+
+
+def test_expired():
+    schedule = RefreshSchedule(10, max_lifetime=60)
+    assert not schedule.expired(NOW - 30, now=NOW)
+    assert schedule.expired(NOW - 60, now=NOW)
+    assert not RefreshSchedule(10).expired(NOW - 10 ** 6, now=NOW)
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+from utils.sources import ChannelCounters
+
+
+def channel(channel_id):
+    return SimpleNamespace(id=channel_id, name=f"channel-{channel_id}")
+
+
+def test_counts_per_channel():
+    counters = ChannelCounters()
+    for _ in range(3):
+        counters.seen(channel(1))
+    counters.parsed(channel(1))
+    counters.alert(channel(1))
+    assert counters.busiest() == [(1, "channel-1", 3, 1, 1)]
+
+
+def test_table_is_capped_and_the_rest_folded_into_other():
+    counters = ChannelCounters(limit=5)
+    # Channels 0-4 are busy; 1,000 quiet channels post once each
+    for channel_id in range(5):
+        for _ in range(10):
+            counters.seen(channel(channel_id))
+            counters.parsed(channel(channel_id))
+    for channel_id in range(100, 1100):
+        counters.seen(channel(channel_id))
+
+    assert len(counters.counts) <= 2 * counters.limit
+    assert len(counters.names) == len(counters.counts)
+    rows = counters.busiest(limit=5)
+    assert [row[0] for row in rows[:5]] == [0, 1, 2, 3, 4]
+    other = rows[-1]
+    assert other[:2] == (None, "other channels")
+    # Nothing is lost: tracked plus folded messages add up to everything seen
+    assert sum(counts[0] for counts in counters.counts.values()) + other[2] == 5 * 10 + 1000
+
+
+def test_parsed_and_alert_after_fold_go_to_other():
+    counters = ChannelCounters(limit=1)
+    counters.seen(channel(1))
+    counters.seen(channel(1))
+    counters.seen(channel(2))
+    counters.seen(channel(3))  # folds channel 2
+    counters.parsed(channel(2))
+    counters.alert(channel(2))
+    assert counters.other == [1, 1, 1]
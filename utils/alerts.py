@@ -0,0 +1,71 @@
+import re
+
+URL_PATTERN = re.compile(r"https?://[^\s]+")
+SKU_PATTERN = re.compile(r"SKU\s+(\d+)")
+STORE_MENTION_PATTERN = re.compile(r"target|walmart|bestbuy", re.IGNORECASE)
+NON_WORD_PATTERN = re.compile(r"\W+")
+
+# Markdown/embed punctuation that ends up glued to URLs ("[link](https://...)")
+URL_TRAILING_PUNCTUATION = ")]>*_,.;'\""
+
+
+def extract_urls(text):
+    """All URLs in text, in order, with trailing markdown punctuation stripped."""
+    return [url.rstrip(URL_TRAILING_PUNCTUATION) for url in URL_PATTERN.findall(text)]
+
+
+class ParsedAlert:
+    """
+    Everything on_message needs from one Discord message, extracted in a
+    single pass: URLs (content and embeds) with their store, SKUs, store
+    mentions and the watchlist keywords that matched the content.
+    """
+
+    def __init__(self, content, embed_texts, matcher, identify_store):
+        self.content = content
+        self.keywords = matcher.matched_keywords(content)
+
+        self.content_urls = list(dict.fromkeys(extract_urls(content)))
+        urls = list(self.content_urls)
+        for text in embed_texts:
+            urls.extend(extract_urls(text))
+        self.urls = list(dict.fromkeys(urls))
+        self.url_stores = {url: identify_store(url) for url in self.urls}
+
+        self.skus = SKU_PATTERN.findall(content)
+        self.store_mentions = {m.lower() for m in STORE_MENTION_PATTERN.findall(content)}
+
+    @property
+    def is_target(self):
+        """True if the message content mentions a watched product."""
+        return bool(self.keywords)
+
+    @property
+    def sku(self):
+        return self.skus[0] if self.skus else None
+
+    @property
+    def product_name(self):
+        """Best guess at the product title: monitors put it on the line after the headline."""
+        lines = self.content.split('\n')
+        return lines[1] if len(lines) > 1 else self.content
+
+    def search_terms(self):
+        return NON_WORD_PATTERN.sub('+', self.product_name)
+
+
+def embed_texts(message):
+    """Description and field values of every embed on a discord.Message."""
+    texts = []
+    for embed in message.embeds or []:
+        if embed.description:
+            texts.append(embed.description)
+        for field in embed.fields or []:
+            if field.value:
+                texts.append(field.value)
+    return texts
+
+
+def parse_alert(message, matcher, identify_store):
+    """Build a ParsedAlert from a discord.Message."""
+    return ParsedAlert(message.content, embed_texts(message), matcher, identify_store)
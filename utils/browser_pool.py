@@ -0,0 +1,262 @@
+import os
+import queue
+import threading
+import time
+from utils.logger import logger
+
+
+def _rss_kb(pid):
+    """Resident set size of a single process in kB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pids):
+    """
+    Return the resident memory (MB) of the given processes and all their children.
+    Chrome forks a renderer/GPU/utility process per tab, so the browser pid alone
+    under-reports badly. Returns 0 on platforms without /proc.
+    """
+    pids = [p for p in pids if p]
+    if not pids or not os.path.isdir("/proc"):
+        return 0.0
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    seen = set()
+    stack = list(pids)
+    total_kb = 0
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        total_kb += _rss_kb(pid)
+        stack.extend(children.get(pid, []))
+    return total_kb / 1024
+
+
+def driver_pids(driver):
+    """Pids owned by a driver: the chromedriver service and the browser itself."""
+    pids = []
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None) if service else None
+    if process is not None:
+        pids.append(process.pid)
+    pids.append(getattr(driver, "browser_pid", None))
+    return pids
+
+
+class BrowserPool:
+    """
+    Keeps warm Chrome instances for one store and leases them to bot runs.
+
+    `factory(slot)` must return a ready driver. Pooled drivers own a numbered slot
+    (0..size-1); when every slot is leased out a caller waits `lease_timeout`
+    seconds and then gets an overflow driver that is quit on release instead of
+    being returned to the pool.
+    """
+
+    def __init__(self, store, factory, size=1, max_memory_mb=None, lease_timeout=5):
+        self.store = store
+        self.factory = factory
+        self.size = size
+        self.max_memory_mb = max_memory_mb
+        self.lease_timeout = lease_timeout
+
+        self._idle = queue.LifoQueue()  # most recently used browser first — warmest caches
+        self._lock = threading.Lock()
+        self._free_slots = list(range(size))
+        self._drivers = []
+        self._closed = False
+        self.stats = {"leases": 0, "launches": 0, "recycled": 0, "overflow": 0}
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def warm(self, block=False):
+        """Pre-launch a browser for every free slot (in the background unless block=True)."""
+        if block:
+            self._fill()
+        else:
+            threading.Thread(target=self._fill, name=f"{self.store}-pool-warm", daemon=True).start()
+
+    def acquire(self):
+        """Lease a healthy driver, launching one if the pool has a free slot."""
+        start = time.perf_counter()
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._launch_or_wait()
+
+            if getattr(driver, "_pool_slot", None) is None or self._is_healthy(driver):
+                break
+            logger.warning(f"{self.store} pool: leased browser is dead — recycling")
+            self._discard(driver)
+
+        self.stats["leases"] += 1
+        logger.info(f"{self.store} pool: leased browser in {time.perf_counter() - start:.3f}s")
+        return driver
+
+    def acquire_slot(self, slot):
+        """Lease the idle browser that owns `slot`, or None if it's leased out, dead or not launched."""
+        with self._idle.mutex:
+            matches = [driver for driver in self._idle.queue if driver._pool_slot == slot]
+            if not matches:
+                return None
+            driver = matches[0]
+            self._idle.queue.remove(driver)
+        if not self._is_healthy(driver):
+            logger.warning(f"{self.store} pool: browser in slot {slot} is dead — recycling")
+            self._discard(driver)
+            self._replenish()
+            return None
+        self.stats["leases"] += 1
+        return driver
+
+    def release(self, driver):
+        """Return a leased driver. Crashed, overflow or over-budget browsers are quit instead."""
+        if driver is None:
+            return
+        if getattr(driver, "_pool_slot", None) is None or self._closed:
+            self._quit(driver)
+            return
+
+        if not self._reset(driver):
+            logger.warning(f"{self.store} pool: browser crashed during run — recycling")
+            self._discard(driver)
+            self._replenish()
+            return
+
+        if self.max_memory_mb:
+            used = self.memory_mb()
+            if used > self.max_memory_mb:
+                logger.warning(
+                    f"{self.store} pool: {used:.0f} MB in use exceeds cap of {self.max_memory_mb} MB — recycling browser"
+                )
+                self.stats["recycled"] += 1
+                self._discard(driver)
+                self._replenish()
+                return
+
+        self._idle.put(driver)
+
+    def memory_mb(self):
+        """Total resident memory of every pooled browser (leased or idle)."""
+        with self._lock:
+            drivers = list(self._drivers)
+        pids = []
+        for driver in drivers:
+            pids.extend(driver_pids(driver))
+        return process_tree_rss_mb(pids)
+
+    def utilization(self):
+        """Return (leased, idle, size) for reporting."""
+        with self._lock:
+            live = len(self._drivers)
+        idle = self._idle.qsize()
+        return live - idle, idle, self.size
+
+    def close(self):
+        """Quit every idle browser; leased ones are quit when released."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    # -----------------------------
+    # Helper functions
+    # -----------------------------
+    def _fill(self):
+        while not self._closed:
+            with self._lock:
+                if not self._free_slots:
+                    return
+                slot = self._free_slots.pop(0)
+            try:
+                self._idle.put(self._launch(slot))
+            except Exception as e:
+                logger.error(f"{self.store} pool: could not pre-launch browser: {e}")
+                return
+
+    def _replenish(self):
+        if not self._closed:
+            self.warm()
+
+    def _launch_or_wait(self):
+        with self._lock:
+            slot = self._free_slots.pop(0) if self._free_slots else None
+        if slot is not None:
+            return self._launch(slot)
+
+        try:
+            return self._idle.get(timeout=self.lease_timeout)
+        except queue.Empty:
+            logger.warning(f"{self.store} pool exhausted ({self.size} browsers busy) — launching overflow browser")
+            self.stats["overflow"] += 1
+            return self._launch(None)
+
+    def _launch(self, slot):
+        start = time.perf_counter()
+        try:
+            driver = self.factory(slot)
+        except Exception:
+            if slot is not None:
+                with self._lock:
+                    self._free_slots.append(slot)
+            raise
+        driver._pool_slot = slot
+        self.stats["launches"] += 1
+        if slot is not None:
+            with self._lock:
+                self._drivers.append(driver)
+        logger.info(f"{self.store} pool: launched browser (slot {slot}) in {time.perf_counter() - start:.2f}s")
+        return driver
+
+    def _is_healthy(self, driver):
+        try:
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        try:
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        slot = getattr(driver, "_pool_slot", None)
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            if slot is not None and slot not in self._free_slots:
+                self._free_slots.append(slot)
+        self._quit(driver)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -1,22 +1,458 @@
 import json
+import os
+import threading
+from utils.logger import logger
+from utils.matcher import get_matcher
+from utils.sources import SourcePolicy, TRUST_LEVELS
+from utils.schedule import RefreshWindow, DAYS, DEFAULT_REFRESH_INTERVAL, parse_clock
+from utils.waits import DEFAULT_BUDGETS
 
-def load_config():
-    """Load the main JSON config file."""
-    with open("config.json", "r") as f:
-        return json.load(f)
+DEFAULT_CONFIG_PATH = "config.json"
+DEFAULT_TARGET_PRODUCTS = ["Elite Trainer Box", "Booster Bundle"]
+DEFAULT_PRIORITY_SITES = ["walmart", "bestbuy", "target"]
+KNOWN_STORES = ("target", "walmart", "bestbuy")
 
-def get_store_config(config, store_type, product_url=None):
+CARD_FIELDS = ("number", "exp", "cvv")
+SHIPPING_FIELDS = ("name", "address", "city", "state", "zip", "phone")
+
+# Settings a profile overrides; everything else comes from the top level of config.json
+PROFILE_KEYS = ("email", "password", "account_name", "card", "shipping")
+DEFAULT_PROFILE = "default"
+
+
+class ConfigError(ValueError):
+    """config.json is missing, is not valid JSON, or has a setting of the wrong type."""
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """Load and validate the main JSON config file."""
+    try:
+        with open(path, "r") as f:
+            raw = json.load(f)
+    except OSError as e:
+        raise ConfigError(f"Cannot read {path}: {e}") from e
+    except ValueError as e:
+        raise ConfigError(f"{path} is not valid JSON: {e}") from e
+    return Config(raw, path=path)
+
+
+def validate_config(raw):
+    """Raise ConfigError describing every problem found in a parsed config dict."""
+    if not isinstance(raw, dict):
+        raise ConfigError("config must be a JSON object")
+
+    problems = []
+    if "profiles" in raw:
+        problems.extend(_profile_problems(raw["profiles"]))
+    else:
+        for key in ("email", "password"):
+            if not isinstance(raw.get(key), str):
+                problems.append(f"{key} is required and must be a string")
+    for key in ("job_timeout", "dedup_ttl", "wait_poll_interval", "stock_probe_max_backoff",
+                "purchase_limit_window_hours", "refresh_max_interval", "max_job_lifetime",
+                "browser_pool_max_memory_mb"):
+        value = raw.get(key)
+        if value is not None and not _is_positive(value):
+            problems.append(f"{key} must be a positive number")
+    # Sizes fixed at startup; 0 is "no pool" for browser_pool_size and "unbounded" for job_queue_size,
+    # but a store with 0 workers would never run its jobs
+    for key, minimum in (("browser_pool_size", 0), ("workers_per_store", 1)):
+        value = raw.get(key)
+        if value is not None and not (_is_count(value, minimum) or (
+                isinstance(value, dict) and all(_is_count(v, minimum) for v in value.values()))):
+            problems.append(f"{key} must be a whole number of at least {minimum} or map stores to one")
+        elif isinstance(value, dict) and any(store not in KNOWN_STORES for store in value):
+            problems.append(f"{key} has unknown stores {[store for store in value if store not in KNOWN_STORES]}")
+    for key, minimum in (("job_queue_size", 0), ("profile_workers", 1)):
+        value = raw.get(key)
+        if value is not None and not _is_count(value, minimum):
+            problems.append(f"{key} must be a whole number of at least {minimum}")
+    if "wait_budgets" in raw:
+        problems.extend(_budget_problems(raw["wait_budgets"]))
+    interval = raw.get("refresh_interval")
+    if interval is not None and not (_is_positive(interval) or (
+            isinstance(interval, dict) and all(_is_positive(v) for v in interval.values()))):
+        problems.append("refresh_interval must be a positive number or map stores to one")
+    backoff = raw.get("refresh_backoff")
+    if backoff is not None and not (_is_positive(backoff) and backoff >= 1):
+        problems.append("refresh_backoff must be a number of at least 1")
+    if "refresh_windows" in raw:
+        problems.extend(_window_problems(raw["refresh_windows"]))
+    for key in ("headless", "place_order", "persistent_sessions", "stock_probe", "resume_jobs",
+                "ingest_process"):
+        if key in raw and not isinstance(raw[key], bool):
+            problems.append(f"{key} must be true or false")
+    for key in ("target_products", "priority_sites", "watchlist"):
+        if key in raw and not isinstance(raw[key], list):
+            problems.append(f"{key} must be a list")
+    if isinstance(raw.get("target_products"), list) and not all(isinstance(k, str) for k in raw["target_products"]):
+        problems.append("target_products must only contain strings")
+    if isinstance(raw.get("priority_sites"), list):
+        unknown = [site for site in raw["priority_sites"] if site not in KNOWN_STORES]
+        if unknown:
+            problems.append(f"priority_sites has unknown stores {unknown} (expected {', '.join(KNOWN_STORES)})")
+    lean_mode = raw.get("lean_mode", False)
+    if not isinstance(lean_mode, bool) and not (
+            isinstance(lean_mode, dict) and all(isinstance(v, bool) for v in lean_mode.values())):
+        problems.append("lean_mode must be true/false or map stores to true/false")
+    if "lean_allowlist" in raw and not (
+            isinstance(raw["lean_allowlist"], list) and all(isinstance(v, str) for v in raw["lean_allowlist"])):
+        problems.append("lean_allowlist must be a list of strings")
+    viewport = raw.get("lean_viewport")
+    if viewport is not None and not (isinstance(viewport, list) and len(viewport) == 2
+                                     and all(isinstance(v, int) and v > 0 for v in viewport)):
+        problems.append("lean_viewport must be [width, height] in pixels")
+    port = raw.get("metrics_port")
+    if port is not None and not (isinstance(port, int) and not isinstance(port, bool) and 0 < port < 65536):
+        problems.append("metrics_port must be a port number (1-65535)")
+    problems.extend(_section_problems(raw))
+    if "sources" in raw:
+        problems.extend(_sources_problems(raw["sources"]))
+    limits = raw.get("purchase_limits", {})
+    if not isinstance(limits, dict) or not all(isinstance(v, int) and v >= 0 for v in limits.values()):
+        problems.append("purchase_limits must map stores to a whole number of units per customer")
+
+    if problems:
+        raise ConfigError("Invalid config: " + "; ".join(problems))
+
+
+def _section_problems(raw, prefix=""):
+    problems = []
+    for section, fields in (("card", CARD_FIELDS), ("shipping", SHIPPING_FIELDS)):
+        if section in raw:
+            missing = [field for field in fields if field not in (raw[section] or {})]
+            if missing:
+                problems.append(f"{prefix}{section} is missing {', '.join(missing)}")
+    name = (raw.get("shipping") or {}).get("name")
+    if name is not None and not (isinstance(name, str) and name.split()):
+        # First and last name for the address forms are split from it when the config loads
+        problems.append(f"{prefix}shipping.name must be a name, e.g. \"Jane Doe\"")
+    return problems
+
+
+def _sources_problems(sources):
+    if not isinstance(sources, dict):
+        return ["sources must be an object"]
+    problems = []
+    for key in ("guilds", "channels", "authors"):
+        ids = sources.get(key, [])
+        if not isinstance(ids, list) or not all(_is_discord_id(source) for source in ids):
+            problems.append(f"sources.{key} must be a list of Discord ids")
+    trust = sources.get("trust", {})
+    if not isinstance(trust, dict) or not all(_is_discord_id(source) for source in trust):
+        problems.append("sources.trust must map Discord ids to trust levels")
+    else:
+        levels = list(trust.values()) + [sources.get("default_trust", "commands")]
+        unknown = sorted({str(level) for level in levels if level not in TRUST_LEVELS})
+        if unknown:
+            problems.append(f"sources has unknown trust levels {unknown} (expected {', '.join(TRUST_LEVELS)})")
+    return problems
+
+
+def _window_problems(windows):
+    if not isinstance(windows, list):
+        return ["refresh_windows must be a list"]
+    problems = []
+    for n, window in enumerate(windows):
+        prefix = f"refresh_windows[{n}]"
+        if not isinstance(window, dict):
+            problems.append(f"{prefix} must be an object")
+            continue
+        for key in ("start", "end"):
+            try:
+                parse_clock(window.get(key))
+            except (AttributeError, ValueError):
+                problems.append(f"{prefix}.{key} must be a HH:MM time")
+        if not _is_positive(window.get("interval")):
+            problems.append(f"{prefix}.interval must be a positive number")
+        unknown = [store for store in window.get("stores", []) if store not in KNOWN_STORES]
+        if unknown:
+            problems.append(f"{prefix} has unknown stores {unknown}")
+        unknown = [day for day in window.get("days", []) if day not in DAYS]
+        if unknown:
+            problems.append(f"{prefix} has unknown days {unknown} (expected {', '.join(DAYS)})")
+    return problems
+
+
+def _budget_problems(budgets):
+    if not isinstance(budgets, dict):
+        return ["wait_budgets must map stores to {step: seconds}"]
+    problems = []
+    for store, steps in budgets.items():
+        if store not in KNOWN_STORES:
+            problems.append(f"wait_budgets has unknown store {store!r}")
+        elif not isinstance(steps, dict):
+            problems.append(f"wait_budgets.{store} must map steps to seconds")
+        else:
+            unknown = [step for step in steps if step not in DEFAULT_BUDGETS]
+            if unknown:
+                problems.append(f"wait_budgets.{store} has unknown steps {unknown} "
+                                f"(expected {', '.join(DEFAULT_BUDGETS)})")
+            if not all(_is_positive(seconds) for seconds in steps.values()):
+                problems.append(f"wait_budgets.{store} budgets must be positive numbers of seconds")
+    return problems
+
+
+def _is_count(value, minimum=0):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= minimum
+
+
+def _is_positive(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+
+def _is_discord_id(value):
+    return (isinstance(value, int) and not isinstance(value, bool)) or (isinstance(value, str) and value.isdigit())
+
+
+def _profile_problems(profiles):
+    if not isinstance(profiles, list) or not profiles:
+        return ["profiles must be a non-empty list"]
+    problems = []
+    names, emails = set(), set()
+    for n, profile in enumerate(profiles):
+        if not isinstance(profile, dict):
+            problems.append(f"profiles[{n}] must be an object")
+            continue
+        name = profile.get("name")
+        prefix = f"profile {name or n}: "
+        if not isinstance(name, str) or not name:
+            problems.append(f"{prefix}name is required")
+        elif name in names:
+            problems.append(f"{prefix}name is used twice")
+        names.add(name)
+        for key in ("email", "password"):
+            if not isinstance(profile.get(key), str):
+                problems.append(f"{prefix}{key} is required and must be a string")
+        email = str(profile.get("email", "")).strip().lower()
+        if email in emails:
+            problems.append(f"{prefix}email {email} is already used by another profile")
+        emails.add(email)
+        unknown = [store for store in profile.get("stores", []) if store not in KNOWN_STORES]
+        if unknown:
+            problems.append(f"{prefix}unknown stores {unknown}")
+        problems.extend(_section_problems(profile, prefix))
+    return problems
+
+
+class Config:
     """
-    Extract store-specific configuration.
-    Includes account info, product URL, payment, and shipping info.
+    A validated, read-only snapshot of config.json plus what is derived from it
+    once: the compiled keyword matcher, the Discord source filter, the store
+    priority order and the per-store bot settings. Reloading builds a new
+    snapshot instead of changing this one, so jobs keep the settings they
+    started with. Reads like the raw dict (config["email"],
+    config.get("job_timeout", 900)).
+    """
+
+    def __init__(self, raw, path=None, mtime=None):
+        validate_config(raw)
+        self._raw = raw
+        self.path = path
+        self.mtime = mtime
+        self.discord_token = raw.get("discord_token")
+        # Default for products without a store-specific interval; per store see store_config()
+        interval = raw.get("refresh_interval", DEFAULT_REFRESH_INTERVAL)
+        self.refresh_interval = DEFAULT_REFRESH_INTERVAL if isinstance(interval, dict) else interval
+        self.refresh_windows = tuple(RefreshWindow.from_config(entry) for entry in raw.get("refresh_windows", ()))
+        self.target_products = tuple(raw.get("target_products", DEFAULT_TARGET_PRODUCTS))
+        self.priority_sites = tuple(raw.get("priority_sites", DEFAULT_PRIORITY_SITES))
+        # store -> rank (0 = highest) for O(1) "is this a priority site" checks and sorting
+        self.priority = {store: rank for rank, store in enumerate(self.priority_sites)}
+        self.matcher = get_matcher(self.target_products)
+        self.sources = SourcePolicy.from_config(raw.get("sources"))
+
+        # One account per profile; without a "profiles" section the top-level account is the only one
+        profiles = raw.get("profiles") or [{"name": DEFAULT_PROFILE}]
+        self.profiles = tuple(profile["name"] for profile in profiles)
+        self.profile_stores = {
+            profile["name"]: frozenset(profile.get("stores") or KNOWN_STORES) for profile in profiles
+        }
+        # profile -> customer; profiles sharing an email, card or shipping address are one customer
+        self.customers = _group_customers([_merge_profile(raw, profile) for profile in profiles], self.profiles)
+        self._store_configs = {}
+        for profile in profiles:
+            merged = _merge_profile(raw, profile)
+            for store in KNOWN_STORES:
+                store_config = _build_store_config(merged, store)
+                store_config["profile"] = profile["name"]
+                self._store_configs[profile["name"], store] = store_config
+
+    def __getitem__(self, key):
+        return self._raw[key]
+
+    def __contains__(self, key):
+        return key in self._raw
+
+    def get(self, key, default=None):
+        return self._raw.get(key, default)
+
+    def items(self):
+        return self._raw.items()
+
+    def store_config(self, store_type, product_url=None, profile=None):
+        """Bot settings for one store and profile (a fresh copy, so a bot can't change the snapshot)."""
+        profile = profile or self.profiles[0]
+        cached = self._store_configs.get((profile, store_type))
+        store_config = dict(cached or _build_store_config(self._raw, store_type))
+        if product_url:
+            store_config["product_url"] = product_url
+        return store_config
+
+    def profiles_for(self, store_type):
+        """Profiles with an account at this store, in config order."""
+        return [name for name in self.profiles if store_type in self.profile_stores[name]]
+
+    def purchase_limit(self, store_type):
+        """Units of one product a single customer may buy at this store (default 1)."""
+        return self._raw.get("purchase_limits", {}).get(store_type, 1)
+
+    def by_priority(self, stores):
+        """The priority stores among `stores`, highest priority first."""
+        return sorted((store for store in stores if store in self.priority), key=self.priority.__getitem__)
+
+
+class ConfigWatcher:
     """
+    Holds the current Config and swaps in a new one when config.json changes
+    on disk (polled by mtime and size every `poll_interval` seconds). A file
+    that fails to parse or validate is logged and the previous config is kept.
+    Subscribers are called as callback(old, new) from the watcher thread.
+    """
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH, poll_interval=2):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._stamp = _file_stamp(path)
+        self.current = load_config(path)
+        self.current.mtime = self._stamp[0] / 1e9 if self._stamp else None
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def reload(self):
+        """Re-read the file if it changed. Returns the new Config, or None if nothing was swapped."""
+        with self._lock:
+            stamp = _file_stamp(self.path)
+            if stamp is None or stamp == self._stamp:
+                return None
+            self._stamp = stamp
+            try:
+                config = load_config(self.path)
+            except ConfigError as e:
+                logger.error(f"Config reload failed, keeping the previous settings: {e}")
+                return None
+            config.mtime = stamp[0] / 1e9
+            old, self.current = self.current, config
+
+        logger.info(f"Reloaded {self.path}")
+        for callback in self._subscribers:
+            try:
+                callback(old, config)
+            except Exception as e:
+                logger.error(f"Config reload callback {callback!r} failed: {e}")
+        return config
+
+    def start(self):
+        if self._thread:
+            return
+
+        def loop():
+            while not self._stop.wait(self.poll_interval):
+                self.reload()
+
+        self._thread = threading.Thread(target=loop, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def _merge_profile(raw, profile):
+    merged = dict(raw)
+    merged.update({key: profile[key] for key in PROFILE_KEYS if key in profile})
+    return merged
+
+
+def _group_customers(accounts, names):
+    """
+    Map each profile to a customer id (the first profile of its group). Stores
+    apply purchase limits per customer, so profiles sharing an email, a card or
+    a shipping address are grouped and limited together.
+    """
+    parent = {name: name for name in names}
+    order = {name: n for n, name in enumerate(names)}
+
+    def root(name):
+        while parent[name] != name:
+            name = parent[name]
+        return name
+
+    def join(a, b):
+        a, b = sorted((root(a), root(b)), key=order.__getitem__)
+        parent[b] = a
+
+    seen = {}
+    for name, account in zip(names, accounts):
+        shipping = account.get("shipping") or {}
+        card = account.get("card") or {}
+        identities = [
+            ("email", str(account.get("email", "")).strip().lower()),
+            ("card", "".join(ch for ch in str(card.get("number", "")) if ch.isdigit())),
+            ("address", " ".join(str(shipping.get("address", "")).lower().split()) + "|" + str(shipping.get("zip", ""))),
+        ]
+        for identity in identities:
+            if not identity[1] or identity[1] == "|":
+                continue
+            if identity in seen:
+                join(name, seen[identity])
+            else:
+                seen[identity] = name
+    return {name: root(name) for name in names}
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _build_store_config(config, store_type, product_url=None):
+    lean_mode = config.get("lean_mode", False)
+    refresh_interval = config.get("refresh_interval", DEFAULT_REFRESH_INTERVAL)
     store_config = {
         "email": config["email"],
         "password": config["password"],
         "account_name": config.get("account_name"),
         "headless": config.get("headless", False),
         "place_order": config.get("place_order", False),
-        "refresh_interval": config.get("refresh_interval", 10)
+        # Number, or per store: {"target": 5}
+        "refresh_interval": refresh_interval.get(store_type, DEFAULT_REFRESH_INTERVAL)
+        if isinstance(refresh_interval, dict) else refresh_interval,
+        "refresh_backoff": config.get("refresh_backoff", 1.0),
+        "refresh_max_interval": config.get("refresh_max_interval"),
+        "max_job_lifetime": config.get("max_job_lifetime"),
+        "refresh_windows": [window for window in config.get("refresh_windows", [])
+                            if store_type in window.get("stores", KNOWN_STORES)],
+        "wait_budgets": config.get("wait_budgets", {}).get(store_type, {}),
+        "wait_poll_interval": config.get("wait_poll_interval", 0.1),
+        "trace_dir": config.get("trace_dir", "traces"),
+        "trace_format": config.get("trace_format", "jsonl"),
+        "screenshot_dir": config.get("screenshot_dir", "screenshots"),
+        "selector_cache": config.get("selector_cache", "selectors.json"),
+        "job_journal": config.get("job_journal", "jobs.db"),
+        # true/false, or per store: {"target": true}
+        "lean_mode": lean_mode.get(store_type, False) if isinstance(lean_mode, dict) else lean_mode,
+        "lean_allowlist": config.get("lean_allowlist", []),
+        "lean_viewport": config.get("lean_viewport"),
+        # Only set when pointing a bot at a stand-in server (see benchmarks/mock_retailer.py)
+        "base_url": config.get(f"{store_type}_base_url")
     }
 
     # Use provided URL or fall back to config
@@ -39,6 +475,9 @@ def get_store_config(config, store_type, product_url=None):
     if "shipping" in config:
         store_config.update({
             "full_name": config["shipping"]["name"],
+            # Split once here rather than on every form fill
+            "first_name": config["shipping"]["name"].split()[0],
+            "last_name": config["shipping"]["name"].split()[-1],
             "address": config["shipping"]["address"],
             "city": config["shipping"]["city"],
             "state": config["shipping"]["state"],
@@ -49,6 +488,16 @@ def get_store_config(config, store_type, product_url=None):
     return store_config
 
 
+def get_store_config(config, store_type, product_url=None):
+    """
+    Extract store-specific configuration.
+    Includes account info, product URL, payment, and shipping info.
+    """
+    if isinstance(config, Config):
+        return config.store_config(store_type, product_url)
+    return _build_store_config(config, store_type, product_url)
+
+
 # ==============================
 # Additional fields for your bot
 # ==============================
@@ -60,6 +509,6 @@ def get_bot_config(config):
     - PRIORITY_SITES: list of sites in order of priority
     """
     return {
-        "TARGET_PRODUCTS": config.get("target_products", ["Elite Trainer Box", "Booster Bundle"]),
-        "PRIORITY_SITES": config.get("priority_sites", ["walmart", "bestbuy", "target"])
+        "TARGET_PRODUCTS": config.get("target_products", DEFAULT_TARGET_PRODUCTS),
+        "PRIORITY_SITES": config.get("priority_sites", DEFAULT_PRIORITY_SITES)
     }
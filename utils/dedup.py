@@ -0,0 +1,43 @@
+import time
+
+
+class AlertCoalescer:
+    """
+    Collapses repeat alerts for the same product onto one job.
+
+    While a job for a product is queued or running, further alerts attach to
+    it. After a successful checkout, repeats are suppressed for `ttl` seconds
+    so reposts from other monitors can't trigger a second order. Failed or
+    cancelled jobs don't suppress anything — the next restock alert should run.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.suppressed = {}
+        self._entries = {}
+
+    def lookup(self, key):
+        """Return the job an alert for `key` should attach to, or None to dispatch a new one."""
+        self._expire()
+        job = self._entries.get(key)
+        if not job:
+            return None
+        if not job.done or job.result:
+            return job
+        del self._entries[key]
+        return None
+
+    def register(self, key, job):
+        self._entries[key] = job
+
+    def record_suppressed(self, store):
+        self.suppressed[store] = self.suppressed.get(store, 0) + 1
+
+    def _expire(self):
+        now = time.time()
+        expired = [
+            key for key, job in self._entries.items()
+            if job.done and now - job.finished_at > self.ttl
+        ]
+        for key in expired:
+            del self._entries[key]
@@ -1,13 +1,12 @@
+import asyncio
+import inspect
 import discord
-import re
 from utils.logger import logger
-from utils.config import load_config, get_bot_config
-
-# Load config
-config = load_config()
-bot_config = get_bot_config(config)
-TARGET_PRODUCTS = bot_config["TARGET_PRODUCTS"]  # e.g., ["Elite Trainer Box", "Booster Bundle"]
-PRIORITY_SITES = bot_config["PRIORITY_SITES"]    # e.g., ["walmart", "bestbuy", "target"]
+from utils.matcher import get_matcher
+from utils.alerts import ParsedAlert, parse_alert
+from utils.products import CANONICAL_URLS, from_sku
+from utils.sources import ChannelCounters, IGNORE, COMMANDS
+from utils.metrics import MESSAGES, ALERTS_MATCHED
 
 class DiscordBot:
     def __init__(self, token, dispatcher):
@@ -17,18 +16,48 @@ class DiscordBot:
         self.intents.message_content = True
         self.intents.messages = True
         self.client = discord.Client(intents=self.intents)
+        # Set by set_target_products(); otherwise target_products comes from the live config
+        self._matcher_override = None
+        self.counters = ChannelCounters()
 
         @self.client.event
         async def on_ready():
             logger.info(f'Logged in as {self.client.user}')
+            # Start the checkout workers and the watchlist monitor on Discord's event loop
+            self.dispatcher.start()
 
         @self.client.event
         async def on_message(message):
             if message.author == self.client.user:
                 return  # Ignore bot's own messages
 
+            # One config snapshot per message, so a reload mid-message can't mix settings
+            config = self.config
+            # Sources that aren't allowed cost a few set lookups, never any parsing
+            self.counters.seen(message.channel)
+            trust = config.sources.message_trust(message)
+            if trust == IGNORE:
+                MESSAGES.inc(outcome="ignored")
+                return
+
             content = message.content
-            logger.info(f"Received message: {content}")
+            # One line per message can flood the log when alert channels are busy, so it is rate-limited
+            logger.info(f"Received message: {content}", extra={"rate_limit": "discord_message"})
+            is_command = content.startswith(('!status', '!cancel', '!sources', '!buy'))
+            if is_command:
+                MESSAGES.inc(outcome="command" if trust >= COMMANDS else "ignored")
+                if trust < COMMANDS:
+                    return
+
+            # -----------------------------
+            # Job control: !status [job] / !cancel <job> / !sources
+            # -----------------------------
+            if content.startswith('!status') or content.startswith('!cancel'):
+                await self._handle_job_command(message)
+                return
+            if content.startswith('!sources'):
+                await self._report_sources(message.channel)
+                return
 
             # -----------------------------
             # 1️⃣ Handle !buy command
@@ -38,37 +67,36 @@ class DiscordBot:
                 if user_input:
                     if self._matches_target(user_input):
                         logger.info(f"Manual buy command for target product: {user_input}")
-                        success = await self.dispatcher.dispatch(user_input)
-                        if success:
-                            await message.channel.send(f"✅ Purchase process started for: {user_input}")
-                        else:
-                            await message.channel.send(f"❌ Could not process product: {user_input}")
+                        await self._queue_checkout(message.channel, user_input, f"product: {user_input}")
                     else:
                         await message.channel.send("❌ This product is not in your target products list.")
                 else:
                     await message.channel.send("Please provide a product URL or SKU: !buy <product>")
                 return
 
+            # Parse URLs, SKUs and keywords once; every branch below works from this
+            self.counters.parsed(message.channel)
+            MESSAGES.inc(outcome="parsed")
+            alert = parse_alert(message, self.matcher, self.dispatcher.identify_store)
+            if alert.is_target:
+                ALERTS_MATCHED.inc()
+            dispatched = set()
+
             # -----------------------------
             # 2️⃣ Keyword Scraping for Target Products
             # -----------------------------
-            if self._contains_target_keyword(content):
-                urls = self._extract_urls(content)
-                if urls:
-                    for url in urls:
-                        store = self.dispatcher.identify_store(url)
-                        if store and store in PRIORITY_SITES:
+            if alert.is_target:
+                if alert.content_urls:
+                    for url in alert.content_urls:
+                        store = alert.url_stores[url]
+                        if store and store in config.priority:
                             logger.info(f"Detected target product URL via keyword scraping ({store}): {url}")
-                            success = await self.dispatcher.dispatch(url)
-                            if success:
-                                await message.channel.send(f"✅ Autocheckout started for: {url}")
-                            else:
-                                await message.channel.send(f"❌ Could not process URL: {url}")
+                            dispatched.add(url)
+                            await self._queue_checkout(message.channel, url, f"URL: {url}")
                 else:
                     # No URL detected, generate search URLs from product keyword
-                    product_name = content.split('\n')[1] if '\n' in content else content
-                    product_name_clean = re.sub(r'\W+', '+', product_name)
-                    for site in PRIORITY_SITES:
+                    product_name_clean = alert.search_terms()
+                    for site in config.priority_sites:
                         if site == "target":
                             url = f"https://www.target.com/s?searchTerm={product_name_clean}"
                         elif site == "walmart":
@@ -78,100 +106,127 @@ class DiscordBot:
                         else:
                             continue
                         logger.info(f"Generated URL for keyword scraping ({site}): {url}")
-                        success = await self.dispatcher.dispatch(url)
-                        if success:
-                            await message.channel.send(f"✅ Autocheckout started for: {url}")
-                        else:
-                            await message.channel.send(f"❌ Could not process generated URL: {url}")
+                        await self._queue_checkout(message.channel, url, f"generated URL: {url}")
 
                 # Detect SKU if present
-                sku_match = re.search(r"SKU\s+(\d+)", content)
-                if sku_match:
-                    sku = sku_match.group(1)
-                    product_url = self._sku_to_target_url(sku, content)
+                if alert.sku:
+                    product_url = self._sku_to_target_url(alert.sku, alert, config)
                     if product_url:
-                        logger.info(f"Detected target SKU via keyword scraping: {sku}, URL: {product_url}")
-                        success = await self.dispatcher.dispatch(product_url)
-                        if success:
-                            await message.channel.send(f"✅ Autocheckout started for SKU: {sku}")
-                        else:
-                            await message.channel.send(f"❌ Could not process SKU: {sku}")
+                        logger.info(f"Detected target SKU via keyword scraping: {alert.sku}, URL: {product_url}")
+                        dispatched.add(product_url)
+                        await self._queue_checkout(message.channel, product_url, f"SKU: {alert.sku}")
 
             # -----------------------------
             # 3️⃣ Detect all URLs in content + embeds
             # -----------------------------
-            processed_urls = set()
-            url_pattern = r"(https?://[^\s]+)"
-            urls = re.findall(url_pattern, content)
-
-            if message.embeds:
-                for embed in message.embeds:
-                    if embed.description:
-                        urls.extend(re.findall(url_pattern, embed.description))
-                    if embed.fields:
-                        for field in embed.fields:
-                            urls.extend(re.findall(url_pattern, field.value))
-
-            for url in set(urls):
-                if url in processed_urls:
+            for url in alert.urls:
+                if url in dispatched:
                     continue
-                processed_urls.add(url)
 
                 # Use message content to match, not URL itself
-                if self._contains_target_keyword(content):
-                    store = self.dispatcher.identify_store(url)
-                    if store and store in PRIORITY_SITES:
+                if alert.is_target:
+                    store = alert.url_stores[url]
+                    if store and store in config.priority:
                         logger.info(f"Detected target product URL: {url}")
-                        success = await self.dispatcher.dispatch(url)
-                        if success:
-                            await message.channel.send(f"✅ Purchase process started for: {url}")
-                        else:
-                            await message.channel.send(f"❌ Could not process URL: {url}")
+                        dispatched.add(url)
+                        await self._queue_checkout(message.channel, url, f"URL: {url}")
                 else:
-                    logger.info(f"Ignored non-target URL: {url}")
+                    logger.info(f"Ignored non-target URL: {url}", extra={"rate_limit": "ignored_url"})
 
             # -----------------------------
             # 4️⃣ Detect SKUs
             # -----------------------------
-            sku_match = re.search(r"SKU\s+(\d+)", content)
-            if sku_match:
-                sku = sku_match.group(1)
-                product_url = self._sku_to_target_url(sku, content)
-                if product_url and self._matches_target(product_url):
-                    logger.info(f"Detected target SKU: {sku}, URL: {product_url}")
-                    success = await self.dispatcher.dispatch(product_url)
-                    if success:
-                        await message.channel.send(f"✅ Purchase process started for SKU: {sku}")
-                    else:
-                        await message.channel.send(f"❌ Could not process SKU: {sku}")
+            if alert.sku:
+                product_url = self._sku_to_target_url(alert.sku, alert, config)
+                if product_url and product_url not in dispatched and self._matches_target(product_url):
+                    logger.info(f"Detected target SKU: {alert.sku}, URL: {product_url}")
+                    await self._queue_checkout(message.channel, product_url, f"SKU: {alert.sku}")
+
+    # -----------------------------
+    # Job helpers
+    # -----------------------------
+    async def _queue_checkout(self, channel, url, label):
+        """Queue a checkout and return straight away; the outcome is reported when the job finishes."""
+        job = await self.dispatcher.submit(url, source=label)
+        if not job:
+            await channel.send(f"❌ Could not process {label}")
+            return None
+        if job.alerts > 1:
+            logger.info(f"Duplicate alert for {label} — already handled by job {job.id}")
+            return job
+        self.counters.alert(channel)
+        await channel.send(f"✅ Autocheckout queued for {label} (job {job.id})")
+        asyncio.create_task(self._report_job(channel, job))
+        return job
+
+    async def _report_job(self, channel, job):
+        await job.wait()
+        icon = "✅" if job.result else "❌"
+        await channel.send(f"{icon} Job {job.id} {job.status}: {job.url}")
+
+    async def _handle_job_command(self, message):
+        parts = message.content.split()
+        command, job_id = parts[0], parts[1] if len(parts) > 1 else None
+
+        if command == '!cancel':
+            if not job_id:
+                await message.channel.send("Please provide a job id: !cancel <job>")
+                return
+            job = await self._call(self.dispatcher.cancel, job_id)
+            if job:
+                await message.channel.send(f"🛑 Cancelling {job.describe()}")
+            else:
+                await message.channel.send(f"❌ No active job {job_id}")
+            return
+
+        if job_id:
+            job = await self._call(self.dispatcher.get_job, job_id)
+            await message.channel.send(job.describe() if job else f"❌ Unknown job {job_id}")
+            return
+
+        lines = [
+            f"{store}: {s['watching']} watching, {s['queue_depth']} queued, {s['running']} running, {s['completed']} ok, {s['failed']} failed, "
+            f"avg wait {s['avg_wait_time']:.1f}s, avg run {s['avg_run_time']:.1f}s, {s['suppressed']} duplicates suppressed"
+            for store, s in (await self._call(self.dispatcher.stats)).items()
+        ]
+        await message.channel.send("\n".join(lines))
+
+    async def _report_sources(self, channel):
+        """!sources: the busiest channels, to find ones worth leaving out of sources.channels."""
+        lines = [f"{f'#{name} ({channel_id})' if channel_id else name}: {seen} seen, {parsed} parsed, {alerts} alerts"
+                 for channel_id, name, seen, parsed, alerts in self.counters.busiest()]
+        await channel.send("\n".join(lines) or "No messages seen yet")
 
     # -----------------------------
     # Helper functions
     # -----------------------------
-    def _matches_target(self, value: str) -> bool:
-        """Check if value matches any keyword or URL in TARGET_PRODUCTS."""
-        if not TARGET_PRODUCTS:
-            return False
-        return any(keyword.lower() in value.lower() for keyword in TARGET_PRODUCTS)
+    async def _call(self, method, *args):
+        """Call a dispatcher method; in the ingest process (RemoteDispatcher) it is a coroutine."""
+        result = method(*args)
+        return await result if inspect.isawaitable(result) else result
+
+    @property
+    def config(self):
+        """Latest validated config snapshot (hot-reloaded from config.json)."""
+        return self.dispatcher.config
 
-    def _contains_target_keyword(self, content: str) -> bool:
-        """Check if message content contains any target keywords for the sniper."""
-        return self._matches_target(content)
+    @property
+    def matcher(self):
+        return self._matcher_override or self.config.matcher
 
-    def _extract_urls(self, content: str):
-        """Extract all URLs from text."""
-        url_pattern = r"(https?://[^\s]+)"
-        return re.findall(url_pattern, content)
+    def set_target_products(self, target_products):
+        """Override target_products from config.json; pass None to go back to the config list."""
+        self._matcher_override = get_matcher(target_products) if target_products is not None else None
+
+    def _matches_target(self, value: str) -> bool:
+        """Check if value matches any keyword or URL in target_products."""
+        return self.matcher.search(value)
 
-    def _sku_to_target_url(self, sku: str, content: str):
+    def _sku_to_target_url(self, sku: str, alert: ParsedAlert, config):
         """Return the product URL if SKU belongs to a target product and priority site."""
-        for site in PRIORITY_SITES:
-            if site == "target" and re.search(r'target', content, re.IGNORECASE):
-                return f"https://www.target.com/p/-/{sku}"
-            elif site == "walmart" and re.search(r'walmart', content, re.IGNORECASE):
-                return f"https://www.walmart.com/ip/{sku}"
-            elif site == "bestbuy" and re.search(r'bestbuy', content, re.IGNORECASE):
-                return f"https://www.bestbuy.com/site/{sku}.p"
+        for site in config.priority_sites:
+            if site in alert.store_mentions and site in CANONICAL_URLS:
+                return from_sku(site, sku).url
         return None
 
     def run(self):
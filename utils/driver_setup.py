@@ -1,7 +1,196 @@
-import chromedriver_autoinstaller
-
-def setup_chromedriver():
-    """
-    Ensures the correct ChromeDriver version is installed before running bots.
-    """
-    chromedriver_autoinstaller.install()
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+from collections import namedtuple
+from utils.logger import logger
+
+DEFAULT_CACHE_DIR = "drivers"
+CACHE_FILE = "drivers.json"
+
+VERSION_PATTERN = re.compile(r"(\d+)\.\d+\.\d+(?:\.\d+)?")
+
+DriverPaths = namedtuple("DriverPaths", "chrome_binary chrome_version chromedriver version_main")
+DriverPaths.__doc__ = """
+Where Chrome and the pre-patched undetected-chromedriver binary live, resolved
+once per process. Any field may be None, in which case undetected-chromedriver
+falls back to its own discovery.
+"""
+
+_resolved = None
+_lock = threading.Lock()
+
+
+# -----------------------------
+# Discovery (only runs on a cache miss)
+# -----------------------------
+def find_chrome_binary():
+    """Chrome or Chromium executable for this OS, or None to let undetected-chromedriver look for it."""
+    system = platform.system().lower()
+    if system == "linux":
+        candidates = [
+            shutil.which(name)
+            for name in ("chromium", "chromium-browser", "google-chrome", "google-chrome-stable")
+        ] + ["/usr/bin/chromium"]
+    elif system == "darwin":  # macOS
+        candidates = [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+            os.path.expanduser("~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"),
+        ]
+    elif system == "windows":
+        candidates = [
+            os.path.join(os.environ.get(var, ""), "Google/Chrome/Application/chrome.exe")
+            for var in ("PROGRAMFILES", "PROGRAMFILES(X86)", "LOCALAPPDATA")
+            if os.environ.get(var)
+        ]
+    else:
+        raise RuntimeError(f"Unsupported OS: {system}")
+    return next((path for path in candidates if path and os.path.exists(path)), None)
+
+
+def find_chromedriver():
+    """chromedriver on PATH (or the usual install location), or None."""
+    path = shutil.which("chromedriver") or shutil.which("chromedriver.exe")
+    if path:
+        return path
+    if os.path.exists("/usr/local/bin/chromedriver"):
+        return "/usr/local/bin/chromedriver"
+    return None
+
+
+def binary_version(path):
+    """Version string printed by `<path> --version`, or None."""
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+
+def chrome_version(chrome_binary):
+    version = binary_version(chrome_binary) if chrome_binary else None
+    if version:
+        return version
+    # chrome.exe --version prints nothing on Windows; the autoinstaller reads the registry instead
+    try:
+        import chromedriver_autoinstaller
+        return chromedriver_autoinstaller.get_chrome_version()
+    except Exception:
+        return None
+
+
+def major(version):
+    return int(version.split(".")[0]) if version else None
+
+
+def _fingerprint(path):
+    """(mtime, size) of a file; changes when Chrome updates itself in place."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+def _install_chromedriver(version):
+    """A chromedriver matching Chrome's major version: the local one if it matches, else download one."""
+    local = find_chromedriver()
+    if local and major(binary_version(local)) == major(version):
+        return local
+    logger.info(f"No chromedriver for Chrome {version} found locally — installing one")
+    import chromedriver_autoinstaller
+    return chromedriver_autoinstaller.install()
+
+
+def _prepatch(source, cache_dir, version):
+    """Copy chromedriver into the cache and apply undetected-chromedriver's patch once, ahead of launch."""
+    from undetected_chromedriver.patcher import Patcher
+
+    exe = "undetected_chromedriver.exe" if platform.system().lower() == "windows" else "undetected_chromedriver"
+    target = os.path.abspath(os.path.join(cache_dir, version, exe))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copy2(source, target)
+    patcher = Patcher(executable_path=target, version_main=major(version))
+    if not patcher.is_binary_patched():
+        patcher.patch_exe()
+    return target
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+def _load_cache(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, CACHE_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"chrome": None, "drivers": {}}
+
+
+def _save_cache(cache_dir, cache):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, CACHE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def resolve_drivers(cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Resolve Chrome and a patched chromedriver using the on-disk cache. A warm
+    start costs one stat() of the Chrome binary; detection, `--version` probes,
+    downloads and patching only happen when Chrome is new or has been updated.
+    """
+    cache = _load_cache(cache_dir)
+    chrome = cache.get("chrome")
+    drivers = cache.setdefault("drivers", {})
+
+    if chrome and _fingerprint(chrome["path"]) == chrome["fingerprint"]:
+        version = chrome["version"]
+        driver = drivers.get(version)
+        if driver and os.path.exists(driver):
+            return DriverPaths(chrome["path"], version, driver, major(version))
+
+    logger.info("Driver cache miss — detecting Chrome and chromedriver")
+    chrome_binary = find_chrome_binary()
+    version = chrome_version(chrome_binary)
+    if not version:
+        logger.warning("Could not detect the Chrome version — leaving driver discovery to undetected-chromedriver")
+        return DriverPaths(chrome_binary, None, find_chromedriver(), None)
+
+    driver = drivers.get(version)
+    if not driver or not os.path.exists(driver):
+        try:
+            driver = _prepatch(_install_chromedriver(version), cache_dir, version)
+        except Exception as e:
+            logger.warning(f"Could not prepare chromedriver for Chrome {version}: {e}")
+            return DriverPaths(chrome_binary, version, find_chromedriver(), major(version))
+        drivers[version] = driver
+
+    if chrome_binary:
+        cache["chrome"] = {"path": chrome_binary, "version": version, "fingerprint": _fingerprint(chrome_binary)}
+    _save_cache(cache_dir, cache)
+    logger.info(f"Cached Chrome {version} at {chrome_binary} with patched chromedriver {driver}")
+    return DriverPaths(chrome_binary, version, driver, major(version))
+
+
+def get_driver_paths(cache_dir=DEFAULT_CACHE_DIR):
+    """DriverPaths for this process; resolved on first use, then served from memory."""
+    global _resolved
+    if _resolved is None:
+        with _lock:
+            if _resolved is None:
+                _resolved = resolve_drivers(cache_dir)
+    return _resolved
+
+
+def setup_chromedriver(cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Resolve Chrome and a matching, pre-patched ChromeDriver once at startup.
+    Only goes to the network when the cache has no driver for the installed Chrome version.
+    """
+    return get_driver_paths(cache_dir)
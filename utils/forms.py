@@ -0,0 +1,108 @@
+from functools import lru_cache
+from selenium.common.exceptions import WebDriverException
+from utils.logger import logger
+from utils.selectors import FIND_ELEMENT_JS, SCRIPT_STRATEGIES
+
+# Sets each field through the native value setter (so React/Vue-controlled inputs
+# see the change), fires the events a user's typing would, then reports per field:
+# "ok", "missing" (not on the page) or "rejected" (the page changed the value or
+# marked the field invalid).
+FILL_SCRIPT = FIND_ELEMENT_JS + """
+const fields = arguments[0];
+const setters = new Map();
+function setterFor(el) {
+    const proto = Object.getPrototypeOf(el);
+    if (!setters.has(proto)) {
+        const desc = Object.getOwnPropertyDescriptor(proto, 'value');
+        setters.set(proto, desc && desc.set);
+    }
+    return setters.get(proto);
+}
+return fields.map(([by, selector, value]) => {
+    const el = find(by, selector);
+    if (!el) return 'missing';
+    el.focus();
+    const setter = setterFor(el);
+    if (setter) { setter.call(el, value); } else { el.value = value; }
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.dispatchEvent(new Event('blur'));
+    const invalid = (el.validity && !el.validity.valid) || el.getAttribute('aria-invalid') === 'true';
+    return el.value === value && !invalid ? 'ok' : 'rejected';
+});
+"""
+
+# Values a form field can take beyond the plain store config keys; computed once per profile
+DERIVED_VALUES = {
+    "first_name": lambda config: config["full_name"].split()[0],
+    "last_name": lambda config: config["full_name"].split()[-1],
+}
+
+
+class FormProfile:
+    """
+    One checkout form compiled from the store config: the locator and value of
+    every field, resolved once. fill() applies the whole form with a single
+    script call and types only the fields the page refused.
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields  # ((selector key, (by, selector), value), ...)
+        self.batchable = all(locator[0] in SCRIPT_STRATEGIES for _, locator, _ in fields)
+        self.script_args = [[SCRIPT_STRATEGIES.get(by), selector, value] for _, (by, selector), value in fields]
+
+    def __len__(self):
+        return len(self.fields)
+
+    def fill(self, driver):
+        """Fill the form; returns how many fields had to be typed one by one."""
+        results = None
+        if self.batchable:
+            try:
+                results = driver.execute_script(FILL_SCRIPT, self.script_args)
+            except WebDriverException as e:
+                logger.warning(f"Batch fill of {self.name} form failed, typing each field: {e.msg}")
+        if not results or len(results) != len(self.fields):
+            results = ["rejected"] * len(self.fields)
+
+        typed = 0
+        for (key, locator, value), result in zip(self.fields, results):
+            if result == "ok":
+                continue
+            # Masked or validated inputs that ignore a scripted value get real keystrokes
+            element = driver.find_element(*locator)
+            element.clear()
+            element.send_keys(value)
+            typed += 1
+            if result == "rejected":
+                logger.info(f"{self.name} form: '{key}' rejected the scripted value — typed it instead")
+        return typed
+
+
+def field_values(store_config, value_keys):
+    """The value for each field: a store config key, or a DERIVED_VALUES name."""
+    values = []
+    for key in value_keys:
+        if key in store_config:
+            values.append(str(store_config[key]))
+        elif key in DERIVED_VALUES:
+            values.append(str(DERIVED_VALUES[key](store_config)))
+        else:
+            raise KeyError(f"No config value for form field '{key}'")
+    return values
+
+
+def compile_form(name, pairs, selectors, store_config):
+    """
+    FormProfile for one form a bot declares as (selector key, value key) pairs.
+    Profiles for the same form and settings are built once and shared.
+    """
+    values = field_values(store_config, [value_key for _, value_key in pairs])
+    fields = tuple((key, selectors[key], value) for (key, _), value in zip(pairs, values))
+    return _compile(name, fields)
+
+
+@lru_cache(maxsize=32)
+def _compile(name, fields):
+    return FormProfile(name, fields)
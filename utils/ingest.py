@@ -0,0 +1,393 @@
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import struct
+import time
+from collections import deque
+from utils.config import ConfigWatcher, DEFAULT_CONFIG_PATH
+from utils.discord import DiscordBot
+from utils.logger import logger, forward_worker_logs, setup_worker_logging
+from utils.metrics import REGISTRY, INGEST_LATENCY
+from utils.products import ProductIndex
+
+DEFAULT_SOCKET_PATH = "ingest.sock"
+# How often the ingest process sends its message counters to the dispatcher's /metrics
+METRICS_INTERVAL = 5
+
+# -----------------------------
+# Framing
+# -----------------------------
+# Every frame is a 4-byte payload length and a 1-byte type, then fixed-size fields
+# and length-prefixed UTF-8 strings. Fields are read in place with unpack_from.
+HEADER = struct.Struct(">IB")
+STRING_LENGTH = struct.Struct(">H")
+
+SUBMIT = 1  # ingest -> dispatcher: request id, sent at; url, source
+SUBMITTED = 2  # dispatcher -> ingest: request id, job id (0 = not queued), alerts on the job
+FINISHED = 3  # dispatcher -> ingest: job id, result; status, url
+COMMAND = 4  # ingest -> dispatcher: request id; command, argument
+REPLY = 5  # dispatcher -> ingest: request id; JSON
+
+SUBMIT_FIELDS = struct.Struct(">Id")
+SUBMITTED_FIELDS = struct.Struct(">III")
+FINISHED_FIELDS = struct.Struct(">I?")
+REQUEST_FIELDS = struct.Struct(">I")
+
+
+def encode_frame(kind, fields, *strings):
+    parts = [fields]
+    for text in strings:
+        data = (text or "").encode("utf-8")[:0xFFFF]
+        parts.append(STRING_LENGTH.pack(len(data)))
+        parts.append(data)
+    payload = b"".join(parts)
+    return HEADER.pack(len(payload), kind) + payload
+
+
+def decode_strings(payload, offset, count):
+    view = memoryview(payload)
+    strings = []
+    for _ in range(count):
+        (length,) = STRING_LENGTH.unpack_from(view, offset)
+        offset += STRING_LENGTH.size
+        strings.append(str(view[offset:offset + length], "utf-8", "replace"))
+        offset += length
+    return strings
+
+
+async def read_frame(reader):
+    """(type, payload) of the next frame; raises IncompleteReadError when the peer hangs up."""
+    length, kind = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return kind, await reader.readexactly(length)
+
+
+class LatencyStats:
+    """Ingest-to-dispatch latency of the last `size` alerts."""
+
+    def __init__(self, size=10000):
+        self.samples = deque(maxlen=size)
+        self.total = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.total += 1
+
+    def percentiles(self):
+        """(p50, p99) in seconds, or None before the first alert."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+# -----------------------------
+# Dispatcher process side
+# -----------------------------
+class IngestServer:
+    """
+    Unix socket server in the dispatcher process. Alerts the ingest process sends
+    are submitted to the dispatcher on its own event loop; the reply carries the
+    job id, and a FINISHED frame follows when that job ends so the ingest process
+    can report it in the channel. Ingest-to-dispatch latency is logged every
+    `report_interval` seconds.
+    """
+
+    def __init__(self, dispatcher, path=DEFAULT_SOCKET_PATH, report_interval=60):
+        self.dispatcher = dispatcher
+        self.path = path
+        self.report_interval = report_interval
+        self.latency = LatencyStats()
+        self._server = None
+        self._reporter = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+        os.chmod(self.path, 0o600)
+        self._reporter = asyncio.create_task(self._report())
+        logger.info(f"Waiting for alerts on {self.path}")
+
+    async def close(self):
+        if self._reporter:
+            self._reporter.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _serve(self, reader, writer):
+        watched = set()
+        tasks = set()
+        try:
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind == SUBMIT:
+                    handler = self._submit(payload, writer, watched)
+                elif kind == COMMAND:
+                    handler = self._command(payload, writer)
+                else:
+                    logger.warning(f"Ignoring unknown ingest frame type {kind}")
+                    continue
+                # Handled concurrently so a slow URL resolve doesn't hold up the alerts behind it
+                task = asyncio.create_task(handler)
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.warning("Discord ingest process disconnected")
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _submit(self, payload, writer, watched):
+        request_id, sent_at = SUBMIT_FIELDS.unpack_from(payload)
+        url, source = decode_strings(payload, SUBMIT_FIELDS.size, 2)
+        job = await self.dispatcher.submit(url, source=source)
+        latency = time.time() - sent_at
+        self.latency.add(latency)
+        INGEST_LATENCY.observe(latency)
+        fields = SUBMITTED_FIELDS.pack(request_id, int(job.id) if job else 0, job.alerts if job else 0)
+        writer.write(encode_frame(SUBMITTED, fields))
+        if job and job.id not in watched:
+            watched.add(job.id)
+            await writer.drain()
+            await job.wait()
+            watched.discard(job.id)
+            writer.write(encode_frame(FINISHED, FINISHED_FIELDS.pack(int(job.id), bool(job.result)), job.status, job.url))
+        await writer.drain()
+
+    async def _command(self, payload, writer):
+        (request_id,) = REQUEST_FIELDS.unpack_from(payload)
+        command, argument = decode_strings(payload, REQUEST_FIELDS.size, 2)
+        if command == "cancel":
+            job = self.dispatcher.cancel(argument)
+            reply = {"job": job.describe() if job else None}
+        elif command == "job":
+            job = self.dispatcher.get_job(argument)
+            reply = {"job": job.describe() if job else None}
+        elif command == "stats":
+            reply = self.dispatcher.stats()
+        elif command == "metrics":
+            REGISTRY.merge(json.loads(argument))
+            reply = {"ok": True}
+        else:
+            reply = {"error": f"unknown command {command}"}
+        writer.write(encode_frame(REPLY, REQUEST_FIELDS.pack(request_id), json.dumps(reply)))
+        await writer.drain()
+
+    async def _report(self):
+        reported = 0
+        while True:
+            await asyncio.sleep(self.report_interval)
+            if self.latency.total == reported:
+                continue
+            reported = self.latency.total
+            p50, p99 = self.latency.percentiles()
+            logger.info(f"Ingest → dispatch latency over the last {len(self.latency.samples)} alerts: "
+                        f"p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+
+
+# -----------------------------
+# Ingest process side
+# -----------------------------
+class RemoteJob:
+    """What the ingest process knows about a job in the dispatcher process."""
+
+    def __init__(self, job_id, alerts=1, finished=None, description=None):
+        self.id = str(job_id)
+        self.alerts = alerts
+        self.status = "queued"
+        self.result = None
+        self.url = None
+        self._finished = finished
+        self._description = description
+
+    def describe(self):
+        return self._description or f"job {self.id} {self.status}"
+
+    async def wait(self):
+        self.result, self.status, url = await asyncio.shield(self._finished)
+        self.url = url or self.url
+        return self.result
+
+
+class RemoteDispatcher:
+    """
+    Stands in for BotDispatcher inside the ingest process: DiscordBot parses
+    messages here and submits alerts and job commands to the dispatcher process
+    over the Unix socket. Store identification and config stay local.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET_PATH, config=None):
+        self.path = path
+        self.config_watcher = config or ConfigWatcher()
+        self.products = ProductIndex()
+        self._request_ids = itertools.count(1)
+        self._pending = {}  # request id -> future
+        self._finished = {}  # job id -> future of (result, status, url)
+        self._writer = None
+        self._connecting = None
+        self._metrics_task = None
+
+    @property
+    def config(self):
+        return self.config_watcher.current
+
+    def start(self):
+        self.config_watcher.start()
+        if self._metrics_task is None:
+            self._metrics_task = asyncio.get_running_loop().create_task(self._ship_metrics())
+
+    async def _ship_metrics(self):
+        """Hand what DiscordBot counted here to the dispatcher process, which serves /metrics."""
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            snapshot = REGISTRY.take()
+            if snapshot and not (await self._command("metrics", json.dumps(snapshot))).get("ok"):
+                REGISTRY.merge(snapshot)  # not delivered; send it with the next batch
+
+    def identify_store(self, url):
+        resolved = self.products.resolve(url)
+        return resolved.store if resolved else None
+
+    async def _connect(self):
+        if self._writer is None:
+            if self._connecting is None:
+                self._connecting = asyncio.ensure_future(asyncio.open_unix_connection(self.path))
+            try:
+                reader, writer = await self._connecting
+            finally:
+                self._connecting = None
+            if self._writer is None:
+                self._writer = writer
+                asyncio.create_task(self._read_loop(reader))
+        return self._writer
+
+    async def _request(self, kind, fields, *strings):
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            writer = await self._connect()
+            writer.write(encode_frame(kind, fields(request_id), *strings))
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_loop(self, reader):
+        try:
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind == SUBMITTED:
+                    request_id, job_id, alerts = SUBMITTED_FIELDS.unpack_from(payload)
+                    finished = None
+                    if job_id:
+                        # Picked up here, before a FINISHED frame for the job can be read
+                        finished = self._finished.setdefault(job_id, asyncio.get_running_loop().create_future())
+                    self._resolve(request_id, (job_id, alerts, finished))
+                elif kind == FINISHED:
+                    job_id, result = FINISHED_FIELDS.unpack_from(payload)
+                    status, url = decode_strings(payload, FINISHED_FIELDS.size, 2)
+                    future = self._finished.pop(job_id, None)
+                    if future and not future.done():
+                        future.set_result((result, status, url))
+                elif kind == REPLY:
+                    (request_id,) = REQUEST_FIELDS.unpack_from(payload)
+                    self._resolve(request_id, json.loads(decode_strings(payload, REQUEST_FIELDS.size, 1)[0]))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.error(f"Lost the connection to the dispatcher process: {e!r}")
+        finally:
+            self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("dispatcher process disconnected"))
+            # A job's outcome may never be awaited, so it's resolved rather than failed
+            for future in self._finished.values():
+                if not future.done():
+                    future.set_result((None, "outcome unknown (dispatcher process disconnected)", None))
+            self._finished.clear()
+
+    def _resolve(self, request_id, value):
+        future = self._pending.get(request_id)
+        if future and not future.done():
+            future.set_result(value)
+
+    async def submit(self, url, probe=True, source=None):
+        try:
+            job_id, alerts, finished = await self._request(
+                SUBMIT, lambda request_id: SUBMIT_FIELDS.pack(request_id, time.time()), url, source
+            )
+        except (OSError, ConnectionError) as e:
+            logger.error(f"Could not hand {url} to the dispatcher process: {e}")
+            return None
+        if not job_id:
+            return None
+        job = RemoteJob(job_id, alerts, finished)
+        job.url = url
+        return job
+
+    async def _command(self, command, argument=""):
+        try:
+            return await self._request(COMMAND, REQUEST_FIELDS.pack, command, argument)
+        except (OSError, ConnectionError) as e:
+            logger.error(f"Could not reach the dispatcher process for {command}: {e}")
+            return {}
+
+    async def cancel(self, job_id):
+        reply = await self._command("cancel", str(job_id))
+        return RemoteJob(job_id, description=reply["job"]) if reply.get("job") else None
+
+    async def get_job(self, job_id):
+        reply = await self._command("job", str(job_id))
+        return RemoteJob(job_id, description=reply["job"]) if reply.get("job") else None
+
+    async def stats(self):
+        return await self._command("stats")
+
+
+# -----------------------------
+# Processes
+# -----------------------------
+def run_ingest(socket_path, config_path, log_queue):
+    """Ingest process entry point: the Discord client, handing alerts to the dispatcher process."""
+    setup_worker_logging(log_queue)
+    config = ConfigWatcher(config_path)
+    DiscordBot(config.current.discord_token, RemoteDispatcher(socket_path, config)).run()
+
+
+def run_with_ingest_process(dispatcher, config_path=DEFAULT_CONFIG_PATH, socket_path=DEFAULT_SOCKET_PATH):
+    """
+    Run the dispatcher in this process and the Discord client in a child process
+    (restarted if it dies), so message bursts never compete with the checkouts
+    for this process's event loop and GIL. Blocks until interrupted.
+    """
+    try:
+        asyncio.run(_serve(dispatcher, config_path, socket_path))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve(dispatcher, config_path, socket_path):
+    dispatcher.start()
+    server = IngestServer(dispatcher, socket_path)
+    await server.start()
+    context = multiprocessing.get_context("spawn")
+    log_queue = context.Queue()
+    listener = forward_worker_logs(log_queue)
+    try:
+        while True:
+            process = context.Process(target=run_ingest, args=(socket_path, config_path, log_queue),
+                                      name="discord-ingest", daemon=True)
+            process.start()
+            logger.info(f"Discord ingest running in process {process.pid}")
+            await asyncio.to_thread(process.join)
+            logger.error(f"Discord ingest process exited with code {process.exitcode} — restarting in 5s")
+            await asyncio.sleep(5)
+    finally:
+        await server.close()
+        listener.stop()
+        dispatcher.close()
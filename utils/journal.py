@@ -0,0 +1,196 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from utils.logger import logger
+
+DEFAULT_JOURNAL_PATH = "jobs.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    job INTEGER NOT NULL,
+    at REAL NOT NULL,
+    event TEXT NOT NULL,
+    store TEXT,
+    url TEXT,
+    product TEXT,
+    source TEXT,
+    profile TEXT,
+    step TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS events_job ON events (job);
+CREATE INDEX IF NOT EXISTS events_event ON events (event, job);
+"""
+
+INSERT = ("INSERT INTO events (job, at, event, store, url, product, source, profile, step, status) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+class JournalEntry:
+    """An unfinished job read back from the journal."""
+
+    def __init__(self, job, store, url, product, source):
+        self.job = job
+        self.store = store
+        self.url = url
+        self.product = product
+        self.source = source
+        self.alerts = 1
+        self.steps = {}  # profile -> {step: "done", "order": "placing"}
+
+    def done_steps(self, profile):
+        return frozenset(step for step, status in self.steps.get(profile, {}).items() if status == "done")
+
+    def ordering(self, profile):
+        """Whether this profile's run got as far as clicking the order button."""
+        return self.steps.get(profile, {}).get("order") == "placing"
+
+    def __repr__(self):
+        return f"JournalEntry(job={self.job}, url={self.url!r}, steps={self.steps})"
+
+
+class JobJournal:
+    """
+    Append-only record of every dispatched job, the alerts merged into it, each
+    checkout step a profile completed and how the job finished, in an SQLite
+    database in WAL mode. Callers only put events on a queue; a writer thread
+    inserts whatever has piled up in one transaction, so journaling an alert
+    costs the event loop a queue put. After a crash, unfinished() returns the
+    jobs to pick up again; compact() drops the events of jobs that finished.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_loop, name="job-journal", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        # Worker processes write to the same file, so wait on their locks instead of failing
+        db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL survives the bot process dying; only an OS crash can lose the last commits
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # -----------------------------
+    # Writing
+    # -----------------------------
+    def _put(self, job, event, store=None, url=None, product=None, source=None, profile=None, step=None,
+             status=None):
+        self._queue.put((int(job), time.time(), event, store, url, product, source, profile, step, status))
+
+    def dispatch(self, job, store, url, product, source=None):
+        self._put(job, "dispatch", store=store, url=url, product=product, source=source)
+
+    def alert(self, job, source=None):
+        """Another alert for a product that already has this job."""
+        self._put(job, "alert", source=source)
+
+    def step(self, job, step, status, profile=None):
+        self._put(job, "step", profile=profile, step=step, status=status)
+
+    def finish(self, job, status):
+        self._put(job, "finish", status=status)
+
+    def flush(self, timeout=5):
+        """Wait until everything journaled so far is on disk."""
+        written = threading.Event()
+        self._queue.put(written)
+        return written.wait(timeout)
+
+    def _write_loop(self):
+        db = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [item for item in batch if isinstance(item, tuple)]
+            if rows:
+                try:
+                    with db:
+                        db.executemany(INSERT, rows)
+                except sqlite3.Error as e:
+                    logger.error(f"Could not write {len(rows)} job journal events to {self.path}: {e}")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def compact(self):
+        """
+        Delete every event of finished jobs so the table only grows with the jobs
+        still in flight. The newest job's rows stay, so last_job_id() keeps counting
+        up. Call at startup, before any job of this run is journaled.
+        """
+        db = self._connect()
+        try:
+            with db:
+                deleted = db.execute(
+                    "DELETE FROM events WHERE job IN (SELECT job FROM events WHERE event = 'finish') "
+                    "AND job < (SELECT MAX(job) FROM events)"
+                ).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Could not compact job journal {self.path}: {e}")
+            return 0
+        finally:
+            db.close()
+        if deleted:
+            logger.info(f"Job journal: removed {deleted} events of finished jobs")
+        return deleted
+
+    # -----------------------------
+    # Reading
+    # -----------------------------
+    def last_job_id(self):
+        """Highest job id ever journaled, so new ids don't collide with earlier runs."""
+        db = self._connect()
+        try:
+            return db.execute("SELECT COALESCE(MAX(job), 0) FROM events").fetchone()[0]
+        finally:
+            db.close()
+
+    def unfinished(self):
+        """Jobs that were dispatched but never finished, oldest first."""
+        query = """
+            SELECT job, event, store, url, product, source, profile, step, status FROM events
+            WHERE job NOT IN (SELECT job FROM events WHERE event = 'finish')
+            ORDER BY seq
+        """
+        entries = {}
+        db = self._connect()
+        try:
+            for job, event, store, url, product, source, profile, step, status in db.execute(query):
+                if event == "dispatch":
+                    entries[job] = JournalEntry(job, store, url, product, source)
+                elif job not in entries:
+                    continue
+                elif event == "alert":
+                    entries[job].alerts += 1
+                elif event == "step":
+                    entries[job].steps.setdefault(profile, {})[step] = status
+        finally:
+            db.close()
+        return list(entries.values())
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(path=DEFAULT_JOURNAL_PATH):
+    """The process-wide JobJournal for a database file (bots in worker processes open their own)."""
+    with _journals_lock:
+        if path not in _journals:
+            _journals[path] = JobJournal(path)
+        return _journals[path]
@@ -0,0 +1,78 @@
+from utils.logger import logger
+
+# Fixed window for lean browsers: small, but wide enough that the stores keep their desktop layout
+LEAN_VIEWPORT = (1280, 800)
+
+# Chrome switches for lean browsers: no throttling when the window is hidden or
+# occluded (a background checkout must run at full speed), and none of the
+# extension, sync and update traffic a shopping session doesn't need
+LEAN_FLAGS = (
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--mute-audio",
+)
+
+# Network.setBlockedURLs patterns ('*' is a wildcard) for requests a checkout never needs
+BLOCKED_ASSETS = (
+    # Images
+    "*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.gif", "*.gif?*", "*.webp", "*.webp?*",
+    "*.avif", "*.avif?*", "*.ico", "*.ico?*",
+    # Fonts
+    "*.woff", "*.woff?*", "*.woff2", "*.woff2?*", "*.ttf", "*.ttf?*", "*.otf", "*.otf?*",
+    # Video and audio
+    "*.mp4", "*.mp4?*", "*.webm", "*.webm?*", "*.m3u8", "*.m3u8?*", "*.mp3", "*.mp3?*",
+)
+BLOCKED_TRACKERS = (
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*/gtm.js*", "*/analytics.js*",
+    "*doubleclick.net/*", "*googlesyndication.com/*", "*facebook.net/*", "*connect.facebook.com/*",
+    "*hotjar.com/*", "*segment.io/*", "*cdn.segment.com/*", "*nr-data.net/*", "*js-agent.newrelic.com/*",
+    "*quantummetric.com/*", "*optimizely.com/*", "*omtrdc.net/*", "*demdex.net/*", "*criteo.com/*",
+    "*criteo.net/*", "*pinimg.com/*", "*tiktok.com/i18n/pixel/*", "*bing.com/bat.js*", "*clarity.ms/*",
+)
+
+
+def blocked_url_patterns(store_patterns=(), allowlist=()):
+    """
+    Every pattern a lean browser blocks: the shared asset and tracker lists plus
+    the store's own (e.g. its image CDN). Patterns containing an allowlist entry
+    are left out, so "woff2" keeps fonts and "googletagmanager.com" keeps GTM.
+    """
+    patterns = BLOCKED_ASSETS + BLOCKED_TRACKERS + tuple(store_patterns)
+    return [pattern for pattern in patterns if not any(allowed in pattern for allowed in allowlist)]
+
+
+def add_lean_options(options):
+    for flag in LEAN_FLAGS:
+        options.add_argument(flag)
+
+
+def size_window(driver, viewport=None):
+    """
+    Resize a launched browser to the lean viewport. A --window-size switch
+    can't do it: undetected_chromedriver appends its own --window-size=1920,1080
+    and --start-maximized after ours, and Chrome keeps the last one.
+    """
+    width, height = viewport or LEAN_VIEWPORT
+    try:
+        driver.set_window_size(width, height)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not resize lean browser to {width}x{height}: {e}")
+        return False
+
+
+def block_requests(driver, patterns):
+    """Have Chrome drop matching requests before they're sent (applies to every later navigation)."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+        return True
+    except Exception as e:
+        logger.warning(f"Could not set up request blocking — browser will load everything: {e}")
+        return False
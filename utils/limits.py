@@ -0,0 +1,76 @@
+import json
+import os
+import threading
+import time
+from utils.logger import logger
+
+DEFAULT_PURCHASE_LOG = "purchases.json"
+
+
+class PurchaseLimiter:
+    """
+    Enforces each store's per-customer purchase limit across every profile.
+    A checkout must reserve() a unit before it starts; the reservation is
+    turned into a recorded purchase by commit() once an order is placed, or
+    given back by release(). Purchases are kept on disk for `window` seconds
+    so a restart doesn't reset the count.
+    """
+
+    def __init__(self, path=DEFAULT_PURCHASE_LOG, window=7 * 24 * 3600):
+        self.path = path
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._purchases = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save(self):
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self._purchases, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+    def _key(self, store, product, customer):
+        return f"{store}|{product}|{customer}"
+
+    def bought(self, store, product, customer):
+        """Units of a product this customer bought at the store within the window."""
+        cutoff = time.time() - self.window
+        key = self._key(store, product, customer)
+        return sum(1 for entry in self._purchases if entry["key"] == key and entry["at"] >= cutoff)
+
+    def reserve(self, store, product, customer, limit):
+        """Claim one unit for a checkout; False if the customer is already at the store's limit."""
+        key = self._key(store, product, customer)
+        with self._lock:
+            used = self.bought(store, product, customer) + self._pending.get(key, 0)
+            if used >= limit:
+                logger.info(f"{store} limit of {limit} per customer reached for {product} ({customer}) — skipping")
+                return False
+            self._pending[key] = self._pending.get(key, 0) + 1
+            return True
+
+    def release(self, store, product, customer):
+        key = self._key(store, product, customer)
+        with self._lock:
+            if self._pending.get(key):
+                self._pending[key] -= 1
+
+    def commit(self, store, product, customer, profile=None):
+        """Record a placed order against the customer's limit."""
+        key = self._key(store, product, customer)
+        with self._lock:
+            if self._pending.get(key):
+                self._pending[key] -= 1
+            cutoff = time.time() - self.window
+            self._purchases = [entry for entry in self._purchases if entry["at"] >= cutoff]
+            self._purchases.append({"key": key, "profile": profile, "at": time.time()})
+            try:
+                self._save()
+            except OSError as e:
+                logger.error(f"Could not save purchase log {self.path}: {e}")
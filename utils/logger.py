@@ -1,24 +1,204 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
-def setup_logger():
-    # Ensure "logs" directory exists
-    log_dir = "logs"
+LOG_DIR = "logs"
+LOG_FILE = "autobot.log"
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(context)s%(message)s'
+CONTEXT_FIELDS = ("job", "store", "profile", "step")
+
+# job / store / profile / step of whatever is logging; asyncio tasks and asyncio.to_thread() carry it along
+_log_context = contextvars.ContextVar("log_context", default={})
+
+_listener = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Tag every log record made inside the block (and in tasks/threads started from it) with these fields."""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current job/store/profile/step onto the record while still on the logging thread."""
+
+    def filter(self, record):
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            # Records from worker processes arrive with their context already set
+            if getattr(record, field, None) is None:
+                setattr(record, field, context.get(field))
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `burst` records per `period` seconds for each
+    `rate_limit` key (passed as extra={"rate_limit": "..."}); records without a
+    key always pass. The first record after a quiet period notes how many were dropped.
+    """
+
+    def __init__(self, burst=20, period=1.0):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, "rate_limit", None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            start, count, dropped = self._windows.get(key, (now, 0, 0))
+            if now - start >= self.period:
+                start, count = now, 0
+            count += 1
+            if count > self.burst:
+                self._windows[key] = (start, count, dropped + 1)
+                return False
+            self._windows[key] = (start, count, 0)
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar '{key}' messages dropped)"
+        return True
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that does as little as possible on the caller's thread: the
+    message is interpolated (so mutable args can't change under the writer) and
+    exceptions are rendered, everything else happens on the listener thread.
+    """
+
+    def prepare(self, record):
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, message, thread and the job/store/profile/step context."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+            "logger": record.name,
+            "thread": record.threadName,
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """The usual console line, with [job store profile step] in front of the message when known."""
+
+    def format(self, record):
+        tags = [str(value) for value in (getattr(record, field, None) for field in CONTEXT_FIELDS) if value]
+        record.context = f"[{' '.join(tags)}] " if tags else ""
+        return super().format(record)
+
+
+def setup_logger(log_dir=LOG_DIR, level=logging.INFO, max_bytes=10 * 1024 * 1024, backups=5, when=None,
+                 message_burst=20):
+    """
+    Route all logging through a queue to one background writer thread, so
+    checkout threads and the Discord loop never wait on disk or console I/O.
+    The file is JSON lines in logs/autobot.log, rotated at `max_bytes` (or on a
+    time schedule when `when` is set, e.g. "midnight"), keeping `backups` old files.
+    Safe to call again to apply new settings.
+    """
     os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, LOG_FILE)
+    if when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backups,
+                                                                 encoding="utf-8", delay=True)
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                            encoding="utf-8", delay=True)
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(ConsoleFormatter(CONSOLE_FORMAT))
+
+    queue_handler = BackgroundQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(RateLimitFilter(burst=message_burst))
+    queue_handler.addFilter(ContextFilter())
 
-    # Create timestamped log file inside logs/
-    log_filename = os.path.join(log_dir, f'autobot_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_filename),
-            logging.StreamHandler()
-        ]
-    )
+    flush_logs()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    global _listener
+    _listener = logging.handlers.QueueListener(queue_handler.queue, file_handler, console_handler,
+                                               respect_handler_level=True)
+    _listener.start()
     return logging.getLogger(__name__)
 
-logger = setup_logger()
 
+class _RootForwarder(logging.Handler):
+    """Hands records from worker processes to this process's pipeline."""
+
+    def emit(self, record):
+        logging.getLogger().handle(record)
+
+
+def forward_worker_logs(log_queue):
+    """Start passing records that worker processes put on `log_queue` to this process's log pipeline."""
+    listener = logging.handlers.QueueListener(log_queue, _RootForwarder())
+    listener.start()
+    return listener
+
+
+def setup_worker_logging(log_queue, level=logging.INFO):
+    """In a worker process: send every record to the parent process (see forward_worker_logs)."""
+    flush_logs()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    handler = BackgroundQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def flush_logs():
+    """Write out everything still queued and stop the writer thread (also runs at exit)."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(flush_logs)
+
+logger = setup_logger()
@@ -0,0 +1,110 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Trademark-style marks that monitors add or drop inconsistently ("Hearth & Hand™")
+_MARKS = dict.fromkeys(map(ord, "™®©℠"), None)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    Fold text for keyword matching: drop ™/®/© marks, apply Unicode NFKC
+    (full-width letters, ligatures, non-breaking spaces) and casefold.
+    Match positions refer to this normalized text.
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text.translate(_MARKS))
+    return text.casefold()
+
+
+def normalize_keyword(keyword):
+    """normalize_text() plus whitespace collapsed to single spaces."""
+    return _WHITESPACE.sub(" ", normalize_text(keyword)).strip()
+
+
+def _trie_pattern(words):
+    """
+    Build a regex whose alternation is shaped like a trie, so a watchlist of
+    hundreds of names is scanned with shared prefixes instead of trying every
+    keyword at every position. Longer keywords win over their own prefixes,
+    and a space in a keyword matches any run of whitespace in the message.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        ends_here = "" in node
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Precompiled multi-keyword matcher for the TARGET_PRODUCTS watchlist."""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._by_normalized = {}
+        for keyword in self.keywords:
+            normalized = normalize_keyword(keyword)
+            if normalized:
+                self._by_normalized.setdefault(normalized, keyword)
+
+        if self._by_normalized:
+            pattern = _trie_pattern(self._by_normalized)
+            self._any = re.compile(pattern)
+            # Zero-width lookahead so overlapping keywords at different offsets are all reported
+            self._all = re.compile(f"(?=({pattern}))")
+        else:
+            self._any = self._all = None
+
+    def __len__(self):
+        return len(self._by_normalized)
+
+    def search(self, text):
+        """True if any keyword occurs in text."""
+        if not self._any or not text:
+            return False
+        return self._any.search(normalize_text(text)) is not None
+
+    def find(self, text):
+        """
+        Return (keyword, start, end) for every keyword occurrence, with offsets
+        into normalize_text(text). At a given offset only the longest keyword is reported.
+        """
+        if not self._all or not text:
+            return []
+        matches = []
+        for match in self._all.finditer(normalize_text(text)):
+            found = match.group(1)
+            keyword = self._by_normalized[_WHITESPACE.sub(" ", found)]
+            matches.append((keyword, match.start(), match.start() + len(found)))
+        return matches
+
+    def matched_keywords(self, text):
+        """Distinct keywords found in text, in order of first occurrence."""
+        return list(dict.fromkeys(keyword for keyword, _, _ in self.find(text)))
+
+
+@lru_cache(maxsize=8)
+def _build_matcher(keywords):
+    return KeywordMatcher(keywords)
+
+
+def get_matcher(keywords):
+    """Return a compiled matcher for a keyword list; rebuilt only when the list changes."""
+    return _build_matcher(tuple(keywords or ()))
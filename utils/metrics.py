@@ -0,0 +1,273 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.logger import logger
+
+# Seconds; wide enough for a selector wait at one end and a whole restock watch at the other
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _label_text(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """A count per label set that only goes up (e.g. messages seen per outcome)."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labels), 0)
+
+    def take(self):
+        """Current values as JSON-able [labels, value] pairs, then start again from zero."""
+        with self._lock:
+            values, self._values = self._values, {}
+        return [[list(key), value] for key, value in values.items()]
+
+    def merge(self, samples):
+        with self._lock:
+            for key, value in samples:
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0) + value
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram:
+    """Observations per label set in cumulative `buckets` (upper bounds), plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label values -> [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def take(self):
+        with self._lock:
+            values, self._values = self._values, {}
+        return [[list(key), counts] for key, counts in values.items()]
+
+    def merge(self, samples):
+        with self._lock:
+            for key, counts in samples:
+                key = tuple(key)
+                mine = self._values.get(key)
+                if mine is None:
+                    self._values[key] = list(counts)
+                else:
+                    for n, value in enumerate(counts):
+                        mine[n] += value
+
+    def render(self):
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        lines = []
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {_number(counts[-1])}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """
+    A value read when /metrics is scraped: `collect()` returns (labels dict,
+    value) pairs, so things like pool utilization are never stale and cost
+    nothing between scrapes. Several sources (one per pool) can be added.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._sources = []
+
+    def add_source(self, collect):
+        self._sources.append(collect)
+
+    def render(self):
+        lines = []
+        for collect in list(self._sources):
+            try:
+                samples = list(collect())
+            except Exception as e:
+                logger.warning(f"Could not collect metric {self.name}: {e}")
+                continue
+            for labels, value in samples:
+                values = [labels.get(name, "") for name in self.labels]
+                lines.append(f"{self.name}{_label_text(self.labels, values)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Every metric the process records, rendered in the Prometheus text format
+    for /metrics. Worker and ingest processes record into their own registry
+    and ship it to the parent with take()/merge().
+    """
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def take(self):
+        """Counters and histograms recorded since the last take(), reset to zero here."""
+        snapshot = {}
+        for name, metric in self.metrics.items():
+            if hasattr(metric, "take"):
+                samples = metric.take()
+                if samples:
+                    snapshot[name] = samples
+        return snapshot
+
+    def merge(self, snapshot):
+        """Add another process's take() into this registry."""
+        for name, samples in (snapshot or {}).items():
+            metric = self.metrics.get(name)
+            if metric is not None:
+                metric.merge(samples)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# -----------------------------
+# Pipeline metrics
+# -----------------------------
+MESSAGES = REGISTRY.counter(
+    "discord_messages_total", "Discord messages by what happened to them: ignored (source filter), "
+    "command or parsed", ("outcome",))
+ALERTS_MATCHED = REGISTRY.counter(
+    "alerts_matched_total", "Parsed messages that mention a target product")
+INGEST_LATENCY = REGISTRY.histogram(
+    "ingest_latency_seconds", "Ingest process to dispatcher hand-off time per alert (ingest_process: true)")
+DISPATCHES = REGISTRY.counter(
+    "dispatches_total", "Alerts submitted to the dispatcher by store and result: queued, watching, coalesced, "
+    "queue_full or unsupported", ("store", "result"))
+QUEUE_WAIT = REGISTRY.histogram(
+    "job_queue_wait_seconds", "Time a job waited in its store queue for a worker", ("store",))
+JOB_RUN = REGISTRY.histogram(
+    "job_run_seconds", "Time from a worker picking a job up to it finishing", ("store",))
+JOBS = REGISTRY.counter(
+    "jobs_finished_total", "Finished jobs by status: succeeded, failed, cancelled, timed_out or expired",
+    ("store", "status"))
+CHECKOUTS = REGISTRY.counter(
+    "checkouts_total", "Bot runs by outcome, and for failures the step that stopped them (reason)",
+    ("store", "outcome", "reason"))
+STEP_SECONDS = REGISTRY.histogram(
+    "checkout_step_seconds", "Duration of each bot step call, by outcome (ok or failed)", ("store", "step", "outcome"))
+ALERT_TO_STEP = REGISTRY.histogram(
+    "alert_to_step_seconds", "Time from the alert to each completed checkout step (check_stock_and_add = "
+    "alert-to-cart)", ("store", "step"))
+BROWSER_LAUNCHES = REGISTRY.counter(
+    "browser_launches_total", "Chrome launches by mode (default or lean)", ("store", "mode"))
+BROWSER_LAUNCH_SECONDS = REGISTRY.histogram(
+    "browser_launch_seconds", "Time to launch Chrome and attach the driver", ("store",))
+POOL_BROWSERS = REGISTRY.gauge(
+    "browser_pool_browsers", "Pooled browsers by state: leased, idle or size (slots)", ("store", "state"))
+POOL_OVERFLOW = REGISTRY.gauge(
+    "browser_pool_overflow", "Leases that found every pooled browser busy and launched an extra one "
+    "since start", ("store",))
+LOGINS = REGISTRY.counter(
+    "session_logins_total", "Checkouts by sign-in: reused (persistent session still valid) or login", ("store", "result"))
+
+
+# -----------------------------
+# /metrics endpoint
+# -----------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the log
+
+
+def serve_metrics(port, host="127.0.0.1", registry=REGISTRY):
+    """Serve /metrics from a background thread; returns the server (None if the port is taken)."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        logger.error(f"Could not serve metrics on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+import itertools
+import time
+from utils.logger import logger
+from utils.stock_probe import IN_STOCK, UNKNOWN
+from utils.schedule import window_interval
+
+
+class WatchedProduct:
+    """One product on the watchlist and the state of its last stock check."""
+
+    __slots__ = ("key", "url", "store", "interval", "source", "state", "unknown_streak",
+                 "due", "checks", "handoffs", "added_at", "removed")
+
+    def __init__(self, key, url, store, interval, source):
+        self.key = key
+        self.url = url
+        self.store = store
+        self.interval = interval
+        self.source = source  # "config" or "alert"
+        self.state = UNKNOWN
+        self.unknown_streak = 0
+        self.due = None
+        self.checks = 0
+        self.handoffs = 0
+        self.added_at = time.time()
+        self.removed = False
+
+    def __repr__(self):
+        return f"WatchedProduct({self.key}, {self.state}, every {self.interval}s)"
+
+
+class WatchlistMonitor:
+    """
+    Watches every product on one asyncio loop. Checks are kept in a heap
+    ordered by due time and run through the HTTP StockProbe; each product is
+    rescheduled at a fixed rate (due + interval, so no drift and no random
+    jitter) and ties run in the order products were added. `on_restock` is
+    awaited only when a product changes to in stock, or when its page has been
+    unreadable `max_unknown` times in a row so the browser can take a look.
+    Inside a refresh window (see utils/schedule.py) a product is checked at the
+    window's interval when that is faster than its own.
+    """
+
+    def __init__(self, probe, on_restock, default_interval=10, max_in_flight=50, max_unknown=5, windows=()):
+        self.probe = probe
+        self.on_restock = on_restock
+        self.default_interval = default_interval
+        self.windows = windows
+        self.max_in_flight = max_in_flight
+        self.max_unknown = max_unknown
+        self.products = {}
+        self.stats = {"checks": 0, "handoffs": 0, "late": 0, "lag_total": 0.0, "lag_max": 0.0}
+        self._heap = []
+        self._order = itertools.count()
+        self._tasks = set()
+        self._wakeup = asyncio.Event()
+        self._runner = None
+
+    def __len__(self):
+        return len(self.products)
+
+    # -----------------------------
+    # Watchlist
+    # -----------------------------
+    def add(self, url, store, key=None, interval=None, source="alert"):
+        """Watch a product (key defaults to the URL); re-adding keeps the existing entry."""
+        key = key or url
+        product = self.products.get(key)
+        if product:
+            if interval and interval < product.interval:
+                product.interval = interval
+            return product
+
+        product = WatchedProduct(key, url, store, interval or self.default_interval, source)
+        self.products[key] = product
+        self._schedule(product, time.monotonic())
+        logger.info(f"Watching {key} every {product.interval}s ({source})")
+        return product
+
+    def remove(self, key):
+        product = self.products.pop(key, None)
+        if product:
+            # Left in the heap and skipped when popped
+            product.removed = True
+            self.probe.forget(product.url)
+        return product
+
+    def get(self, key):
+        return self.products.get(key)
+
+    def _schedule(self, product, due):
+        product.due = due
+        heapq.heappush(self._heap, (due, next(self._order), product))
+        self._wakeup.set()
+
+    # -----------------------------
+    # Loop
+    # -----------------------------
+    def start(self):
+        """Start the scheduling loop. Must be called from the running event loop."""
+        if not self._runner:
+            self._runner = asyncio.create_task(self._run(), name="watchlist-monitor")
+        return self._runner
+
+    async def stop(self):
+        tasks = [self._runner, *self._tasks] if self._runner else list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        while True:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, product = heapq.heappop(self._heap)
+                if product.removed or product.due != due:
+                    continue
+                # Never have more than max_in_flight checks outstanding; the rest stay due in order
+                await slots.acquire()
+                self._spawn(self._check(product, due, slots))
+                now = time.monotonic()
+
+            # Sleep until the next check is due or add()/_schedule() brings one forward
+            self._wakeup.clear()
+            timer = loop.call_later(self._heap[0][0] - now, self._wakeup.set) if self._heap else None
+            try:
+                await self._wakeup.wait()
+            finally:
+                if timer:
+                    timer.cancel()
+
+    async def _check(self, product, due, slots):
+        started = time.monotonic()
+        lag = started - due
+        try:
+            result = await self.probe.check(product.url, product.store)
+            state = result.availability
+        except Exception as e:
+            logger.warning(f"Stock check for {product.key} failed: {e}")
+            state = UNKNOWN
+        finally:
+            slots.release()
+
+        self.stats["checks"] += 1
+        self.stats["lag_total"] += lag
+        self.stats["lag_max"] = max(self.stats["lag_max"], lag)
+        product.checks += 1
+
+        reason = None
+        if state == IN_STOCK and product.state != IN_STOCK:
+            reason = "in stock"
+        if state == UNKNOWN:
+            product.unknown_streak += 1
+            if product.unknown_streak == self.max_unknown:
+                reason = "page unreadable"
+        else:
+            product.unknown_streak = 0
+            product.state = state
+
+        if product.removed:
+            return
+        if reason:
+            product.handoffs += 1
+            self.stats["handoffs"] += 1
+            self._spawn(self._hand_off(product, reason))
+
+        # Fixed-rate: the next slot follows the previous one, not the end of this check
+        interval = product.interval
+        window = window_interval(self.windows, product.store) if self.windows else None
+        if window is not None:
+            interval = min(interval, window)
+        next_due = due + self.probe.next_delay(product.url, interval)
+        now = time.monotonic()
+        if next_due < now:
+            self.stats["late"] += 1
+            next_due = now
+        self._schedule(product, next_due)
+
+    async def _hand_off(self, product, reason):
+        logger.info(f"{product.key}: {reason} — handing off to checkout")
+        try:
+            await self.on_restock(product)
+        except Exception as e:
+            logger.error(f"Hand-off for {product.key} failed: {e}")
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
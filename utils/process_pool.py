@@ -0,0 +1,64 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from utils.logger import logger, log_context, forward_worker_logs, setup_worker_logging
+from utils.metrics import REGISTRY
+
+
+def _init_worker(log_queue):
+    setup_worker_logging(log_queue)
+
+
+def run_checkout(bot_class, store_config, cancel_event, context, resume_steps=frozenset(), alert_at=None):
+    """Worker process entry point: one complete checkout for one profile, plus the metrics it recorded."""
+    with log_context(**context):
+        bot = bot_class(store_config)
+        bot.cancel_event = cancel_event
+        bot.job_id = context.get("job")
+        bot.resume_steps = resume_steps
+        bot.alert_at = alert_at
+        return bot.run(), REGISTRY.take()
+
+
+class CheckoutProcessPool:
+    """
+    Runs checkouts in worker processes (one per core by default) so profiles
+    check out in parallel without each needing its own copy of the bot.
+    Workers are spawned, not forked, because the parent has live threads and
+    an event loop. Their logs come back through a queue to the parent's log
+    pipeline and their metrics with each result. Cancel events are manager-backed so a running checkout can be
+    stopped from the parent.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context("spawn")
+        self._log_queue = context.Queue()
+        self._log_listener = forward_worker_logs(self._log_queue)
+        self._manager = context.Manager()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._log_queue,)
+        )
+        logger.info(f"Checkout process pool ready with {self.workers} workers")
+
+    def cancel_event(self):
+        """An Event that can be set here and checked by a bot in a worker process."""
+        return self._manager.Event()
+
+    async def run(self, bot_class, store_config, cancel_event, resume_steps=frozenset(), alert_at=None, **context):
+        """Run bot_class(store_config).run() in a worker; returns its result."""
+        loop = asyncio.get_running_loop()
+        result, metrics = await loop.run_in_executor(
+            self._executor, run_checkout, bot_class, store_config, cancel_event, context, resume_steps, alert_at
+        )
+        REGISTRY.merge(metrics)
+        return result
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+        self._log_listener.stop()
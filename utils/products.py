@@ -0,0 +1,128 @@
+import re
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlsplit, parse_qs
+
+STORE_DOMAINS = {
+    "target.com": "target",
+    "walmart.com": "walmart",
+    "bestbuy.com": "bestbuy",
+}
+
+# Canonical product page for each store; every URL variant of a product maps to this
+CANONICAL_URLS = {
+    "target": "https://www.target.com/p/-/A-{id}",
+    "walmart": "https://www.walmart.com/ip/{id}",
+    "bestbuy": "https://www.bestbuy.com/site/{id}.p?skuId={id}",
+}
+
+# Product id patterns per store, tried in order against the URL path (and query for BestBuy)
+PRODUCT_ID_PATTERNS = {
+    "target": [re.compile(r"/A-(\d+)"), re.compile(r"^/p/(?:[^/]+/)*(\d+)/?$")],
+    "walmart": [re.compile(r"^/ip/(?:[^/]+/)*(\d+)/?$")],
+    "bestbuy": [re.compile(r"(?:^|&)skuId=(\d+)"), re.compile(r"/(\d+)\.p$")],
+}
+
+# Query parameters affiliate/tracking redirects carry the real destination in
+REDIRECT_PARAMS = ("u", "url", "murl", "RD_PARM1", "dest", "destination", "redirect")
+
+# How many nested redirect wrappers to peel off
+MAX_UNWRAP = 3
+
+
+class ProductKey(namedtuple("ProductKey", "store product_id")):
+    """Canonical identity of a product: the store plus its TCIN / item id / SKU."""
+
+    __slots__ = ()
+
+    @property
+    def url(self):
+        return CANONICAL_URLS[self.store].format(id=self.product_id)
+
+    def __str__(self):
+        return f"{self.store}:{self.product_id}"
+
+
+ResolvedURL = namedtuple("ResolvedURL", "store url key")
+ResolvedURL.__doc__ = """
+Result of resolving a URL: the store, the URL to open (canonical for product
+pages, unwrapped otherwise) and the ProductKey, or None for non-product pages
+such as search results.
+"""
+
+
+def unwrap_redirect(url):
+    """Follow affiliate/tracking wrappers (goto.walmart.com/c/...?u=<url> etc.) to the real URL."""
+    for _ in range(MAX_UNWRAP):
+        query = parse_qs(urlsplit(url).query)
+        target = next(
+            (query[param][0] for param in REDIRECT_PARAMS if param in query and query[param][0].startswith("http")),
+            None
+        )
+        if not target:
+            break
+        url = target
+    return url
+
+
+def store_for_host(host):
+    host = host.lower().split(":")[0]
+    for domain, store in STORE_DOMAINS.items():
+        if host == domain or host.endswith("." + domain):
+            return store
+    return None
+
+
+def resolve_url(url):
+    """Map any Target/Walmart/BestBuy URL to a ResolvedURL, or None for other sites."""
+    url = unwrap_redirect(url.strip())
+    parts = urlsplit(url)
+    store = store_for_host(parts.netloc)
+    if not store:
+        return None
+
+    for pattern in PRODUCT_ID_PATTERNS[store]:
+        match = pattern.search(parts.path) or (store == "bestbuy" and pattern.search(parts.query))
+        if match:
+            key = ProductKey(store, match.group(1))
+            return ResolvedURL(store, key.url, key)
+
+    return ResolvedURL(store, url, None)
+
+
+def from_sku(store, sku):
+    """ProductKey for a bare SKU/item id seen in an alert."""
+    return ProductKey(store, str(sku).strip())
+
+
+class ProductIndex:
+    """
+    LRU-backed cache of resolve_url() so repeated alerts for the same link
+    resolve with a dict lookup instead of re-parsing.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def resolve(self, url):
+        try:
+            resolved = self._cache[url]
+        except KeyError:
+            self.misses += 1
+            resolved = resolve_url(url)
+            self._cache[url] = resolved
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return resolved
+        self.hits += 1
+        self._cache.move_to_end(url)
+        return resolved
+
+    def identity(self, url):
+        """Hashable identity for dedup/caching: the ProductKey, or (store, url) for non-product pages."""
+        resolved = self.resolve(url)
+        if not resolved:
+            return None
+        return resolved.key or (resolved.store, resolved.url)
@@ -0,0 +1,96 @@
+import time
+
+DEFAULT_REFRESH_INTERVAL = 10
+# Ceiling for backed-off refreshes when refresh_max_interval isn't set
+DEFAULT_MAX_INTERVAL = 120
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def parse_clock(value):
+    """"HH:MM" -> minutes after midnight; ValueError if it isn't a time of day."""
+    hours, minutes = value.split(":")
+    if not (hours.isdigit() and minutes.isdigit() and int(hours) < 24 and int(minutes) < 60):
+        raise ValueError(f"{value!r} is not a HH:MM time")
+    return int(hours) * 60 + int(minutes)
+
+
+class RefreshWindow:
+    """
+    A stretch of the day (local time) with its own refresh interval, e.g. the
+    half hour around an announced drop. start > end wraps past midnight; days
+    and stores limit it to some weekdays (the start's day) or stores.
+    """
+
+    def __init__(self, start, end, interval, stores=None, days=None):
+        self.start = parse_clock(start)
+        self.end = parse_clock(end)
+        self.interval = interval
+        self.stores = frozenset(stores) if stores else None
+        self.days = frozenset(DAYS.index(day) for day in days) if days else None
+
+    @classmethod
+    def from_config(cls, entry):
+        return cls(entry["start"], entry["end"], entry["interval"], entry.get("stores"), entry.get("days"))
+
+    def applies_to(self, store):
+        return self.stores is None or store in self.stores
+
+    def active(self, now=None):
+        local = time.localtime(now)
+        minute = local.tm_hour * 60 + local.tm_min
+        weekday = local.tm_wday
+        if self.start <= self.end:
+            inside = self.start <= minute < self.end
+        else:
+            inside = minute >= self.start or minute < self.end
+            if inside and minute < self.end:
+                weekday = (weekday - 1) % 7  # after midnight, the window belongs to the day it started
+        return inside and (self.days is None or weekday in self.days)
+
+
+def window_interval(windows, store=None, now=None):
+    """Interval of the active refresh window for a store (the fastest, if several overlap), or None."""
+    intervals = [window.interval for window in windows
+                 if (store is None or window.applies_to(store)) and window.active(now)]
+    return min(intervals) if intervals else None
+
+
+class RefreshSchedule:
+    """
+    How long a bot waits before re-checking a product that isn't in stock yet.
+    Normally the store's refresh_interval, stretched by `backoff` after every
+    miss up to `max_interval`; inside a refresh window the window's interval
+    applies with no backoff when it is faster than refresh_interval (as on the
+    watchlist monitor), so checks speed up around announced drops. A job
+    older than `max_lifetime` seconds (from its alert) stops checking.
+    """
+
+    def __init__(self, interval=DEFAULT_REFRESH_INTERVAL, backoff=1.0, max_interval=None, max_lifetime=None,
+                 windows=()):
+        self.interval = interval
+        self.backoff = backoff
+        self.max_interval = max(max_interval or DEFAULT_MAX_INTERVAL, interval)
+        self.max_lifetime = max_lifetime
+        self.windows = tuple(windows)
+
+    @classmethod
+    def for_store(cls, store_config):
+        """Schedule from a store config (see Config.store_config), whose windows are already that store's."""
+        return cls(
+            interval=store_config.get("refresh_interval", DEFAULT_REFRESH_INTERVAL),
+            backoff=store_config.get("refresh_backoff", 1.0),
+            max_interval=store_config.get("refresh_max_interval"),
+            max_lifetime=store_config.get("max_job_lifetime"),
+            windows=[RefreshWindow.from_config(entry) for entry in store_config.get("refresh_windows", ())],
+        )
+
+    def delay(self, misses, now=None):
+        """Seconds to wait after the `misses`-th check in a row that found nothing."""
+        window = window_interval(self.windows, now=now)
+        if window is not None:
+            return min(window, self.interval)
+        return min(self.interval * self.backoff ** max(misses - 1, 0), self.max_interval)
+
+    def expired(self, started_at, now=None):
+        return bool(self.max_lifetime) and started_at is not None and \
+            (now or time.time()) - started_at >= self.max_lifetime
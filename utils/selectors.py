@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+from selenium.webdriver.common.by import By
+from utils.logger import logger
+
+DEFAULT_CACHE_PATH = "selectors.json"
+
+# How each Selenium locator strategy is looked up by FIND_ELEMENT_JS
+SCRIPT_STRATEGIES = {
+    By.ID: "id", By.NAME: "name", By.XPATH: "xpath", By.CSS_SELECTOR: "css", By.CLASS_NAME: "class",
+}
+
+# find(by, selector) for page scripts; `by` is a SCRIPT_STRATEGIES value
+FIND_ELEMENT_JS = """
+function find(by, selector) {
+    switch (by) {
+        case 'id': return document.getElementById(selector);
+        case 'name': return document.getElementsByName(selector)[0] || null;
+        case 'class': return document.getElementsByClassName(selector)[0] || null;
+        case 'xpath': return document.evaluate(selector, document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        default: return document.querySelector(selector);
+    }
+}
+"""
+
+# Returns [index, element] for the first candidate on the page (visible and enabled
+# when arguments[1] is true), or null; one round trip for any number of candidates.
+RACE_SCRIPT = FIND_ELEMENT_JS + """
+const [candidates, usable] = arguments;
+for (let i = 0; i < candidates.length; i++) {
+    const el = find(candidates[i][0], candidates[i][1]);
+    if (!el) continue;
+    if (usable && (el.disabled || !el.getClientRects().length)) continue;
+    return [i, el];
+}
+return null;
+"""
+
+
+class first_match:
+    """
+    Expected condition: the first of several candidate locators that matches,
+    as (index, element). All candidates are checked in one script call per poll.
+    """
+
+    def __init__(self, candidates, usable=True):
+        self.candidates = candidates
+        self.usable = usable
+        self.script_args = [[SCRIPT_STRATEGIES.get(by, "css"), selector] for by, selector in candidates]
+
+    def __call__(self, driver):
+        found = driver.execute_script(RACE_SCRIPT, self.script_args, self.usable)
+        return tuple(found) if found else False
+
+
+def locator_id(locator):
+    by, selector = locator
+    return f"{by}={selector}"
+
+
+class SelectorRegistry:
+    """
+    Remembers, per store and selector name, which candidate locator matched
+    last, how often each one matched and how long finding it took, saved to a
+    JSON file between runs. rank() orders the candidates so the last good one
+    is tried first, then the most reliable and fastest.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stats = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write the rankings to disk if anything changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._stats, indent=2)
+            self._dirty = False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path + ".tmp", "w") as f:
+                f.write(data)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            logger.warning(f"Could not save selector rankings to {self.path}: {e}")
+
+    def last_good(self, store, name):
+        entry = self._stats.get(f"{store}:{name}")
+        return entry.get("last_good") if entry else None
+
+    def rank(self, store, name, candidates):
+        """Candidates in the order to try them: last good first, then by hits and find time."""
+        entry = self._stats.get(f"{store}:{name}")
+        if not entry:
+            return list(candidates)
+        last_good = entry.get("last_good")
+        stats = entry.get("locators", {})
+
+        def key(locator):
+            record = stats.get(locator_id(locator), {})
+            return (locator_id(locator) != last_good, -record.get("hits", 0), record.get("avg_ms", float("inf")))
+
+        # sorted() is stable, so never-seen candidates keep their declared order
+        return sorted(candidates, key=key)
+
+    def record_hit(self, store, name, locator, elapsed):
+        with self._lock:
+            entry = self._stats.setdefault(f"{store}:{name}", {"last_good": None, "misses": 0, "locators": {}})
+            record = entry["locators"].setdefault(locator_id(locator), {"hits": 0, "avg_ms": 0.0})
+            record["hits"] += 1
+            record["avg_ms"] += (elapsed * 1000 - record["avg_ms"]) / record["hits"]
+            record["last_hit"] = time.time()
+            entry["last_good"] = locator_id(locator)
+            self._dirty = True
+
+    def record_miss(self, store, name):
+        with self._lock:
+            entry = self._stats.setdefault(f"{store}:{name}", {"last_good": None, "misses": 0, "locators": {}})
+            entry["misses"] += 1
+            # Whatever worked last time didn't this time, so don't give it the head start
+            entry["last_good"] = None
+            self._dirty = True
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(path=DEFAULT_CACHE_PATH):
+    """The process-wide SelectorRegistry for a cache file."""
+    with _registries_lock:
+        if path not in _registries:
+            _registries[path] = SelectorRegistry(path)
+        return _registries[path]
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+from utils.logger import logger
+from utils.metrics import LOGINS
+
+# Domain each store's auth cookies are set on
+STORE_DOMAINS = {
+    "target": "target.com",
+    "walmart": "walmart.com",
+    "bestbuy": "bestbuy.com",
+}
+
+# Cookies that only exist for a signed-in account (override with "session_cookies" in config.json)
+DEFAULT_AUTH_COOKIES = {
+    "target": ["refreshToken"],
+    "walmart": ["CID"],
+    "bestbuy": ["ut"],
+}
+
+
+class SessionStore:
+    """
+    Persistent Chrome profiles (one per store and pool slot) so a signed-in
+    session survives between bot runs and login() can be skipped.
+
+    Slot 0 lives in <session_dir>/<store>, extra pool slots in <session_dir>/<store>-<n>,
+    each with its expiry saved next to it in <store>.json / <store>-<n>.json.
+    Overflow browsers (slot None) get a throwaway profile and always log in.
+    """
+
+    def __init__(self, session_dir="sessions", auth_cookies=None, refresh_margin=1800):
+        self.session_dir = session_dir
+        self.auth_cookies = dict(DEFAULT_AUTH_COOKIES)
+        self.auth_cookies.update(auth_cookies or {})
+        self.refresh_margin = refresh_margin
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._stop = threading.Event()
+
+    # -----------------------------
+    # Profiles
+    # -----------------------------
+    def profile_dir(self, store, slot):
+        """Chrome user-data-dir for a pool slot, or None for a throwaway profile."""
+        if slot is None:
+            return None
+        path = os.path.abspath(os.path.join(self.session_dir, self._profile_name(store, slot)))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    # -----------------------------
+    # Login fast path
+    # -----------------------------
+    def is_logged_in(self, store, driver):
+        """
+        Fast "am I logged in" probe: reads the browser's cookie jar over CDP
+        without navigating, and checks every auth cookie is present and unexpired.
+        """
+        expires_at = self._session_expiry(store, driver)
+        return expires_at is not None and (expires_at == 0 or expires_at > time.time())
+
+    def ensure_logged_in(self, store, driver, login, slot=None):
+        """Run the full login() only if the slot's profile doesn't already hold a valid session."""
+        if self.is_logged_in(store, driver):
+            self._record(store, "reused")
+            logger.info(f"{store}: session still valid — skipped login "
+                        f"(login avoided on {self.reuse_rate(store):.0%} of runs)")
+            return True
+
+        if not login():
+            return False
+
+        self._record(store, "logins")
+        self.save(store, driver, slot)
+        return True
+
+    def save(self, store, driver, slot):
+        """Persist when the slot's session expires so the refresher can renew it in time."""
+        if slot is None:
+            return  # throwaway profile; nothing to renew
+        expires_at = self._session_expiry(store, driver)
+        meta = {"logged_in_at": time.time(), "expires_at": expires_at or 0}
+        with open(self._meta_path(store, slot), "w") as f:
+            json.dump(meta, f)
+
+    def load(self, store, slot=0):
+        try:
+            with open(self._meta_path(store, slot)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def reuse_rate(self, store):
+        stats = self.stats.get(store, {})
+        total = stats.get("reused", 0) + stats.get("logins", 0)
+        return stats.get("reused", 0) / total if total else 0.0
+
+    # -----------------------------
+    # Background refresh
+    # -----------------------------
+    def start_refresher(self, refresh, slots, interval=300):
+        """
+        Every `interval` seconds, call refresh(store, slot) for each pool slot
+        (`slots` maps store -> number of slots) whose saved session expires
+        within refresh_margin seconds.
+        """
+        if self._refresher:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                for store, count in slots.items():
+                    for slot in range(count):
+                        meta = self.load(store, slot)
+                        if not meta or not meta.get("expires_at"):
+                            continue
+                        if meta["expires_at"] - time.time() > self.refresh_margin:
+                            continue
+                        logger.info(f"{store}: slot {slot} session expires soon — refreshing in background")
+                        try:
+                            refresh(store, slot)
+                        except Exception as e:
+                            logger.error(f"{store}: background session refresh for slot {slot} failed: {e}")
+
+        self._refresher = threading.Thread(target=loop, name="session-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # -----------------------------
+    # Helper functions
+    # -----------------------------
+    def _session_expiry(self, store, driver):
+        """
+        Earliest expiry (epoch seconds) of the store's auth cookies, 0 if they are
+        session cookies, or None if any is missing.
+        """
+        names = self.auth_cookies.get(store)
+        if not names:
+            return None
+        try:
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        except Exception:
+            return None
+
+        domain = STORE_DOMAINS[store]
+        found = {
+            c["name"]: c.get("expires", -1)
+            for c in cookies
+            if c["name"] in names and c.get("domain", "").endswith(domain)
+        }
+        if len(found) < len(names):
+            return None
+        expiries = [e for e in found.values() if e and e > 0]
+        return min(expiries) if expiries else 0
+
+    def _record(self, store, key):
+        LOGINS.inc(store=store, result="reused" if key == "reused" else "login")
+        with self._lock:
+            stats = self.stats.setdefault(store, {"reused": 0, "logins": 0})
+            stats[key] += 1
+
+    def _profile_name(self, store, slot):
+        return store if slot == 0 else f"{store}-{slot}"
+
+    def _meta_path(self, store, slot):
+        os.makedirs(self.session_dir, exist_ok=True)
+        return os.path.join(self.session_dir, f"{self._profile_name(store, slot)}.json")
@@ -0,0 +1,98 @@
+# Trust levels for where a Discord message came from, lowest first
+IGNORE = 0     # dropped before any parsing
+ALERTS = 1     # alerts are parsed and checked out; !buy/!status/!cancel are ignored
+COMMANDS = 2   # alerts and commands
+TRUST_LEVELS = {"ignore": IGNORE, "alerts": ALERTS, "commands": COMMANDS}
+
+
+class SourcePolicy:
+    """
+    Which Discord messages are worth parsing, decided from ids alone before any
+    regex or keyword work: optional guild, channel and author allowlists (a
+    message must pass every list that is set), then a trust level from the most
+    specific source with one (author, then channel, then guild, else the
+    default). Built once per config snapshot from its "sources" section.
+    """
+
+    def __init__(self, guilds=(), channels=(), authors=(), trust=None, default_trust="commands"):
+        self.guilds = frozenset(int(source) for source in guilds)
+        self.channels = frozenset(int(source) for source in channels)
+        self.authors = frozenset(int(source) for source in authors)
+        # Discord ids are unique across guilds, channels and users, so one dict covers all three
+        self.levels = {int(source): TRUST_LEVELS[level] for source, level in (trust or {}).items()}
+        self.default = TRUST_LEVELS[default_trust]
+
+    @classmethod
+    def from_config(cls, section):
+        section = section or {}
+        return cls(section.get("guilds", ()), section.get("channels", ()), section.get("authors", ()),
+                   section.get("trust"), section.get("default_trust", "commands"))
+
+    def trust(self, guild_id, channel_id, author_id, parent_id=None):
+        """Trust level for a message; parent_id is the channel a thread belongs to."""
+        if self.guilds and guild_id not in self.guilds:
+            return IGNORE
+        if self.channels and channel_id not in self.channels and parent_id not in self.channels:
+            return IGNORE
+        if self.authors and author_id not in self.authors:
+            return IGNORE
+        for source in (author_id, channel_id, parent_id, guild_id):
+            level = self.levels.get(source)
+            if level is not None:
+                return level
+        return self.default
+
+    def message_trust(self, message):
+        return self.trust(message.guild.id if message.guild else None, message.channel.id, message.author.id,
+                          getattr(message.channel, "parent_id", None))
+
+
+class ChannelCounters:
+    """
+    Messages seen, messages parsed and checkouts queued per channel, for spotting
+    noisy sources. At most `limit` channels are tracked: once twice that many
+    have been seen, all but the `limit` busiest are folded into one "other" row,
+    so a bot on huge servers doesn't keep a row for every channel forever.
+    """
+
+    def __init__(self, limit=200):
+        self.limit = limit
+        self.counts = {}  # channel id -> [seen, parsed, alerts]
+        self.names = {}
+        self.other = [0, 0, 0]  # folded channels
+        self.folded = 0  # channels folded so far (a channel can be folded more than once)
+
+    def seen(self, channel):
+        counts = self.counts.get(channel.id)
+        if counts is None:
+            if len(self.counts) >= 2 * self.limit:
+                self._fold()
+            counts = self.counts[channel.id] = [0, 0, 0]
+            self.names[channel.id] = getattr(channel, "name", None) or "DM"
+        counts[0] += 1
+
+    def parsed(self, channel):
+        self.counts.get(channel.id, self.other)[1] += 1
+
+    def alert(self, channel):
+        self.counts.get(channel.id, self.other)[2] += 1
+
+    def busiest(self, limit=15):
+        """
+        (channel id, name, seen, parsed, alerts) for the channels with the most
+        messages, then (None, "other channels", ...) if any were folded.
+        """
+        ranked = sorted(self.counts.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        rows = [(channel_id, self.names[channel_id], *counts) for channel_id, counts in ranked]
+        if self.folded:
+            rows.append((None, "other channels", *self.other))
+        return rows
+
+    def _fold(self):
+        ranked = sorted(self.counts.items(), key=lambda item: item[1][0], reverse=True)
+        for channel_id, counts in ranked[self.limit:]:
+            for n, value in enumerate(counts):
+                self.other[n] += value
+            del self.counts[channel_id]
+            del self.names[channel_id]
+            self.folded += 1
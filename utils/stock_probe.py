@@ -0,0 +1,171 @@
+import asyncio
+import random
+import re
+import time
+from collections import namedtuple
+import aiohttp
+from utils.logger import logger
+
+IN_STOCK = "in_stock"
+OUT_OF_STOCK = "out_of_stock"
+UNKNOWN = "unknown"
+
+# Availability markers in the server-rendered product page, per store. Each
+# pattern's first group is looked up in the store's value map; the schema.org
+# offer availability is the fallback every store ships.
+AVAILABILITY_MARKERS = {
+    "target": (
+        re.compile(rb'"availability_status"\s*:\s*"([A-Z_]+)"'),
+        {b"IN_STOCK": IN_STOCK, b"LIMITED_STOCK": IN_STOCK, b"PRE_ORDER_SELLABLE": IN_STOCK,
+         b"OUT_OF_STOCK": OUT_OF_STOCK, b"UNSELLABLE": OUT_OF_STOCK, b"PRE_ORDER_UNSELLABLE": OUT_OF_STOCK},
+    ),
+    "walmart": (
+        re.compile(rb'"availabilityStatus"\s*:\s*"([A-Z_]+)"'),
+        {b"IN_STOCK": IN_STOCK, b"OUT_OF_STOCK": OUT_OF_STOCK},
+    ),
+    "bestbuy": (
+        re.compile(rb'data-button-state="([A-Z_]+)"'),
+        {b"ADD_TO_CART": IN_STOCK, b"PRE_ORDER": IN_STOCK, b"SOLD_OUT": OUT_OF_STOCK,
+         b"COMING_SOON": OUT_OF_STOCK, b"CHECK_STORES": OUT_OF_STOCK, b"UNAVAILABLE": OUT_OF_STOCK},
+    ),
+}
+SCHEMA_AVAILABILITY = (
+    re.compile(rb'"availability"\s*:\s*"(?:https?://schema\.org/)?(\w+)"'),
+    {b"InStock": IN_STOCK, b"LimitedAvailability": IN_STOCK, b"PreOrder": IN_STOCK, b"OnlineOnly": IN_STOCK,
+     b"OutOfStock": OUT_OF_STOCK, b"SoldOut": OUT_OF_STOCK, b"Discontinued": OUT_OF_STOCK},
+)
+
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+ProbeResult = namedtuple("ProbeResult", "availability http_status cached elapsed")
+ProbeResult.__doc__ = """
+Outcome of one probe: availability (IN_STOCK / OUT_OF_STOCK / UNKNOWN), the
+HTTP status (None on a network error), whether it was answered from the
+previous response via 304 Not Modified, and the request time in seconds.
+"""
+
+
+def parse_availability(store, body):
+    """Availability from the raw page bytes, checking only the store's markers."""
+    for pattern, values in (AVAILABILITY_MARKERS.get(store), SCHEMA_AVAILABILITY):
+        if pattern is None:
+            continue
+        match = pattern.search(body)
+        if match and match.group(1) in values:
+            return values[match.group(1)]
+    return UNKNOWN
+
+
+class _ProductState:
+    """Per-URL validators and backoff state kept between probes."""
+
+    __slots__ = ("etag", "last_modified", "availability", "failures", "retry_after")
+
+    def __init__(self):
+        self.etag = None
+        self.last_modified = None
+        self.availability = UNKNOWN
+        self.failures = 0
+        self.retry_after = None
+
+
+class StockProbe:
+    """
+    Checks product availability over plain HTTP so the browser is only used
+    once a product is actually in stock. One pooled aiohttp session serves
+    every watched product; requests are conditional (ETag / If-Modified-Since)
+    and back off exponentially on errors, 429s and bot-protection responses.
+    """
+
+    def __init__(self, concurrency=50, per_host=8, timeout=10, max_backoff=300, headers=None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.headers = dict(DEFAULT_HEADERS)
+        self.headers.update(headers or {})
+        self.stats = {"requests": 0, "not_modified": 0, "errors": 0, "in_stock": 0}
+        self._states = {}
+        self._session = None
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def forget(self, url):
+        self._states.pop(url, None)
+
+    async def check(self, url, store):
+        """Probe one product page once."""
+        state = self._states.setdefault(url, _ProductState())
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+
+        session = await self._get_session()
+        start = time.perf_counter()
+        self.stats["requests"] += 1
+        try:
+            async with session.get(url, headers=headers, allow_redirects=True) as response:
+                if response.status == 304:
+                    self.stats["not_modified"] += 1
+                    state.failures = 0
+                    return ProbeResult(state.availability, 304, True, time.perf_counter() - start)
+
+                # 403/429/5xx: bot protection, rate limiting or an outage — back off
+                if response.status >= 400:
+                    state.failures += 1
+                    state.retry_after = _retry_after(response.headers.get("Retry-After"))
+                    self.stats["errors"] += 1
+                    return ProbeResult(UNKNOWN, response.status, False, time.perf_counter() - start)
+
+                body = await response.read()
+                state.etag = response.headers.get("ETag")
+                state.last_modified = response.headers.get("Last-Modified")
+                state.availability = parse_availability(store, body)
+                state.failures = 0
+                state.retry_after = None
+                return ProbeResult(state.availability, response.status, False, time.perf_counter() - start)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            state.failures += 1
+            state.retry_after = None
+            self.stats["errors"] += 1
+            logger.debug(f"Stock probe for {url} failed: {e!r}")
+            return ProbeResult(UNKNOWN, None, False, time.perf_counter() - start)
+
+    def next_delay(self, url, interval):
+        """Seconds until the next probe: the refresh interval, or exponential backoff after failures."""
+        state = self._states.get(url)
+        if not state or not state.failures:
+            return interval
+        if state.retry_after is not None:
+            return min(max(state.retry_after, interval), self.max_backoff)
+        backoff = min(interval * (2 ** state.failures), self.max_backoff)
+        return backoff * random.uniform(0.8, 1.2)
+
+
+def _retry_after(value):
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,130 @@
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from utils.logger import logger
+
+
+class Tracer:
+    """
+    Collects timing spans for one checkout run: every bot step, every Selenium
+    wait and every page load, with its outcome. Export as JSON lines (one span
+    per line, appended) or as a Chrome trace file for chrome://tracing / Perfetto.
+    """
+
+    def __init__(self, store, run_id=None):
+        self.store = store
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category="step", **attrs):
+        """
+        Time the enclosed block. The outcome is "ok", or "error" if it raised;
+        the block may override it via the yielded dict (e.g. span["outcome"] = "failed").
+        """
+        span = {"outcome": "ok"}
+        start = time.time()
+        start_perf = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span["outcome"] = "error"
+            attrs["error"] = repr(e)
+            raise
+        finally:
+            attrs.update(span.pop("attrs", {}))
+            self.record(name, category, start, time.perf_counter() - start_perf, span["outcome"], **attrs)
+
+    def record(self, name, category, start, duration, outcome="ok", **attrs):
+        """Add a span measured elsewhere (start is a time.time() timestamp, duration in seconds)."""
+        with self._lock:
+            self.spans.append({
+                "run_id": self.run_id,
+                "store": self.store,
+                "name": name,
+                "category": category,
+                "start": start,
+                "duration": duration,
+                "outcome": outcome,
+                "thread": threading.get_ident(),
+                "attrs": attrs,
+            })
+
+    def export_jsonl(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            for span in self.spans:
+                f.write(json.dumps(span, default=str) + "\n")
+        return path
+
+    def export_chrome_trace(self, path):
+        events = [
+            {
+                "name": span["name"],
+                "cat": span["category"],
+                "ph": "X",
+                "ts": int(span["start"] * 1_000_000),
+                "dur": int(span["duration"] * 1_000_000),
+                "pid": os.getpid(),
+                "tid": span["thread"],
+                "args": dict(span["attrs"], outcome=span["outcome"], run_id=span["run_id"]),
+            }
+            for span in self.spans
+        ]
+        # Label each thread row with the store and run it belongs to
+        for thread in dict.fromkeys(span["thread"] for span in self.spans):
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread,
+                "args": {"name": f"{self.store} {self.run_id}"},
+            })
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return path
+
+    def export(self, trace_dir="traces", trace_format="jsonl"):
+        """Export per config: trace_format is "jsonl", "chrome" or "none"."""
+        if not self.spans or trace_format in (None, "none"):
+            return None
+        try:
+            if trace_format == "chrome":
+                path = os.path.join(trace_dir, f"{self.store}-{self.run_id}.json")
+                return self.export_chrome_trace(path)
+            return self.export_jsonl(os.path.join(trace_dir, "spans.jsonl"))
+        except OSError as e:
+            logger.warning(f"Could not export trace for run {self.run_id}: {e}")
+            return None
+
+    def summary(self, category="step"):
+        """Seconds spent per span name for one category, in first-seen order."""
+        totals = {}
+        for span in self.spans:
+            if span["category"] == category:
+                totals[span["name"]] = totals.get(span["name"], 0) + span["duration"]
+        return totals
+
+
+def traced_step(name=None):
+    """
+    Record a bot step method as a span on self.tracer. A False return value
+    marks the span "failed" so step outcomes show up in the trace.
+    """
+    def decorator(method):
+        step = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(step) as span:
+                result = method(self, *args, **kwargs)
+                if result is False:
+                    span["outcome"] = "failed"
+                return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,100 @@
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from utils.logger import logger
+
+# Seconds each checkout step may wait before giving up (override per store with "wait_budgets")
+DEFAULT_BUDGETS = {
+    "page_load": 30,
+    "login": 40,
+    "login_confirm": 20,
+    "add_to_cart": 10,
+    "cart": 10,
+    "checkout": 30,
+    "shipping": 20,
+    "payment": 20,
+    "place_order": 20,
+}
+
+DEFAULT_POLL_INTERVAL = 0.1
+
+
+class text_changed:
+    """Expected condition: the element's text differs from `before` (e.g. a cart badge count)."""
+
+    def __init__(self, locator, before):
+        self.locator = locator
+        self.before = before
+
+    def __call__(self, driver):
+        elements = driver.find_elements(*self.locator)
+        if not elements:
+            return False
+        text = elements[0].text.strip()
+        return text if text != self.before else False
+
+
+class Waiter:
+    """
+    Shared wait layer for the store bots: polls conditions on a tight interval
+    instead of sleeping, enforces a per-store timeout budget for each step and
+    records how long every wait actually took (and, given a tracer, emits a
+    "wait" span per wait).
+    """
+
+    def __init__(self, driver, store, budgets=None, poll_interval=DEFAULT_POLL_INTERVAL, tracer=None):
+        self.driver = driver
+        self.store = store
+        self.budgets = dict(DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.poll_interval = poll_interval
+        self.tracer = tracer
+        self.timings = []
+
+    def budget(self, step):
+        return self.budgets.get(step, DEFAULT_BUDGETS["page_load"])
+
+    def until(self, condition, step, timeout=None, required=True):
+        """
+        Wait for `condition` within the step's budget. Raises TimeoutException
+        when required, otherwise returns None on timeout.
+        """
+        timeout = self.budget(step) if timeout is None else timeout
+        started_at = time.time()
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval).until(condition)
+            ok = True
+            return result
+        except TimeoutException:
+            if required:
+                raise
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            self._record(step, elapsed, ok)
+            if self.tracer:
+                self.tracer.record(
+                    step, "wait", started_at, elapsed, "ok" if ok else "timeout",
+                    timeout=timeout, required=required
+                )
+
+    def text_of(self, locator):
+        """Current text of the first element matching locator, or '' if absent."""
+        elements = self.driver.find_elements(*locator)
+        return elements[0].text.strip() if elements else ""
+
+    def report(self):
+        """Log the time spent waiting per step for this run."""
+        if not self.timings:
+            return
+        totals = {}
+        for step, elapsed, _ in self.timings:
+            totals[step] = totals.get(step, 0) + elapsed
+        breakdown = ", ".join(f"{step} {elapsed:.2f}s" for step, elapsed in totals.items())
+        logger.info(f"{self.store} wait times: {breakdown} (total {sum(totals.values()):.2f}s)")
+
+    def _record(self, step, elapsed, ok):
+        self.timings.append((step, elapsed, ok))
+        logger.info(f"{self.store} wait '{step}' {'done' if ok else 'timed out'} after {elapsed:.2f}s")